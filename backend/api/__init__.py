@@ -8,8 +8,13 @@ from api.common.exceptions import ApiBaseException, ConflictException, InvalidOp
 from api.common.utils import get_logger, is_tenancy_enabled
 from api.core.container import container
 from api.core.exceptions import InvalidSubdomainException, TenantNotFoundException
+from api.common.audit_log_writer import audit_log_writer
+from api.infrastructure.caching.response_cache import response_cache
+from api.infrastructure.security.role_cache import role_cache
 from api.infrastructure.persistence.mongodb import Database
+from api.usecases.tenant_service import TenantService
 from api.interfaces.middlewares.audit_logs_read_middleware import AuditLogsReadMiddleware
+from api.interfaces.middlewares.etag_middleware import ETagMiddleware
 from api.interfaces.middlewares.redis_cache_middleware import RedisCacheMiddleware
 from api.interfaces.middlewares.tenant_middleware import TenantMiddleware
 from api.interfaces.api_controllers.account_endpoint import router as account_router
@@ -34,6 +39,7 @@ from api.interfaces.api_controllers.notification_endpoint import router as notif
 from api.interfaces.api_controllers.audit_logs_endpoint import router as audit_logs_router
 from api.interfaces.api_controllers.sso_settings_endpoint import router as sso_router
 from api.interfaces.api_controllers.branding_endpoint import router as branding_router
+from api.interfaces.api_controllers.jwks_endpoint import router as jwks_router
 
 from api.common.logging import configure_logging
 from api.core.config import settings
@@ -43,6 +49,7 @@ build_path = os.path.join(os.path.dirname(__file__), "ui")
 
 
 db: Database = container.resolve(Database)
+tenant_service: TenantService = container.resolve(TenantService)
 
 logger = get_logger(__name__)
 @asynccontextmanager
@@ -51,8 +58,16 @@ async def lifespan(app: FastAPI):
     # initialization database with application-wide models Typically the host database
     await db.init_db(settings.mongo_db_name, is_tenant=False)
     await seed_initial_data()
+    await response_cache.start()
+    await role_cache.start()
+    await tenant_service.start()
+    await audit_log_writer.start()
     yield
     # Shutdown code
+    await audit_log_writer.stop()
+    await tenant_service.stop()
+    await role_cache.stop()
+    await response_cache.stop()
     await db.close()
 
 app = FastAPI(
@@ -87,6 +102,7 @@ async def api_exception_handler(req: Request, ex: ApiBaseException) -> JSONRespo
 
 app.add_middleware(AuditLogsReadMiddleware)
 app.add_middleware(RedisCacheMiddleware)
+app.add_middleware(ETagMiddleware)
 
 if is_tenancy_enabled(): 
     app.add_middleware(TenantMiddleware)
@@ -137,6 +153,7 @@ router.include_router(sso_router)
 
 
 app.include_router(router)
+app.include_router(jwks_router)
 
 
 
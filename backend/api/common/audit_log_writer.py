@@ -0,0 +1,218 @@
+import asyncio
+import contextlib
+import fcntl
+import os
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, Literal, Optional, Sequence
+
+from api.common.utils import get_logger
+from api.core.config import settings
+from api.domain.dtos.audit_logs_dto import AuditLogDto
+from api.domain.interfaces.audit_log_store import IAuditLogStore
+
+logger = get_logger(__name__)
+
+OverflowPolicy = Literal["block", "drop", "spill"]
+
+
+@dataclass
+class AuditLogWriterStats:
+    written: int = 0
+    batches: int = 0
+    dropped: int = 0 # queue full with the drop policy
+    spilled: int = 0 # queue full with the spill policy, appended to the spill file
+    replayed: int = 0 # spilled logs written to the store
+    failed: int = 0
+
+
+class AuditLogWriter:
+    """
+        Batches audit logs off the request path. `write` puts a log in a bounded queue, a background task
+        flushes it every `batch_size` logs or `flush_interval` seconds, writing in a worker thread.
+
+        When the queue is full the overflow policy applies: `block` waits for room (backpressure on the
+        request), `drop` discards the log, `spill` appends it to a local spill file. The spill file is
+        replayed into the store on start, after each batch and on stop, so a burst costs a local append
+        instead of a store write per log. Workers may share the spill file, appends and replays lock it.
+        Before `start` (and after `stop`) logs are written directly, e.g. in Celery workers and scripts.
+        Logs are written to the store set with `use_store` (see the container).
+    """
+    def __init__(
+            self,
+            max_queue_size: int = 10_000,
+            batch_size: int = 500,
+            flush_interval: float = 1.0,
+            overflow_policy: OverflowPolicy = "spill",
+            spill_path: str = "/tmp/audit_logs_spill.jsonl",
+        ):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path
+        self.stats = AuditLogWriterStats()
+        self.store: Optional[IAuditLogStore] = None
+        self._queue: Optional[asyncio.Queue[AuditLogDto]] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._batch: list[AuditLogDto] = []
+        self._writing: Optional[asyncio.Future] = None
+
+    def use_store(self, store: IAuditLogStore) -> None:
+        self.store = store
+
+    async def write(self, log: AuditLogDto) -> None:
+        if self._queue is None:
+            await self._write_batch([log])
+            return
+        try:
+            self._queue.put_nowait(log)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.overflow_policy == "block":
+            await self._queue.put(log)
+        elif self.overflow_policy == "drop":
+            self.stats.dropped += 1
+            if self.stats.dropped % 1000 == 1:
+                logger.warning(f"Audit log queue is full, {self.stats.dropped} logs dropped so far")
+        else:
+            await asyncio.to_thread(self._spill, log)
+            self.stats.spilled += 1
+
+    async def start(self) -> None:
+        if self._flusher is None:
+            # Logs spilled before a restart
+            await self._replay_spill()
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and flush the queued logs."""
+        if self._flusher is None:
+            return
+        self._flusher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._flusher
+        if self._writing is not None:
+            await self._writing
+        queue, self._queue, self._flusher = self._queue, None, None
+        remaining = self._batch + self._drain(queue, limit=queue.qsize())
+        self._batch = []
+        if remaining:
+            await self._write_batch(remaining)
+        await self._replay_spill()
+        logger.info(f"Audit log writer stopped, flushed {len(remaining)} queued logs")
+
+    def _drain(self, queue: asyncio.Queue, limit: int) -> list[AuditLogDto]:
+        batch: list[AuditLogDto] = []
+        while len(batch) < limit:
+            try:
+                batch.append(queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            # Logs taken from the queue live in self._batch until written, so stop() can flush them
+            self._batch.append(await queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(self._batch) < self.batch_size:
+                self._batch.extend(self._drain(queue, limit=self.batch_size - len(self._batch)))
+                timeout = deadline - loop.time()
+                if len(self._batch) >= self.batch_size or timeout <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+            batch, self._batch = self._batch, []
+            # Not interrupted by stop(), which waits for it instead
+            self._writing = asyncio.ensure_future(self._write_batch(batch))
+            try:
+                await asyncio.shield(self._writing)
+            finally:
+                if self._writing.done():
+                    self._writing = None
+            if os.path.exists(self.spill_path):
+                self._writing = asyncio.ensure_future(self._replay_spill())
+                try:
+                    await asyncio.shield(self._writing)
+                finally:
+                    if self._writing.done():
+                        self._writing = None
+
+    async def _write_batch(self, batch: list[AuditLogDto]) -> bool:
+        try:
+            await self.store.append(batch)
+            self.stats.written += len(batch)
+            self.stats.batches += 1
+            return True
+        except Exception as e:
+            self.stats.failed += len(batch)
+            logger.error(f"Failed to write {len(batch)} audit logs: {e}")
+            return False
+
+    def _spill(self, log: AuditLogDto) -> None:
+        line = (log.model_dump_json() + "\n").encode()
+        while True:
+            with open(self.spill_path, "ab") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                # A replay may have taken the file between open and lock, append to the new one then
+                try:
+                    if os.fstat(f.fileno()).st_ino != os.stat(self.spill_path).st_ino:
+                        continue
+                except FileNotFoundError:
+                    continue
+                f.write(line)
+                return
+
+    def _take_spill(self) -> Optional[str]:
+        """Move the spill file aside so new spills start a fresh one. Returns the moved file, None without spills."""
+        taken = f"{self.spill_path}.{uuid.uuid4().hex}.replay"
+        try:
+            os.rename(self.spill_path, taken)
+        except FileNotFoundError:
+            return None
+        with open(taken, "rb") as f:
+            # Waits for an append that locked the file before it was moved
+            fcntl.flock(f, fcntl.LOCK_EX)
+        return taken
+
+    def _read_spill_batch(self, f: BinaryIO) -> list[AuditLogDto]:
+        batch: list[AuditLogDto] = []
+        while len(batch) < self.batch_size:
+            line = f.readline()
+            if not line:
+                break
+            if line.endswith(b"\n"):
+                batch.append(AuditLogDto.model_validate_json(line))
+        return batch
+
+    async def _replay_spill(self) -> None:
+        """Write the spilled logs to the store. Batches that fail are spilled again for the next replay."""
+        taken = await asyncio.to_thread(self._take_spill)
+        if taken is None:
+            return
+        try:
+            with open(taken, "rb") as f:
+                while batch := await asyncio.to_thread(self._read_spill_batch, f):
+                    if await self._write_batch(batch):
+                        self.stats.replayed += len(batch)
+                    else:
+                        for log in batch:
+                            await asyncio.to_thread(self._spill, log)
+        finally:
+            os.remove(taken)
+
+
+audit_log_writer = AuditLogWriter(
+    max_queue_size=settings.audit_log_queue_size,
+    batch_size=settings.audit_log_batch_size,
+    flush_interval=settings.audit_log_flush_interval,
+    overflow_policy=settings.audit_log_overflow_policy,
+    spill_path=settings.audit_log_spill_path,
+)
@@ -1,17 +1,52 @@
-from typing import Any, Dict, List, Optional, TypeVar, Generic
+from dataclasses import dataclass
+from typing import Any, Dict, List, Literal, Optional, TypeVar, Generic
 from beanie import Document, PydanticObjectId
 from beanie.operators import Set
 from beanie.odm.interfaces.aggregate import DocumentProjectionType, AggregationQuery
+from pymongo.asynchronous.collection import AsyncCollection
+from api.common.cache_events import ResourceChanged, cache_invalidation_bus
+from api.common.count_cache import count_cache
+from api.common.pagination import decode_cursor, encode_cursor
 from api.common.utils import get_logger
 
 logger = get_logger(__name__)
 
 T = TypeVar("T", bound=Document)
 
+# exact:     count the matching documents.
+# estimated: collection metadata, no scan. Only for unfiltered totals, filtered counts are cached instead.
+# cached:    exact count reused for `count_cache_ttl` seconds per database and filter, until a write to the resource.
+CountStrategy = Literal["exact", "estimated", "cached"]
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    has_next: bool
+    next_cursor: Optional[str] = None # pass as `cursor` to get the next page
+
+
 class BaseRepository(Generic[T]):
+    # Name of the cached HTTP resource backed by this repository (e.g. "users").
+    # When set, every mutation publishes a ResourceChanged event so cached responses get invalidated.
+    cache_resource: Optional[str] = None
+
     def __init__(self, model: type[T]):
         self.model = model
 
+    async def publish_change(self, doc: Optional[T] = None) -> None:
+        """Publish a change of the given document, or of the whole resource when no document is given."""
+        if self.cache_resource is None:
+            # Not published, the counts are evicted here (published changes evict them through count_cache).
+            count_cache.evict(self._count_resource)
+            return
+        tenant_id = getattr(doc, "tenant_id", None)
+        await cache_invalidation_bus.publish(ResourceChanged(
+            resource=self.cache_resource,
+            entity_id=str(doc.id) if doc is not None and doc.id is not None else None,
+            tenant_id=str(tenant_id) if tenant_id else None,
+        ))
+
     async def single_or_none(self, **kwargs) -> Optional[T]:
         result = await self.model.find(kwargs).first_or_none()
         return result
@@ -25,6 +60,27 @@ class BaseRepository(Generic[T]):
         results = await self.model.find_all().to_list()
         return results
     
+    async def paginate(self, limit: int = 10, skip: int = 0, cursor: Optional[str] = None, query: Optional[Dict[str, Any]] = None) -> Page[T]:
+        """
+            A page of documents in `_id` order.
+            With a cursor (keyset mode) the page starts right after the document the cursor points at, using the
+            `_id` index whatever the depth. Otherwise (offset mode) `skip` documents are skipped.
+            One extra document is fetched to know whether there is a next page, no count is needed.
+        """
+        filters = dict(query or {})
+        if cursor is not None:
+            (last_id,) = decode_cursor(cursor, size=1)
+            filters["_id"] = {"$gt": last_id}
+            skip = 0
+        docs = await self.model.find(filters).sort("_id").skip(skip).limit(limit + 1).to_list()
+        has_next = len(docs) > limit
+        docs = docs[:limit]
+        return Page(
+            items=docs,
+            has_next=has_next,
+            next_cursor=encode_cursor(docs[-1].id) if has_next and docs else None,
+        )
+
     async def search(self, query: Dict[str, Any], limit: int = 100) -> List[T]:      
         results = await self.model.find(query).to_list(length=limit)
         return results
@@ -32,14 +88,23 @@ class BaseRepository(Generic[T]):
     async def create(self, data: dict) -> T:
         doc = self.model(**data)
         result = await doc.insert()
+        await self.publish_change(result)
         return result
 
+    async def save(self, doc: T) -> T:
+        """Save a document loaded through this repository."""
+        await doc.save()
+        await self.publish_change(doc)
+        return doc
+
 
-    async def update(self, id: str, data: dict) -> Optional[T]:
+    async def update(self, id: str, data: dict, *operators) -> Optional[T]:
+        """Set the given fields. Extra update operators (e.g. Inc) are applied in the same write."""
         doc = await self.get(id)
         if not doc:
             return None
-        await doc.update(Set(data))
+        await doc.update(Set(data), *operators)
+        await self.publish_change(doc)
         return doc
 
     async def delete(self, id: str) -> bool:
@@ -48,10 +113,28 @@ class BaseRepository(Generic[T]):
         if not doc:
             return False
         await doc.delete()
+        await self.publish_change(doc)
         logger.info(f"Document with id: {id} deleted successfully.")
         return True
     
-    async def count(self, params: Optional[Any] | None = None) -> int:
+    async def count(self, params: Optional[Any] | None = None, strategy: CountStrategy = "exact") -> int:
+        """Number of documents matching `params`, all documents when None. See CountStrategy."""
+        if strategy == "estimated" and not params:
+            return await self.get_collection().estimated_document_count()
+        if strategy == "exact":
+            return await self._count_exact(params)
+        total = count_cache.get(self._count_resource, params)
+        if total is None:
+            total = await self._count_exact(params)
+            count_cache.set(self._count_resource, params, total)
+        return total
+
+    @property
+    def _count_resource(self) -> str:
+        """Name the counts of this repository are cached under, shared with the other repositories of the resource."""
+        return self.cache_resource or self.model.__name__
+
+    async def _count_exact(self, params: Optional[Any]) -> int:
         if params:
             return await self.model.find(params).count()
         return await self.model.count()
@@ -65,3 +148,7 @@ class BaseRepository(Generic[T]):
         
     async def collection_name(self) -> str:
         return self.model.get_collection_name()
+
+    def get_collection(self) -> AsyncCollection:
+        """Collection of the database the current request is routed to (see api.common.tenant_context)."""
+        return self.model.get_pymongo_collection()
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from api.common.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ResourceChanged:
+    """
+        Published by repositories after a mutation.
+        `entity_id` is None when the change may affect any entity of the resource.
+        `tenant_id` is None for host level data.
+    """
+    resource: str
+    entity_id: Optional[str] = None
+    tenant_id: Optional[str] = None
+
+
+ResourceChangedHandler = Callable[[ResourceChanged], Awaitable[None]]
+
+
+class CacheInvalidationBus:
+    """In-process publish/subscribe of resource changes. Used to keep caches in sync with writes."""
+    def __init__(self):
+        self._handlers: list[ResourceChangedHandler] = []
+
+    def subscribe(self, handler: ResourceChangedHandler) -> None:
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def unsubscribe(self, handler: ResourceChangedHandler) -> None:
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    async def publish(self, event: ResourceChanged) -> None:
+        """Notify all handlers. A failing handler never fails the write that published the event."""
+        for handler in self._handlers:
+            try:
+                await handler(event)
+            except Exception as e:
+                logger.error(f"Cache invalidation handler failed for {event}: {e}")
+
+
+cache_invalidation_bus = CacheInvalidationBus()
@@ -0,0 +1,40 @@
+from typing import Any, Optional
+
+from bson import json_util
+
+from api.common.cache_events import ResourceChanged
+from api.common.lru_cache import LRUCache
+from api.common.tenant_context import get_current_database
+from api.core.config import settings
+
+
+class CountCache:
+    """
+        In-process cache of document counts, per resource, tenant database and filter. Shared by all
+        repositories of a resource. Writes through a repository evict the counts of its resource (see
+        BaseRepository.publish_change), counts cached by the other workers expire after `ttl`.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: float = 10):
+        self.entries: LRUCache[tuple[str, Optional[str], str], int] = LRUCache(maxsize=max_entries, ttl=ttl)
+
+    def _key(self, resource: str, params: Optional[Any]) -> tuple[str, Optional[str], str]:
+        database = get_current_database()
+        return resource, database.name if database is not None else None, json_util.dumps(params or {}, sort_keys=True)
+
+    def get(self, resource: str, params: Optional[Any]) -> Optional[int]:
+        return self.entries.get(self._key(resource, params))
+
+    def set(self, resource: str, params: Optional[Any], total: int) -> None:
+        self.entries.set(self._key(resource, params), total)
+
+    def evict(self, resource: str) -> None:
+        """Drop the counts of a resource, in every tenant."""
+        for key in self.entries.keys():
+            if key[0] == resource:
+                self.entries.pop(key)
+
+    async def on_resource_changed(self, event: ResourceChanged) -> None:
+        self.evict(event.resource)
+
+
+count_cache = CountCache(ttl=settings.count_cache_ttl)
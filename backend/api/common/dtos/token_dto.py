@@ -5,6 +5,7 @@ from pydantic import BaseModel, EmailStr, field_serializer
 
 from api.common.utils import get_logger
 from api.domain.dtos.role_dto import RoleDto
+from api.domain.dtos.user_dto import UserDto
 
 logger = get_logger(__name__)
 
@@ -16,6 +17,10 @@ class TokenPayloadDto(BaseModel):
     tenant_id: PydanticObjectId | None = None
     role: RoleDto | None = None
     tenant_id: PydanticObjectId | None = None
+    # Claims for stateless authorization, only issued when settings.stateless_auth_enabled is set
+    perm_mask: int | None = None
+    role_version: int | None = None
+    profile: UserDto | None = None
 
     @field_serializer('sub', 'tenant_id', "activated_at")
     def serialize_object_id(self, v: PydanticObjectId | datetime | None) -> str | None:
@@ -31,6 +36,8 @@ class RefreshTokenPayloadDto(BaseModel):
     sub: PydanticObjectId
     tenant_id: PydanticObjectId | None  = None
     type: Literal["refresh"] = "refresh"
+    jti: str | None = None
+    family: str | None = None
 
     @field_serializer('sub', 'tenant_id')
     def serialize_object_id(self, v: PydanticObjectId | None) -> str | None:
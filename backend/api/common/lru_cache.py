@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+        Small in-process LRU cache with optional per-entry expiry.
+        Optionally bounded by a total weight too (e.g. bytes), using `weigher` to weigh each value.
+        Not thread-safe, meant to be used from a single event loop.
+    """
+    def __init__(
+            self,
+            maxsize: int = 128,
+            ttl: Optional[float] = None,
+            on_evict: Optional[Callable[[K, V], None]] = None,
+            maxweight: Optional[int] = None,
+            weigher: Optional[Callable[[V], int]] = None,
+        ):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0")
+        if maxweight is not None and weigher is None:
+            raise ValueError("weigher is required when maxweight is set")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.maxweight = maxweight
+        self.weigher = weigher
+        self.weight = 0
+        self._data: OrderedDict[K, tuple[V, Optional[float]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Return the cached value and mark it as recently used. Expired entries are dropped."""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """
+            Store a value. `ttl` overrides the cache default; None means the default applies.
+            Values heavier than `maxweight` are not stored.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        value_weight = self._weigh(value)
+        if self.maxweight is not None and value_weight > self.maxweight:
+            self.pop(key)
+            return
+        if key in self._data:
+            self.weight -= self._weigh(self._data[key][0])
+            self._data.move_to_end(key)
+        self._data[key] = (value, expires_at)
+        self.weight += value_weight
+        while len(self._data) > self.maxsize or (self.maxweight is not None and self.weight > self.maxweight):
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+
+    def pop(self, key: K) -> Optional[V]:
+        item = self._data.pop(key, None)
+        if item is None:
+            return None
+        self.weight -= self._weigh(item[0])
+        return item[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.weight = 0
+
+    def keys(self) -> list[K]:
+        return list(self._data.keys())
+
+    def _weigh(self, value: V) -> int:
+        return self.weigher(value) if self.weigher is not None else 0
+
+    def _remove(self, key: K) -> None:
+        value, _ = self._data.pop(key)
+        self.weight -= self._weigh(value)
+        if self.on_evict is not None:
+            self.on_evict(key, value)
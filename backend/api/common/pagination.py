@@ -0,0 +1,22 @@
+import base64
+from typing import Any
+
+from bson import json_util
+
+from api.common.exceptions import InvalidOperationException
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque keyset pagination cursor holding the sort values of the last returned item (ObjectIds and datetimes included)."""
+    return base64.urlsafe_b64encode(json_util.dumps(list(values)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """Sort values of a cursor made by `encode_cursor`. Raises InvalidOperationException for malformed cursors."""
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as e:
+        raise InvalidOperationException("Invalid pagination cursor.") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidOperationException("Invalid pagination cursor.")
+    return values
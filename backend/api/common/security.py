@@ -1,13 +1,24 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from passlib.hash import pbkdf2_sha256
 from api.core.config import settings
 
+T = TypeVar("T")
+
 JWT_SECRET = settings.jwt_secret
 
 REFRESH_TOKEN_SECRET = settings.refresh_token_secret
 
 ALGORITHM = settings.algorithm
 
+# Tokens only this service issues and verifies (activation, password reset, email change) always use the shared secret
+SECRET_ALGORITHM = ALGORITHM if ALGORITHM.startswith("HS") else "HS256"
+
 REFRESH_ALGORITHM = settings.refresh_algorithm
 
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
@@ -32,4 +43,70 @@ def hash_it(password: str) -> str:
 def validate_hashed_value(value: str, hashed_value: str) -> bool:
     """Validate a value against its hashed version. Returns True if they match, False otherwise."""
     v = value + JWT_SECRET
-    return pbkdf2_sha256.verify(v, hashed_value)
\ No newline at end of file
+    return pbkdf2_sha256.verify(v, hashed_value)
+
+
+@dataclass
+class PasswordHasherStats:
+    max_workers: int
+    pending: int = 0 # submitted, running or waiting for a free worker
+    completed: int = 0
+    wait_seconds: float = 0.0 # total time spent waiting for a worker
+    run_seconds: float = 0.0 # total time spent hashing
+
+    @property
+    def in_flight(self) -> int:
+        """Running in the pool."""
+        return min(self.pending, self.max_workers)
+
+    @property
+    def waiting(self) -> int:
+        """Waiting for a free worker."""
+        return max(0, self.pending - self.max_workers)
+
+
+class PasswordHasher:
+    """
+        Runs the pbkdf2 hashing and verification (tens of milliseconds of CPU each) in a bounded thread pool,
+        so a burst of logins doesn't block the event loop. hashlib releases the GIL while hashing, threads run in parallel.
+        At most `max_workers` operations run at once, the executor queues further calls until a worker is free.
+        Nothing is bound to an event loop, the hasher can be shared by any loop.
+    """
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.stats = PasswordHasherStats(max_workers=max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        queued_at = time.perf_counter()
+        started = queued_at
+
+        def call() -> T:
+            nonlocal started
+            started = time.perf_counter()
+            return fn(*args)
+
+        self.stats.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        finally:
+            finished = time.perf_counter()
+            self.stats.pending -= 1
+            self.stats.completed += 1
+            self.stats.wait_seconds += started - queued_at
+            self.stats.run_seconds += finished - started
+
+
+password_hasher = PasswordHasher(max_workers=settings.password_hasher_workers)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def hash_it_async(password: str) -> str:
+    return await password_hasher.run(hash_it, password)
+
+
+async def validate_hashed_value_async(value: str, hashed_value: str) -> bool:
+    return await password_hasher.run(validate_hashed_value, value, hashed_value)
@@ -0,0 +1,36 @@
+from contextvars import ContextVar, Token
+from typing import Optional
+
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+
+from api.common.lru_cache import LRUCache
+
+# Database of the tenant (or the host) the current request is routed to.
+# Set by the TenantMiddleware, read by tenant-scoped documents when resolving their collection.
+_current_database: ContextVar[Optional[AsyncDatabase]] = ContextVar("current_database", default=None)
+
+_collections: LRUCache[tuple[str, str], AsyncCollection] = LRUCache(maxsize=4096)
+
+
+def get_current_database() -> Optional[AsyncDatabase]:
+    return _current_database.get()
+
+
+def set_current_database(database: Optional[AsyncDatabase]) -> Token:
+    """Route the current context to the given database. Returns a token to restore the previous value."""
+    return _current_database.set(database)
+
+
+def reset_current_database(token: Token) -> None:
+    _current_database.reset(token)
+
+
+def get_collection(database: AsyncDatabase, name: str) -> AsyncCollection:
+    """Return a (cached) collection handle for the given database. All handles share the client's connection pool."""
+    key = (database.name, name)
+    collection = _collections.get(key)
+    if collection is None or collection.database is not database:
+        collection = database.get_collection(name)
+        _collections.set(key, collection)
+    return collection
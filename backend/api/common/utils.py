@@ -9,7 +9,6 @@ from fastapi import logger
 
 from api.common.exceptions import InvalidOperationException
 from api.core.config import settings
-from api.domain.dtos.audit_logs_dto import AuditLogDto
 
 
 def get_utc_now():
@@ -110,18 +109,6 @@ def create_temp_file(file_name: str) -> Path:
     return path
 
 
-async def capture_audit_log(
-    log_data: AuditLogDto
-) -> None:
-    """Capture an audit log entry."""
-    file_name = f"audit_logs_for{log_data.tenant_id if log_data.tenant_id else 'host'}_{get_utc_now().strftime('%Y%m%d')}.jsonl"
-    
-    file_path = create_temp_file(file_name)
-
-    with open(file_path, "a") as f:
-        f.write(log_data.model_dump_json() + "\n")
-    
-
 def get_sso_redirect_uri(provider_name: str, domain: Optional[str] = None) -> str:
     local_domain = domain if domain else get_host_main_domain_name()
     if settings.fastapi_env == "production":
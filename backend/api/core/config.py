@@ -1,4 +1,5 @@
 
+from typing import Literal
 from dotenv import load_dotenv
 from pydantic import EmailStr, ConfigDict
 from pydantic_settings import BaseSettings
@@ -13,12 +14,52 @@ class Settings(BaseSettings):
     )
     mongo_uri: str = "mongodb://localhost:27017"
     mongo_db_name: str = "myapp"
+    tenant_db_registry_size: int = 256 # Number of tenant databases kept initialized per worker
+
+    # In-process cache for tenant lookups (by id, subdomain and custom domain)
+    tenant_cache_size: int = 1024
+    tenant_cache_ttl: int = 30 # seconds, bounds staleness if a tenant invalidation message is missed
+    tenant_cache_negative_ttl: int = 10 # seconds, for hosts that don't belong to any tenant
 
     jwt_secret: str
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7 * 24 * 60 * 60
-
-    algorithm: str = "HS256"
+    refresh_token_max_sessions: int = 10 # refresh token families per user, a new login revokes the oldest beyond this
+
+    # Opt-in: authorize requests from verified access token claims (permission bitmask, role version and
+    # profile) instead of loading the user and role on every request. Role changes take effect immediately,
+    # changes to the user itself (role reassignment, deactivation) once the access token expires.
+    stateless_auth_enabled: bool = False
+    role_version_store_ttl: int = 24 * 60 * 60 # seconds
+    role_cache_enabled: bool = True
+    role_cache_max_entries: int = 1024
+    role_cache_ttl: int = 300 # seconds, bounds staleness if a role invalidation message is missed
+
+    list_count_strategy: Literal["exact", "estimated", "cached"] = "exact" # how list and dashboard totals are counted, see BaseRepository.count
+    count_cache_ttl: int = 10 # seconds a cached count is reused for
+    audit_log_backend: Literal["mongo", "file"] = "mongo" # mongo: audit_logs collection of the host database, file: daily segments in audit_log_dir
+    audit_log_dir: str = "/tmp/audit_logs" # segments of the file backend
+    audit_log_report_max_attachment_size: int = 10 * 1024 * 1024 # larger reports are uploaded and linked instead of attached
+    audit_log_report_link_ttl: int = 7 * 24 * 3600 # seconds the report download link is valid
+    audit_log_count_cache_ttl: int = 60 # seconds an audit log total is reused for
+    audit_log_queue_size: int = 10_000 # audit logs waiting to be written, beyond this the overflow policy applies
+    audit_log_batch_size: int = 500
+    audit_log_flush_interval: float = 1.0 # seconds
+    audit_log_overflow_policy: Literal["block", "drop", "spill"] = "spill" # block (wait for room), drop, or spill (to audit_log_spill_path, replayed later)
+    audit_log_spill_path: str = "/tmp/audit_logs_spill.jsonl"
+    audit_read_include: list[str] = ["/api/v1/*"] # GET paths (fnmatch patterns) recorded as read audit logs
+    audit_read_exclude: list[str] = ["/api/v1/health*", "/api/v1/app_configuration*"]
+    audit_read_sample_rates: dict[str, float] = {} # fraction of reads recorded per entity (User, Role, Tenant, AuditLog)
+    audit_read_default_sample_rate: float = 1.0
+    audit_read_dedup_window: int = 60 # seconds identical reads of a user are recorded once, 0 disables it
+
+    password_hasher_workers: int = 4 # threads hashing passwords, more concurrent logins wait for a free one
+
+    jwt_verified_cache_size: int = 4096 # verified access tokens kept per worker, repeat checks skip signature verification
+
+    algorithm: str = "HS256" # or EdDSA/ES256 to sign access tokens with the keys in jwt_keys_dir, published at /.well-known/jwks.json
+    jwt_keys_dir: str | None = None # <kid>.pem private keys, <kid>.pub.pem verification-only keys
+    jwt_active_kid: str | None = None # key id signing new access tokens
     refresh_algorithm: str = "HS512"
     refresh_token_secret: str
 
@@ -36,6 +77,16 @@ class Settings(BaseSettings):
     host_main_domain_prefix: str = "demo"  # Prefix for subdomains, e.g., demo.fsrapp.com. Change as needed.
 
     redis_uri: str = "redis://localhost:6372"
+
+    # Optional per-worker in-process cache (L1) in front of the Redis response cache
+    response_cache_l1_enabled: bool = False
+    response_cache_l1_max_entries: int = 1024
+    response_cache_l1_max_bytes: int = 32 * 1024 * 1024
+    response_cache_l1_ttl: int = 30 # seconds, bounds staleness if an invalidation message is missed
+    response_cache_compression_min_size: int = 1024 # bytes, smaller bodies are stored uncompressed
+    response_cache_ttl_jitter: float = 0.1 # fraction of the TTL removed at random so keys stored together don't expire together
+    response_cache_stale_ttl: int = 0 # seconds a stale entry is still served while it is refreshed, 0 disables
+    response_cache_lock_timeout_ms: int = 5000 # how long a request may hold the lock to fill a cache key
     celery_result_backend: str = "redis://localhost:6372/0"
     celery_broker_url: str = "redis://localhost:6372/0"
 
@@ -1,15 +1,23 @@
 import inspect
 from typing import Callable, Type, TypeVar
 import punq
+from api.common.audit_log_writer import audit_log_writer
 from api.common.audit_logs_repository import AuditLogRepository
+from api.common.cache_events import cache_invalidation_bus
+from api.common.count_cache import count_cache
+from api.domain.interfaces.audit_log_store import IAuditLogStore
 from api.domain.interfaces.email_service import IEmailService
+from api.infrastructure.caching.response_cache import ResponseCache, response_cache
 from api.infrastructure.externals.coolify_app import CoolifyApp
 from api.infrastructure.externals.dns_resolver import DnsResolver
 from api.infrastructure.externals.smtp_email import SmtpEmail
 
 from api.infrastructure.externals.sso_auth_provider import SSOAuthProvider
 from api.infrastructure.externals.stripe_resolver import StripeResolver
+from api.core.config import settings
 from api.infrastructure.persistence.repositories.branding_repository_impl import BrandingRepository
+from api.infrastructure.persistence.repositories.file_audit_log_store_impl import FileAuditLogStore
+from api.infrastructure.persistence.repositories.mongo_audit_log_store_impl import MongoAuditLogStore
 from api.infrastructure.persistence.repositories.chat_history_ai_repository_impl import ChatHistoryAIRepository
 from api.infrastructure.persistence.repositories.chat_session_ai_repository_impl import ChatSessionAIRepository
 from api.infrastructure.persistence.repositories.payment_repository_impl import PaymentRepository, StripeSettingsRepository
@@ -28,6 +36,9 @@ from api.infrastructure.persistence.repositories.notification_banner_repository_
 
 from api.infrastructure.security.jwt_token_service import JwtTokenService
 from api.infrastructure.security.passkey_service import PasskeyService
+from api.infrastructure.security.refresh_token_store import RefreshTokenStore, refresh_token_store
+from api.infrastructure.security.role_cache import RoleCache, role_cache
+from api.infrastructure.security.role_version_store import RoleVersionStore, role_version_store
 from api.usecases.audit_logs_service import AuditLogsService
 from api.usecases.billing_record_service import BillingRecordService
 from api.usecases.branding_service import BrandingService
@@ -65,6 +76,8 @@ container.register(IEmailService, SmtpEmail, scope=punq.Scope.singleton)
 
 ## JWT Token Service
 container.register(JwtTokenService, scope=punq.Scope.singleton)
+container.register(RefreshTokenStore, instance=refresh_token_store)
+cache_invalidation_bus.subscribe(refresh_token_store.on_resource_changed)
 
 
 ## Passkey Components
@@ -79,6 +92,13 @@ container.register(EmailMagicLinkService, scope=punq.Scope.singleton)
 
 # Register infra components
 
+## Response cache, kept in sync with repository writes
+container.register(ResponseCache, instance=response_cache)
+cache_invalidation_bus.subscribe(response_cache.on_resource_changed)
+
+## Document counts, evicted on repository writes
+cache_invalidation_bus.subscribe(count_cache.on_resource_changed)
+
 ## DNS Resolver
 container.register(DnsResolver, scope=punq.Scope.singleton)
 
@@ -104,6 +124,10 @@ container.register(UserPreferenceService, scope=punq.Scope.singleton)
 
 ## Role
 container.register(RoleRepository)
+container.register(RoleVersionStore, instance=role_version_store)
+cache_invalidation_bus.subscribe(role_version_store.on_resource_changed)
+container.register(RoleCache, instance=role_cache)
+cache_invalidation_bus.subscribe(role_cache.on_resource_changed)
 container.register(RoleService, scope=punq.Scope.singleton)
 
 ## Auth service
@@ -144,6 +168,11 @@ container.register(NotificationBannerService, scope=punq.Scope.singleton)
 
 ## Audit Log Components
 container.register(AuditLogRepository, scope=punq.Scope.singleton)
+if settings.audit_log_backend == "mongo":
+    container.register(IAuditLogStore, MongoAuditLogStore, scope=punq.Scope.singleton)
+else:
+    container.register(IAuditLogStore, FileAuditLogStore, scope=punq.Scope.singleton)
+audit_log_writer.use_store(container.resolve(IAuditLogStore))
 container.register(AuditLogsService, scope=punq.Scope.singleton)
 
 
@@ -34,9 +34,11 @@ class TenantListDto(BaseModel):
     tenants: List[TenantDto]
     skip: int
     limit: int
-    total: int
+    total: Optional[int] = None # None when not requested (include_total=false)
+    total_is_exact: bool = True # False when the total is estimated or may be a few seconds old
     has_previous: bool
     has_next: bool
+    next_cursor: Optional[str] = None # pass as `cursor` to get the next page
 
 
 class CreateTenantResponseDto(BaseModel):
@@ -2,7 +2,9 @@ from datetime import datetime
 from typing import Optional
 from beanie import Document, PydanticObjectId
 from pydantic import field_serializer
+from pymongo.asynchronous.collection import AsyncCollection
 
+from api.common.tenant_context import get_collection, get_current_database
 from api.common.utils import get_utc_now
 
 
@@ -11,6 +13,17 @@ class ApiBaseModel(Document):
     updated_at: datetime = get_utc_now()
     tenant_id: Optional[PydanticObjectId] = None
 
+    @classmethod
+    def get_pymongo_collection(cls) -> AsyncCollection:
+        """
+            Resolve the collection from the database the current request is routed to.
+            Falls back to the globally bound database when no routing is active (e.g. Celery tasks, seeding).
+        """
+        database = get_current_database()
+        if database is None:
+            return super().get_pymongo_collection()
+        return get_collection(database, cls.get_collection_name())
+
     # Todo: Remove all the to_serializable_dict methods and use field_serializers instead
     # @field_serializer("created_at", "updated_at", "tenant_id")
     # def serialize_object_id(self, value):
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from beanie import Document, Granularity, TimeSeriesConfig
+from pymongo import DESCENDING, IndexModel
+
+
+class AuditLog(Document):
+    """Audit logs of all tenants, stored in the host database (time series collection)."""
+    entity: str
+    action: str
+    changes: Dict[str, Any] = {}
+    user_id: Optional[str] = None
+    tenant_id: Optional[str] = None
+    timestamp: datetime
+
+    class Settings:
+        name = "audit_logs"
+        timeseries = TimeSeriesConfig(
+            time_field="timestamp",
+            meta_field="tenant_id",
+            granularity=Granularity.seconds,
+        )
+        indexes = [
+            IndexModel([("tenant_id", 1), ("timestamp", DESCENDING)]),
+            IndexModel([("tenant_id", 1), ("action", 1), ("timestamp", DESCENDING)]),
+        ]
@@ -7,6 +7,7 @@ class Role(ApiBaseModel):
     name: str = Indexed(str, unique=True)
     description: Optional[str] | None
     permissions: List[Permission] = [Permission.USER_VIEW_ONLY, Permission.ROLE_VIEW_ONLY]
+    version: int = 0 # Incremented on every update, access tokens carry it to detect outdated permissions
 
     async def to_serializable_dict(self):
         base_doc = await super().to_serializable_dict()
@@ -1,5 +1,5 @@
-
 from enum import Enum
+from typing import Iterable
 
 
 class Permission(str, Enum):
@@ -29,4 +29,38 @@ class Permission(str, Enum):
     MANAGE_PRODUCTS_AND_PRICING = "manage:products_and_pricing"
 
     AUDIT_LOGS_VIEW_ONLY = "audit_logs:view_only"
-    AUDIT_LOGS_DOWNLOAD = "audit_logs:download"
\ No newline at end of file
+    AUDIT_LOGS_DOWNLOAD = "audit_logs:download"
+
+# Bit of each permission in the `perm_mask` access token claim.
+# Bits are part of issued tokens: never reuse or renumber them, only append new ones.
+PERMISSION_BITS: dict[Permission, int] = {
+    Permission.FULL_ACCESS: 0,
+    Permission.USER_READ_AND_WRITE_ONLY: 1,
+    Permission.USER_DELETE_ONLY: 2,
+    Permission.USER_SELF_READ_AND_WRITE_ONLY: 3,
+    Permission.USER_ROLE_ASSIGN_OR_REMOVE_ONLY: 4,
+    Permission.USER_VIEW_ONLY: 5,
+    Permission.ROLE_VIEW_ONLY: 6,
+    Permission.ROLE_READ_AND_WRITE_ONLY: 7,
+    Permission.ROLE_DELETE_ONLY: 8,
+    Permission.ROLE_PERMISSION_READ_AND_WRITE_ONLY: 9,
+    Permission.HOST_MANAGE_TENANTS: 10,
+    Permission.MANAGE_STORAGE_SETTINGS: 11,
+    Permission.MANAGE_TENANT_SETTINGS: 12,
+    Permission.MANAGE_BILLING: 13,
+    Permission.MANAGE_PAYMENTS_SETTINGS: 14,
+    Permission.MANAGE_PRODUCTS_AND_PRICING: 15,
+    Permission.AUDIT_LOGS_VIEW_ONLY: 16,
+    Permission.AUDIT_LOGS_DOWNLOAD: 17,
+}
+
+
+def permissions_to_mask(permissions: Iterable[Permission]) -> int:
+    mask = 0
+    for permission in permissions:
+        mask |= 1 << PERMISSION_BITS[Permission(permission)]
+    return mask
+
+
+def permissions_from_mask(mask: int) -> list[Permission]:
+    return [permission for permission, bit in PERMISSION_BITS.items() if mask & (1 << bit)]
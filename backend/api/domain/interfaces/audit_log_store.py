@@ -0,0 +1,27 @@
+from abc import abstractmethod
+from typing import AsyncIterator, Optional, Protocol, Sequence
+
+from api.domain.dtos.audit_logs_dto import AuditActionType, AuditLogDto, AuditLogListDto
+
+
+class IAuditLogStore(Protocol):
+    @abstractmethod
+    async def append(self, logs: Sequence[AuditLogDto]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list(
+            self,
+            tenant_id: Optional[str] = None,
+            limit: int = 10,
+            skip: int = 0,
+            action: Optional[AuditActionType] = None,
+            cursor: Optional[str] = None
+        ) -> AuditLogListDto:
+        """Newest first. With a cursor (`next_cursor` of the previous page) the page starts after it and `skip` is ignored."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def iterate(self, tenant_id: Optional[str] = None, action: Optional[AuditActionType] = None) -> AsyncIterator[AuditLogDto]:
+        """All audit logs of a tenant, newest first."""
+        raise NotImplementedError
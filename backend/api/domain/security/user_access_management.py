@@ -1,4 +1,4 @@
-from typing import List
+from typing import AbstractSet, List
 from api.common.exceptions import ForbiddenException
 from api.common.utils import get_logger, is_tenancy_enabled
 from api.core.container import get_role_service
@@ -38,7 +38,7 @@ class UserAccessManagement:
             return False
         return current_user.id == resource_id
     
-    async def has_permission(self, user_permissions: List[Permission], required_permissions: List[Permission]) -> bool:
+    async def has_permission(self, user_permissions: AbstractSet[Permission], required_permissions: List[Permission]) -> bool:
         """Check if user has required permissions"""
         if self.any_permission:
             # User needs ANY of the required permissions
@@ -58,8 +58,8 @@ class UserAccessManagement:
                 logger.info("User has no role assigned")
                 raise ForbiddenException(f"No role assigned. Required. Please contact support.")
             
-            role = await self.get_role_detail(current_user.role_id)
-            user_permissions = role.permissions
+            # Permission set precomputed with the cached role, shared by every request of this worker
+            user_permissions = await get_role_service().get_role_permissions(str(current_user.role_id))
             
             logger.info(f"User permissions: {[p.value if hasattr(p, 'value') else str(p) for p in user_permissions]}")
             logger.info(f"Required permissions: {[p.value if hasattr(p, 'value') else str(p) for p in self.required_permissions]}")
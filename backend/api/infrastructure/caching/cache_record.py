@@ -0,0 +1,101 @@
+import gzip
+import struct
+import time
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+# Binary cache record:
+#   fixed header  magic "RC", version, body encoding, status code, fresh until (unix time, 0 = no limit),
+#                 length of the header block
+#   header block  latin-1 lines, the media type first then "name: value" response headers
+#   body          raw (or gzip compressed) response body
+_MAGIC = b"RC"
+_VERSION = 2
+_FIXED_HEADER = struct.Struct("!2sBBHdI")
+
+_ENCODINGS = {None: 0, "gzip": 1}
+_ENCODING_NAMES = {code: name for name, code in _ENCODINGS.items()}
+
+
+class InvalidCacheRecord(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    status: int
+    media_type: str
+    headers: dict[str, str] = field(default_factory=dict)
+    encoding: Optional[str] = None  # Content-Encoding of `body`, None when it is not compressed
+    fresh_until: Optional[float] = None  # Unix time after which the entry is stale, None when it never is
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.fresh_until is None or time.time() < self.fresh_until
+
+    def compress(self, min_size: int, level: int = 5) -> "CachedResponse":
+        """Gzip the body when it is at least `min_size` bytes and compression actually saves space."""
+        if self.encoding is not None or len(self.body) < min_size:
+            return self
+        compressed = gzip.compress(self.body, compresslevel=level, mtime=0)
+        if len(compressed) >= len(self.body):
+            return self
+        return replace(self, body=compressed, encoding="gzip")
+
+    def decompressed_body(self) -> bytes:
+        if self.encoding == "gzip":
+            return gzip.decompress(self.body)
+        return self.body
+
+
+def encode_record(cached: CachedResponse) -> bytes:
+    lines = [cached.media_type, *(f"{name}: {value}" for name, value in cached.headers.items())]
+    header_block = "\n".join(lines).encode("latin-1")
+    fixed = _FIXED_HEADER.pack(
+        _MAGIC,
+        _VERSION,
+        _ENCODINGS[cached.encoding],
+        cached.status,
+        cached.fresh_until or 0.0,
+        len(header_block),
+    )
+    return b"".join((fixed, header_block, cached.body))
+
+
+def decode_record(data: bytes) -> CachedResponse:
+    """Parse a record written by `encode_record`. Raises InvalidCacheRecord for anything else."""
+    if len(data) < _FIXED_HEADER.size:
+        raise InvalidCacheRecord("Cache record is truncated")
+    magic, version, encoding, status, fresh_until, header_length = _FIXED_HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION or encoding not in _ENCODING_NAMES:
+        raise InvalidCacheRecord("Unknown cache record format")
+    body_start = _FIXED_HEADER.size + header_length
+    media_type, *header_lines = data[_FIXED_HEADER.size:body_start].decode("latin-1").split("\n")
+    headers = dict(line.split(": ", 1) for line in header_lines)
+    return CachedResponse(
+        body=data[body_start:],
+        status=status,
+        media_type=media_type,
+        headers=headers,
+        encoding=_ENCODING_NAMES[encoding],
+        fresh_until=fresh_until or None,
+    )
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header value allows gzip (honours q=0)."""
+    if not accept_encoding:
+        return False
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
@@ -0,0 +1,36 @@
+import hashlib
+from typing import Optional
+
+_GZIP_SUFFIX = "-gzip"
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag of an (uncompressed) response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def gzip_etag(etag: str) -> str:
+    """ETag of the gzip encoded representation. It must differ from the identity one to stay a strong validator."""
+    return f'{etag[:-1]}{_GZIP_SUFFIX}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    etag = etag.strip()
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    if etag.endswith(f'{_GZIP_SUFFIX}"'):
+        etag = f'{etag[:-len(_GZIP_SUFFIX) - 1]}"'
+    return etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+        If-None-Match uses the weak comparison. Encodings of the same body match each other, the client
+        only needs to know whether the content it already has is still current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == current for candidate in if_none_match.split(","))
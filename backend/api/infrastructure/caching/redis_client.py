@@ -0,0 +1,7 @@
+from redis.asyncio import Redis, from_url
+
+from api.core.config import settings
+
+# Shared client for the HTTP response cache. One connection pool per worker.
+# Values are binary cache records, so responses are not decoded.
+redis: Redis = from_url(url=settings.redis_uri, decode_responses=False)
@@ -0,0 +1,308 @@
+import asyncio
+import contextlib
+import json
+import random
+import time
+import uuid
+from dataclasses import replace
+from typing import Iterable, Optional
+
+from bson import ObjectId
+from redis.asyncio import Redis
+
+from api.common.cache_events import ResourceChanged
+from api.common.lru_cache import LRUCache
+from api.common.utils import get_logger
+from api.core.config import settings
+from api.infrastructure.caching.cache_record import CachedResponse, InvalidCacheRecord, decode_record, encode_record
+from api.infrastructure.caching.redis_client import redis
+
+logger = get_logger(__name__)
+
+# Deletes the given entries (KEYS after the first ARGV[2] tag sets) and removes them from the tag sets, atomically.
+# Every key the script touches is passed in KEYS (the members are read with SMEMBERS beforehand), as Redis requires
+# for routing in cluster mode. Entries registered after the read stay in their tag set, a set left empty is deleted.
+# UNLINK frees memory in the background so large tag sets don't block the server.
+# When a channel is given (ARGV[1]) the deleted keys are published so in-process caches can drop them too.
+_INVALIDATE_TAGS_SCRIPT = """
+local tag_count = tonumber(ARGV[2])
+local keys = {}
+for i = tag_count + 1, #KEYS do
+    table.insert(keys, KEYS[i])
+end
+for i = 1, #keys, 512 do
+    local last = math.min(i + 511, #keys)
+    redis.call('UNLINK', unpack(keys, i, last))
+    for tag = 1, tag_count do
+        redis.call('SREM', KEYS[tag], unpack(keys, i, last))
+    end
+end
+if #keys > 0 and ARGV[1] ~= '' then
+    redis.call('PUBLISH', ARGV[1], cjson.encode(keys))
+end
+return #keys
+"""
+
+
+def tenant_scope(tenant_id: Optional[object]) -> str:
+    """Cache scope name of a tenant. The host (no tenant) has its own scope."""
+    return str(tenant_id) if tenant_id else "host"
+
+
+def user_tag(user_id: object, tenant_id: Optional[object]) -> str:
+    return f"cache:tag:user:{tenant_scope(tenant_id)}:{user_id}"
+
+
+def tenant_tag(tenant_id: Optional[object]) -> str:
+    return f"cache:tag:tenant:{tenant_scope(tenant_id)}"
+
+
+def role_tag(tenant_id: Optional[object], role_id: Optional[object]) -> str:
+    """Cached responses shared by the users of a role (tenant scoped cache policy)."""
+    return f"cache:tag:role:{tenant_scope(tenant_id)}:{role_id}"
+
+
+def resource_tag(tenant_id: Optional[object], resource: str) -> str:
+    """All cached responses of a resource."""
+    return f"cache:tag:res:{tenant_scope(tenant_id)}:{resource}"
+
+
+def resource_list_tag(tenant_id: Optional[object], resource: str) -> str:
+    """Cached responses of a resource that are not about a single entity (lists, searches)."""
+    return f"{resource_tag(tenant_id, resource)}:list"
+
+
+def resource_entity_tag(tenant_id: Optional[object], resource: str, entity_id: str) -> str:
+    return f"{resource_tag(tenant_id, resource)}:id:{entity_id}"
+
+
+# Releases a lock only if it is still held by the given owner.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+# Route prefixes of the resources whose repositories publish ResourceChanged events.
+cached_resources: dict[str, str] = {
+    "/api/v1/users": "users",
+    "/api/v1/roles": "roles",
+    "/api/v1/brandings": "brandings",
+    "/api/v1/tenants": "tenants",
+}
+
+
+def match_resource(path: str) -> Optional[tuple[str, Optional[str]]]:
+    """
+        Map a request path to (resource, entity_id).
+        `/api/v1/users/<id>/...` is about one entity, any other path under the prefix is a list.
+        Returns None for paths that don't belong to a cached resource.
+    """
+    for prefix, resource in cached_resources.items():
+        if path == prefix or path.startswith(prefix + "/"):
+            segment = path[len(prefix):].strip("/").split("/", 1)[0]
+            return resource, segment if ObjectId.is_valid(segment) else None
+    return None
+
+
+def resource_tags(tenant_id: Optional[object], resource: str, entity_id: Optional[str]) -> tuple[str, ...]:
+    """Tags a cached response of the given resource is registered in."""
+    if entity_id is None:
+        return resource_tag(tenant_id, resource), resource_list_tag(tenant_id, resource)
+    return resource_tag(tenant_id, resource), resource_entity_tag(tenant_id, resource, entity_id)
+
+
+def _lock_key(key: str) -> str:
+    return f"cache:lock:{key}"
+
+
+class ResponseCache:
+    """
+        Redis backed cache of HTTP responses.
+        Every entry is registered in one or more tag sets (per user, per tenant) so a group of
+        entries can be invalidated without scanning the keyspace.
+
+        Optionally an in-process LRU (L1) sits in front of Redis. It is kept coherent through
+        the invalidation channel: every invalidation publishes the deleted keys and each worker
+        drops them from its L1. L1 entries also expire after a short TTL, which bounds staleness
+        if an invalidation message is missed.
+
+        Entries are stored as binary records (see cache_record), with bodies of at least
+        `compression_min_size` bytes gzip compressed. Both tiers keep the compressed body.
+
+        TTLs are shortened by a random fraction (up to `ttl_jitter`) so entries stored together
+        don't expire together. With a `stale_ttl`, entries are kept that much longer than they are
+        fresh so a stale copy can be served while one request refreshes it.
+    """
+    invalidation_channel = "cache:invalidations"
+
+    def __init__(
+            self,
+            client: Redis,
+            l1_enabled: bool = False,
+            l1_max_entries: int = 1024,
+            l1_max_bytes: int = 32 * 1024 * 1024,
+            l1_ttl: int = 30,
+            compression_min_size: int = 1024,
+            ttl_jitter: float = 0.0,
+            stale_ttl: int = 0,
+        ):
+        self.client = client
+        self.compression_min_size = compression_min_size
+        self.ttl_jitter = ttl_jitter
+        self.stale_ttl = stale_ttl
+        self._invalidate_script = client.register_script(_INVALIDATE_TAGS_SCRIPT)
+        self._release_lock_script = client.register_script(_RELEASE_LOCK_SCRIPT)
+        self.l1_ttl = l1_ttl
+        self.l1: Optional[LRUCache[str, CachedResponse]] = LRUCache(
+            maxsize=l1_max_entries,
+            ttl=l1_ttl,
+            maxweight=l1_max_bytes,
+            weigher=lambda cached: len(cached.body),
+        ) if l1_enabled else None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start listening for invalidations of other workers. Only needed when the L1 is enabled."""
+        if self.l1 is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        if self.l1 is not None:
+            cached = self.l1.get(key)
+            if cached is not None:
+                return cached
+
+        value = await self.client.get(key)
+        if value is None:
+            return None
+        try:
+            cached = decode_record(value)
+        except InvalidCacheRecord:
+            # Written by an older version, treat it as a miss. It gets overwritten on the next store.
+            return None
+        if self.l1 is not None:
+            self.l1.set(key, cached)
+        return cached
+
+    async def set(self, key: str, cached: CachedResponse, ttl: int, tags: Iterable[str]) -> CachedResponse:
+        """Store an entry and register it in the given tags, in a single round trip. Returns the stored entry."""
+        fresh_ttl = max(1, round(ttl * (1 - random.uniform(0, self.ttl_jitter))))
+        cached = replace(
+            cached.compress(self.compression_min_size),
+            fresh_until=time.time() + fresh_ttl if self.stale_ttl else None,
+        )
+        value = encode_record(cached)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(key, value, ex=fresh_ttl + self.stale_ttl)
+            for tag in tags:
+                pipe.sadd(tag, key)
+                # Tag sets live as long as their longest lived entry. Members of expired entries are
+                # harmless, UNLINK skips keys that no longer exist.
+                pipe.expire(tag, ttl + self.stale_ttl, nx=True)
+                pipe.expire(tag, ttl + self.stale_ttl, gt=True)
+            await pipe.execute()
+        if self.l1 is not None:
+            self.l1.set(key, cached, ttl=min(fresh_ttl, self.l1_ttl))
+        return cached
+
+    async def acquire_lock(self, key: str, timeout_ms: int) -> Optional[str]:
+        """Try to become the only request filling `key`. Returns the owner token, None when someone else holds it."""
+        token = uuid.uuid4().hex
+        if await self.client.set(_lock_key(key), token, nx=True, px=timeout_ms):
+            return token
+        return None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self._release_lock_script(keys=[_lock_key(key)], args=[token])
+
+    async def is_locked(self, key: str) -> bool:
+        return bool(await self.client.exists(_lock_key(key)))
+
+    async def invalidate(self, *tags: str) -> int:
+        """Delete all entries registered in the given tags. Returns the number of invalidated entries."""
+        if not tags:
+            return 0
+        async with self.client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.smembers(tag)
+            members = await pipe.execute()
+        keys = sorted({key.decode() for tag_members in members for key in tag_members})
+        if not keys:
+            return 0
+        channel = self.invalidation_channel if self.l1 is not None else ""
+        await self._invalidate_script(keys=[*tags, *keys], args=[channel, len(tags)])
+        # Drop them locally right away, the published message arrives asynchronously.
+        self._evict_l1(keys)
+        logger.debug(f"Invalidated {len(keys)} cache entries for tags: {tags}")
+        return len(keys)
+
+    async def invalidate_user(self, user_id: object, tenant_id: Optional[object]) -> int:
+        return await self.invalidate(user_tag(user_id, tenant_id))
+
+    async def invalidate_tenant(self, tenant_id: Optional[object]) -> int:
+        return await self.invalidate(tenant_tag(tenant_id))
+
+    async def on_resource_changed(self, event: ResourceChanged) -> None:
+        """
+            Evict the responses affected by a change: the lists of the resource and the responses
+            about the changed entity. Without an entity every response of the resource is evicted.
+        """
+        if event.entity_id is None:
+            await self.invalidate(resource_tag(event.tenant_id, event.resource))
+            return
+        tags = [
+            resource_list_tag(event.tenant_id, event.resource),
+            resource_entity_tag(event.tenant_id, event.resource, event.entity_id),
+        ]
+        if event.resource == "roles":
+            # Responses shared by the users of the role were produced with its previous permissions
+            tags.append(role_tag(event.tenant_id, event.entity_id))
+        elif event.resource == "tenants":
+            # Everything served in the tenant may depend on it (features, status, domains)
+            tags.append(tenant_tag(event.entity_id))
+        await self.invalidate(*tags)
+
+    def _evict_l1(self, keys: Iterable[str]) -> None:
+        if self.l1 is None:
+            return
+        for key in keys:
+            self.l1.pop(key)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.invalidation_channel)
+                    # Invalidations may have been missed while (re)connecting.
+                    self.l1.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._evict_l1(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener disconnected, retrying: {e}")
+                self.l1.clear()
+                await asyncio.sleep(1)
+
+
+response_cache = ResponseCache(
+    redis,
+    l1_enabled=settings.response_cache_l1_enabled,
+    l1_max_entries=settings.response_cache_l1_max_entries,
+    l1_max_bytes=settings.response_cache_l1_max_bytes,
+    l1_ttl=settings.response_cache_l1_ttl,
+    compression_min_size=settings.response_cache_compression_min_size,
+    ttl_jitter=settings.response_cache_ttl_jitter,
+    stale_ttl=settings.response_cache_stale_ttl,
+)
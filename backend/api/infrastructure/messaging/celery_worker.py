@@ -1,6 +1,6 @@
 import asyncio
-from io import BytesIO
 import os
+import tempfile
 from typing import Dict
 from celery import Celery
 
@@ -156,7 +156,7 @@ async def _update_tenant_custom_domain_status(tenant_id: str, status: str):
     
     tenant = await tenant_service.get_tenant_by_id(tenant_id=tenant_id)
     tenant.custom_domain_status = status
-    await tenant.save()
+    await tenant_service.save_tenant(tenant)
     await db.close()
     
     if status == "active":
@@ -196,38 +196,23 @@ async def _handle_download_report_shared_task_async(payload: str):
         else:
             db = await _get_current_tenant_db(tenant_id=ct_id)
 
-        user_service: UserService = get_user_service()
-        audit_log_service: AuditLogsService = get_audit_logs_service()
-        requesting_user: User = await user_service.get_user_by_id(user_id=worker_payload.data["requested_by"])
-        from openpyxl import Workbook
-        from api.common.utils import get_utc_now
-        attachment_file_name = f"audit_logs_report_{ct_id or 'host_'}{get_utc_now().strftime('%Y-%m-%d_%H-%M-%S')}.xlsx"
-
-        res = await audit_log_service.generate_audit_logs_download(action=worker_payload.data.get("action", None), tenant_id=ct_id)
-        # Create Excel workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"Audit Logs Report from {ct_id or 'host_'} on {get_utc_now().strftime('%Y-%m-%d')}"
-        ws.append(["Timestamp", "Tenant", "User", "Action", "Entity", "Changes"])
-        for log in res:
-            ws.append([
-                log.timestamp,
-                log.tenant_id or "host",
-                log.user_id,
-                log.action,
-                log.entity,
-                str(log.changes)
-            ])
-        # Save workbook to a temporary file
-        buffer = BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-        logger.info(f"Completed download report email sending for tenant_id: {ct_id}")
-        logger.info(f"Sending audit log report to email: {requesting_user.email}")
-        await audit_log_service.send_audit_log_report_via_email(
-            to_email=requesting_user.email,
-            first_name=requesting_user.first_name,
-            attachment_data=buffer,
-            attachment_filename=attachment_file_name
-        )
-        await db.close()
\ No newline at end of file
+        try:
+            user_service: UserService = get_user_service()
+            audit_log_service: AuditLogsService = get_audit_logs_service()
+            requesting_user: User = await user_service.get_user_by_id(user_id=worker_payload.data["requested_by"])
+            from api.common.utils import get_utc_now
+            attachment_file_name = f"audit_logs_report_{ct_id or 'host_'}{get_utc_now().strftime('%Y-%m-%d_%H-%M-%S')}.xlsx"
+
+            # The workbook is streamed to a temporary file, removed once the report is sent (or failed)
+            with tempfile.TemporaryFile(suffix=".xlsx") as report:
+                rows = await audit_log_service.export_audit_logs(report, action=worker_payload.data.get("action", None), tenant_id=ct_id)
+                logger.info(f"Completed download report of {rows} audit logs for tenant_id: {ct_id}")
+                logger.info(f"Sending audit log report to email: {requesting_user.email}")
+                await audit_log_service.send_audit_log_report_via_email(
+                    to_email=requesting_user.email,
+                    first_name=requesting_user.first_name,
+                    attachment_data=report,
+                    attachment_filename=attachment_file_name
+                )
+        finally:
+            await db.close()
\ No newline at end of file
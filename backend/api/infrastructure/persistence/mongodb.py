@@ -1,10 +1,14 @@
+import asyncio
 from typing import Sequence
 from pymongo import AsyncMongoClient
 from pymongo.asynchronous.database import AsyncDatabase
 from beanie import Document, UnionDoc, View, init_beanie
+from api.common.lru_cache import LRUCache
+from api.common.tenant_context import reset_current_database, set_current_database
 from api.common.utils import get_logger
 from api.core.config import settings
 from api.domain.entities.ai import ChatHistoryAI, ChatSessionAI
+from api.domain.entities.audit_log import AuditLog
 from api.domain.entities.branding import Branding
 from api.domain.entities.notification_settings import NotificationBannerSetting
 from api.domain.entities.role import Role
@@ -37,40 +41,142 @@ models = [
     SubscriptionPlan,
     NotificationBannerSetting,
     SSOSettings,
-    Branding
+    Branding,
+    AuditLog
 ]
+# Models that only live in the host database
+host_only_models = (Tenant, AuditLog)
+class TenantDatabaseRegistry:
+    """
+        Keeps track of the databases whose Beanie models and indexes have already been initialized.
+        The first request for a database runs `init_beanie` (collection and index creation checks),
+        later requests only rebind the models to the cached database handle.
+    """
+    def __init__(self, maxsize: int = settings.tenant_db_registry_size):
+        self._databases: LRUCache[str, AsyncDatabase] = LRUCache(maxsize=maxsize)
+
+    def get(self, db_name: str) -> AsyncDatabase | None:
+        return self._databases.get(db_name)
+
+    def add(self, db_name: str, db: AsyncDatabase) -> None:
+        self._databases.set(db_name, db)
+
+    def remove(self, db_name: str) -> None:
+        self._databases.pop(db_name)
+
+    def clear(self) -> None:
+        self._databases.clear()
+
+
 class Database:
     def __init__(self, uri: str, models: Sequence[type[Document] | type[UnionDoc] | type[View] | str] | None = None) -> None:
         self.client = AsyncMongoClient(uri)
         self.models = models
+        self.registry = TenantDatabaseRegistry()
+        self._init_lock = asyncio.Lock()
+        self.db: AsyncDatabase | None = None
+        # Whether init_beanie ran for the host only models on the host database, see _bind_host_only_models
+        self._host_only_models_initialized = False
         logger.debug("Database initializing...")
         self.is_tenant = False
         
     
     async def init_db(self, db_name: str, is_tenant: bool | None) -> None:
-        self.db: AsyncDatabase = self.client[db_name]
-        if self.models:
-            if is_tenant:
-                self.is_tenant = True
-                tenant_models = [model for model in self.models if model != Tenant]
-                await init_beanie(self.db, document_models=tenant_models)
-                logger.debug("Database models are initialized for new tenant.")
-            else:
-                await self.init_models()
-                logger.debug("Database models are initialized.")
+        self.is_tenant = bool(is_tenant)
+        if not self.models:
+            self.db = self.client[db_name]
+            return
+
+        document_models = self._document_models(is_tenant)
+        if is_tenant:
+            await self._bind_host_only_models()
+        db = self.registry.get(db_name)
+        if db is not None:
+            self.db = db
+            self._bind_models(document_models)
+            logger.debug(f"Database models are bound to already initialized database: {db_name}")
+            return
+
+        self.db = self.client[db_name]
+        if is_tenant:
+            await init_beanie(self.db, document_models=document_models)
+            logger.debug("Database models are initialized for new tenant.")
+        else:
+            await self.init_models()
+            self._host_only_models_initialized = db_name == settings.mongo_db_name
+            logger.debug("Database models are initialized.")
+        self.registry.add(db_name, self.db)
 
     async def init_models(self) -> None:
         await init_beanie(self.db, document_models=self.models)
 
+    async def get_tenant_database(self, db_name: str) -> AsyncDatabase:
+        """
+            Return the handle of a tenant database, initializing its collections and indexes on first use.
+            Unlike `init_db`, this never changes the globally bound database, so it is safe to call from
+            concurrent requests. Requests select the returned handle through the tenant context.
+        """
+        db = self.registry.get(db_name)
+        if db is not None:
+            return db
+
+        async with self._init_lock:
+            db = self.registry.get(db_name)
+            if db is not None:
+                return db
+            db = self.client[db_name]
+            document_models = self._document_models(is_tenant=True)
+            # init_beanie binds the models globally, route this context to the tenant database while
+            # indexes are created and restore the previous binding afterwards.
+            token = set_current_database(db)
+            try:
+                await init_beanie(db, document_models=document_models)
+            finally:
+                reset_current_database(token)
+                if self.db is not None:
+                    self._bind_models(document_models)
+            self.registry.add(db_name, db)
+            logger.debug(f"Database models are initialized for tenant database: {db_name}")
+            return db
+
+    def _document_models(self, is_tenant: bool | None) -> Sequence[type[Document]]:
+        if is_tenant:
+            return [model for model in self.models if model not in host_only_models]
+        return self.models
+
+    def _bind_models(self, document_models: Sequence[type[Document]], database: AsyncDatabase | None = None) -> None:
+        """Point the already initialized models to the current (or given) database without running `init_beanie` again."""
+        database = database if database is not None else self.db
+        for model in document_models:
+            model.set_database(database)
+            model.set_collection(database[model.get_collection_name()])
+
+    async def _bind_host_only_models(self) -> None:
+        """
+            Bind the host only models (tenants, audit logs) to the host database of this client, so they stay usable
+            while a tenant database is selected (e.g. in Celery tasks, which only init a tenant database).
+        """
+        host_models = [model for model in self.models if model in host_only_models]
+        if not host_models:
+            return
+        host_db = self.client[settings.mongo_db_name]
+        if self._host_only_models_initialized:
+            self._bind_models(host_models, host_db)
+            return
+        await init_beanie(host_db, document_models=host_models)
+        self._host_only_models_initialized = True
+
     async def get_database(self) -> AsyncDatabase:
         return self.db
 
     async def close(self) -> None:
+        self.registry.clear()
         await self.client.close()
         logger.warning("Database connection has been closed.")
     
     async def drop(self) -> None:
         await self.client.drop_database(self.db)
+        self.registry.remove(self.db.name)
         logger.warning("Database has been deleted")
 
     def is_tenant_active(self) -> bool:
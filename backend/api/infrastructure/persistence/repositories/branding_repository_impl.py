@@ -5,6 +5,8 @@ from api.domain.entities.branding import Branding, ThemeConfig
 logger = get_logger(__name__)
 
 class BrandingRepository(BaseRepository[Branding]):
+    cache_resource = "brandings"
+
     def __init__(self):
         super().__init__(Branding)
     
@@ -0,0 +1,283 @@
+import asyncio
+import fcntl
+import gzip
+import json
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from api.common.pagination import decode_cursor, encode_cursor
+from api.common.utils import get_logger
+from api.core.config import settings
+from api.domain.dtos.audit_logs_dto import AuditActionType, AuditLogDto, AuditLogListDto
+
+logger = get_logger(__name__)
+
+# Lines per block. The index keeps the offset of every block, a page reads (and decompresses) whole blocks.
+BLOCK_SIZE = 256
+
+
+@dataclass
+class SegmentIndex:
+    """Sidecar index of a daily segment."""
+    count: int = 0
+    size: int = 0 # bytes of the segment covered by the index
+    actions: dict[str, int] = field(default_factory=dict)
+    min_timestamp: Optional[str] = None
+    max_timestamp: Optional[str] = None
+    blocks: list[int] = field(default_factory=list) # offset of every BLOCK_SIZE-th line (of each gzip member once compressed)
+    compressed: bool = False
+
+    def count_for(self, action: Optional[str]) -> int:
+        return self.count if action is None else self.actions.get(action, 0)
+
+    def add(self, line: bytes, log: AuditLogDto) -> None:
+        if self.count % BLOCK_SIZE == 0:
+            self.blocks.append(self.size)
+        self.count += 1
+        self.size += len(line)
+        self.actions[log.action] = self.actions.get(log.action, 0) + 1
+        self.min_timestamp = min(self.min_timestamp or log.timestamp, log.timestamp)
+        self.max_timestamp = max(self.max_timestamp or log.timestamp, log.timestamp)
+
+
+class FileAuditLogStore:
+    """
+        Audit logs in daily segment files: `<audit_log_dir>/<tenant or host>/<YYYYMMDD>.jsonl`.
+        Each segment has a sidecar index (`.idx.json`) with its line count, counts per action, time range
+        and block offsets, so totals never scan the logs and pages are read backwards from the newest block.
+        Segments of previous days are compressed (`.jsonl.gz`) one gzip member per block, which keeps them seekable.
+        Appends take an exclusive lock on the segment (a `.lock` file next to it, never removed so every
+        worker locks the same inode), several workers can share the directory.
+    """
+    def __init__(self, directory: str = settings.audit_log_dir):
+        self.directory = directory
+        # Day last appended to, by tenant directory. Closed segments are compressed when it changes.
+        self._open_days: dict[str, str] = {}
+
+    # --- paths and index
+
+    def _tenant_dir(self, tenant_id: Optional[str]) -> str:
+        return os.path.join(self.directory, tenant_id if tenant_id else "host")
+
+    def _segment_path(self, tenant_dir: str, day: str, compressed: bool) -> str:
+        return os.path.join(tenant_dir, f"{day}.jsonl.gz" if compressed else f"{day}.jsonl")
+
+    def _index_path(self, tenant_dir: str, day: str) -> str:
+        return os.path.join(tenant_dir, f"{day}.idx.json")
+
+    def _read_index(self, tenant_dir: str, day: str) -> Optional[SegmentIndex]:
+        try:
+            with open(self._index_path(tenant_dir, day)) as f:
+                return SegmentIndex(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def _write_index(self, tenant_dir: str, day: str, index: SegmentIndex) -> None:
+        path = self._index_path(tenant_dir, day)
+        with open(path + ".tmp", "w") as f:
+            json.dump(asdict(index), f)
+        os.replace(path + ".tmp", path)
+
+    def _days(self, tenant_dir: str) -> list[str]:
+        """Days with a segment, newest first."""
+        try:
+            names = os.listdir(tenant_dir)
+        except FileNotFoundError:
+            return []
+        return sorted({name.split(".", 1)[0] for name in names if name.endswith(".idx.json")}, reverse=True)
+
+    @contextmanager
+    def _locked(self, tenant_dir: str, day: str) -> Iterator[None]:
+        with open(os.path.join(tenant_dir, f"{day}.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    # --- writing
+
+    async def append(self, logs: Sequence[AuditLogDto]) -> None:
+        await asyncio.to_thread(self._append, logs)
+
+    def _append(self, logs: Sequence[AuditLogDto]) -> None:
+        day = datetime.now(timezone.utc).strftime("%Y%m%d")
+        by_tenant: dict[Optional[str], list[AuditLogDto]] = defaultdict(list)
+        for log in logs:
+            by_tenant[log.tenant_id].append(log)
+        for tenant_id, tenant_logs in by_tenant.items():
+            # A failing tenant (e.g. disk or permission error on its directory) doesn't cost the others their logs
+            try:
+                tenant_dir = self._tenant_dir(tenant_id)
+                os.makedirs(tenant_dir, exist_ok=True)
+                with self._locked(tenant_dir, day):
+                    self._append_segment(tenant_dir, day, tenant_logs)
+                if self._open_days.get(tenant_dir) != day:
+                    self._compress_closed_segments(tenant_dir, day)
+                    self._open_days[tenant_dir] = day
+            except Exception as e:
+                logger.error(f"Failed to write {len(tenant_logs)} audit logs of tenant {tenant_id or 'host'}: {e}")
+
+    def _append_segment(self, tenant_dir: str, day: str, logs: Sequence[AuditLogDto]) -> None:
+        index = self._read_index(tenant_dir, day) or SegmentIndex()
+        path = self._segment_path(tenant_dir, day, compressed=False)
+        with open(path, "ab") as f:
+            if f.tell() != index.size:
+                # Lines written without their index update (e.g. a crash in between), possibly ending in a partial line
+                self._index_tail(path, index)
+                f.truncate(index.size)
+            lines = []
+            for log in logs:
+                line = (log.model_dump_json() + "\n").encode()
+                index.add(line, log)
+                lines.append(line)
+            f.write(b"".join(lines))
+        self._write_index(tenant_dir, day, index)
+
+    def _index_tail(self, path: str, index: SegmentIndex) -> None:
+        """Add the complete lines past the indexed size to the index. Whatever follows them is to be truncated."""
+        with open(path, "rb") as f:
+            f.seek(index.size)
+            for line in f:
+                try:
+                    log = AuditLogDto(**json.loads(line)) if line.endswith(b"\n") else None
+                except ValueError:
+                    log = None
+                if log is None:
+                    logger.warning(f"Discarding a partial audit log line at offset {index.size} of {path}")
+                    return
+                index.add(line, log)
+
+    def _compress_closed_segments(self, tenant_dir: str, day: str) -> None:
+        """Compress the uncompressed segments of days before `day`. Runs once per tenant and day in this process."""
+        for name in os.listdir(tenant_dir):
+            if name.endswith(".jsonl") and name[:-len(".jsonl")] < day:
+                self._compress_segment(tenant_dir, name[:-len(".jsonl")])
+
+    def _compress_segment(self, tenant_dir: str, day: str) -> None:
+        """Rewrite a closed segment as one gzip member per block."""
+        with self._locked(tenant_dir, day):
+            source = self._segment_path(tenant_dir, day, compressed=False)
+            index = self._read_index(tenant_dir, day)
+            if index is None or index.compressed or not os.path.exists(source):
+                # Compressed by another worker in the meantime
+                return
+            target = self._segment_path(tenant_dir, day, compressed=True)
+            blocks: list[int] = []
+            with open(source, "rb") as src, open(target + ".tmp", "wb") as dst:
+                for i, start in enumerate(index.blocks):
+                    end = index.blocks[i + 1] if i + 1 < len(index.blocks) else index.size
+                    src.seek(start)
+                    blocks.append(dst.tell())
+                    dst.write(gzip.compress(src.read(end - start)))
+                size = dst.tell()
+            os.replace(target + ".tmp", target)
+            self._write_index(tenant_dir, day, SegmentIndex(**{**asdict(index), "blocks": blocks, "size": size, "compressed": True}))
+            os.remove(source)
+        logger.debug(f"Compressed audit log segment {tenant_dir}/{day}")
+
+    # --- reading
+
+    def _read_block(self, tenant_dir: str, day: str, index: SegmentIndex, block: int) -> list[bytes]:
+        start = index.blocks[block]
+        end = index.blocks[block + 1] if block + 1 < len(index.blocks) else index.size
+        with open(self._segment_path(tenant_dir, day, index.compressed), "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        if index.compressed:
+            data = gzip.decompress(data)
+        return data.splitlines()
+
+    def _newest_first(
+            self,
+            tenant_id: Optional[str],
+            action: Optional[str],
+            skip: int = 0,
+            after: Optional[tuple[str, int]] = None
+        ) -> Iterator[tuple[str, int, dict[str, Any]]]:
+        """
+            Yield (day, line number, log) newest first, skipping `skip` matching logs or starting after the
+            position `after`. Whole segments and blocks are skipped using the index counts where possible.
+        """
+        tenant_dir = self._tenant_dir(tenant_id)
+        for day in self._days(tenant_dir):
+            if after is not None and day > after[0]:
+                continue
+            index = self._read_index(tenant_dir, day)
+            if index is None:
+                continue
+            # Lines of this segment that may be returned
+            end_line = after[1] if after is not None and day == after[0] else index.count
+            if after is None and skip >= index.count_for(action):
+                skip -= index.count_for(action)
+                continue
+            for block in reversed(range(len(index.blocks))):
+                first_line = block * BLOCK_SIZE
+                if first_line >= end_line:
+                    continue
+                block_lines = min(BLOCK_SIZE, end_line - first_line)
+                if action is None and skip >= block_lines:
+                    skip -= block_lines
+                    continue
+                lines = self._read_block(tenant_dir, day, index, block)[:block_lines]
+                for offset in reversed(range(len(lines))):
+                    log = json.loads(lines[offset])
+                    if action is not None and log.get("action") != action:
+                        continue
+                    if skip > 0:
+                        skip -= 1
+                        continue
+                    yield day, first_line + offset, log
+
+    def _count(self, tenant_id: Optional[str], action: Optional[str]) -> int:
+        tenant_dir = self._tenant_dir(tenant_id)
+        total = 0
+        for day in self._days(tenant_dir):
+            index = self._read_index(tenant_dir, day)
+            total += index.count_for(action) if index is not None else 0
+        return total
+
+    def _page(self, tenant_id: Optional[str], limit: int, skip: int, action: Optional[str], cursor: Optional[str]) -> AuditLogListDto:
+        after = tuple(decode_cursor(cursor, size=2)) if cursor is not None else None
+        if after is not None:
+            skip = 0
+        rows = []
+        for row in self._newest_first(tenant_id, action, skip=skip, after=after):
+            rows.append(row)
+            if len(rows) > limit:
+                break
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        return AuditLogListDto(
+            total=self._count(tenant_id, action),
+            logs=[AuditLogDto(**log) for _, _, log in rows],
+            has_next=has_next,
+            has_previous=skip > 0 or after is not None,
+            limit=limit,
+            skip=skip,
+            next_cursor=encode_cursor(rows[-1][0], rows[-1][1]) if has_next else None,
+        )
+
+    async def list(
+            self,
+            tenant_id: Optional[str] = None,
+            limit: int = 10,
+            skip: int = 0,
+            action: Optional[AuditActionType] = None,
+            cursor: Optional[str] = None
+        ) -> AuditLogListDto:
+        return await asyncio.to_thread(self._page, tenant_id, limit, skip, action, cursor)
+
+    async def iterate(self, tenant_id: Optional[str] = None, action: Optional[AuditActionType] = None) -> AsyncIterator[AuditLogDto]:
+        cursor = None
+        while True:
+            page = await self.list(tenant_id=tenant_id, limit=1000, action=action, cursor=cursor)
+            for log in page.logs:
+                yield log
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+from pymongo import DESCENDING
+
+from api.common.lru_cache import LRUCache
+from api.common.pagination import decode_cursor, encode_cursor
+from api.common.utils import get_logger
+from api.core.config import settings
+from api.domain.dtos.audit_logs_dto import AuditActionType, AuditLogDto, AuditLogListDto
+from api.domain.entities.audit_log import AuditLog
+
+logger = get_logger(__name__)
+
+_sort = [("timestamp", DESCENDING), ("_id", DESCENDING)]
+
+
+class MongoAuditLogStore:
+    """
+        Audit logs in the `audit_logs` collection of the host database, indexed by tenant, action and time.
+        Pages are read with keyset pagination on (timestamp, _id). Totals are counted at most once per
+        `count_ttl` seconds per tenant and action, the list only needs them for display.
+    """
+    def __init__(self, count_ttl: int = settings.audit_log_count_cache_ttl):
+        self._counts: LRUCache[tuple[Optional[str], Optional[str]], int] = LRUCache(maxsize=1024, ttl=count_ttl)
+
+    def _collection(self):
+        return AuditLog.get_pymongo_collection()
+
+    def _query(self, tenant_id: Optional[str], action: Optional[AuditActionType]) -> dict[str, Any]:
+        query: dict[str, Any] = {"tenant_id": tenant_id}
+        if action:
+            query["action"] = action
+        return query
+
+    def _to_dto(self, doc: dict[str, Any]) -> AuditLogDto:
+        timestamp: datetime = doc["timestamp"]
+        return AuditLogDto(
+            entity=doc["entity"],
+            action=doc["action"],
+            changes=doc.get("changes") or {},
+            user_id=doc.get("user_id"),
+            tenant_id=doc.get("tenant_id"),
+            timestamp=timestamp.replace(tzinfo=timezone.utc).isoformat(),
+        )
+
+    async def append(self, logs: Sequence[AuditLogDto]) -> None:
+        docs = [
+            {
+                "entity": log.entity,
+                "action": log.action,
+                "changes": log.changes,
+                "user_id": log.user_id,
+                "tenant_id": log.tenant_id,
+                "timestamp": datetime.fromisoformat(log.timestamp),
+            }
+            for log in logs
+        ]
+        if docs:
+            await self._collection().insert_many(docs, ordered=False)
+
+    async def count(self, tenant_id: Optional[str] = None, action: Optional[AuditActionType] = None) -> int:
+        key = (tenant_id, action)
+        total = self._counts.get(key)
+        if total is None:
+            total = await self._collection().count_documents(self._query(tenant_id, action))
+            self._counts.set(key, total)
+        return total
+
+    async def list(
+            self,
+            tenant_id: Optional[str] = None,
+            limit: int = 10,
+            skip: int = 0,
+            action: Optional[AuditActionType] = None,
+            cursor: Optional[str] = None
+        ) -> AuditLogListDto:
+        query = self._query(tenant_id, action)
+        if cursor is not None:
+            timestamp, last_id = decode_cursor(cursor, size=2)
+            query["$or"] = [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "_id": {"$lt": last_id}},
+            ]
+            skip = 0
+        docs: List[dict[str, Any]] = await self._collection().find(query, sort=_sort, skip=skip, limit=limit + 1).to_list()
+        has_next = len(docs) > limit
+        docs = docs[:limit]
+        return AuditLogListDto(
+            total=await self.count(tenant_id, action),
+            logs=[self._to_dto(doc) for doc in docs],
+            has_next=has_next,
+            has_previous=skip > 0 or cursor is not None,
+            limit=limit,
+            skip=skip,
+            next_cursor=encode_cursor(docs[-1]["timestamp"], docs[-1]["_id"]) if has_next else None,
+        )
+
+    async def iterate(self, tenant_id: Optional[str] = None, action: Optional[AuditActionType] = None) -> AsyncIterator[AuditLogDto]:
+        async for doc in self._collection().find(self._query(tenant_id, action), sort=_sort, batch_size=1000):
+            yield self._to_dto(doc)
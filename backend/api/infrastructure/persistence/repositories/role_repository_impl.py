@@ -1,8 +1,10 @@
 from typing import Optional
 from beanie import PydanticObjectId
+from beanie.operators import Inc
 from api.common.audit_logs_repository import AuditLogRepository
 from api.common.base_repository import BaseRepository
 from api.common.utils import get_logger
+from api.core.config import settings
 from api.domain.dtos.audit_logs_dto import AuditLogDto
 from api.domain.dtos.role_dto import CreateRoleDto, RoleListDto, UpdateRoleDto
 from api.domain.entities.role import Role
@@ -11,19 +13,23 @@ logger = get_logger(__name__)
 
 
 class RoleRepository(BaseRepository[Role], AuditLogRepository):
+    cache_resource = "roles"
+
     def __init__(self):
         super().__init__(Role)
 
-    async def list (self, skip: int = 0, limit: int = 10) -> RoleListDto:
-        docs = await self.model.find_all().skip(skip).limit(limit).to_list()
-        total = await self.model.count()
+    async def list (self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, include_total: bool = True) -> RoleListDto:
+        page = await self.paginate(limit=limit, skip=skip, cursor=cursor)
+        total = await self.count(strategy=settings.list_count_strategy) if include_total else None
         result = RoleListDto(
-            roles=[await doc.to_serializable_dict() for doc in docs],
+            roles=[await doc.to_serializable_dict() for doc in page.items],
             skip=skip,
             limit=limit,
             total=total,
-            has_previous=skip > 0,
-            has_next=skip + limit < total
+            total_is_exact=settings.list_count_strategy == "exact",
+            has_previous=skip > 0 or cursor is not None,
+            has_next=page.has_next,
+            next_cursor=page.next_cursor
         )
         return result
 
@@ -50,7 +56,7 @@ class RoleRepository(BaseRepository[Role], AuditLogRepository):
     async def update(self, role_id: str, data: UpdateRoleDto) -> Optional[Role]:
         existing_role = await super().get(role_id)
 
-        updated_role = await super().update(id=role_id, data=data.model_dump(exclude_unset=True))
+        updated_role = await super().update(role_id, data.model_dump(exclude_unset=True), Inc({Role.version: 1}))
         if updated_role:
             existing_role_doc = await existing_role.to_serializable_dict()
             await self.add_audit_log(AuditLogDto(
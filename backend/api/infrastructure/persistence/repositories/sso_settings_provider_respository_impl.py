@@ -6,6 +6,8 @@ from api.domain.entities.sso_settings import SSOSettings
 
 
 class SSOSettingsProviderRepository(BaseRepository[SSOSettings], AuditLogRepository):
+    cache_resource = "sso_settings"
+
     def __init__(self):
         super().__init__(SSOSettings)
 
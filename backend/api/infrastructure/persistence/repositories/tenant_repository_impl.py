@@ -1,9 +1,10 @@
+from typing import List, Optional
 from beanie import PydanticObjectId
-from git import List
 from api.common.audit_logs_repository import AuditLogRepository
 from api.common.base_repository import BaseRepository
 from api.common.exceptions import ConflictException
 from api.common.utils import get_logger
+from api.core.config import settings
 from api.domain.dtos.audit_logs_dto import AuditLogDto
 from api.domain.dtos.tenant_dto import CreateTenantDto, TenantDto, TenantListDto
 from api.domain.entities.tenant import Tenant
@@ -20,22 +21,26 @@ default_enable_features = [
     ]
 
 class TenantRepository(BaseRepository[Tenant], AuditLogRepository):
+    cache_resource = "tenants"
+
     def __init__(self):
         super().__init__(Tenant)
 
 
     
-    async def list(self, skip: int = 0, limit: int = 10) -> TenantListDto:
-        docs = await self.model.find_all().skip(skip).limit(limit).to_list()
-        total = await self.model.count()
-        tenant_dto = [TenantDto(**doc.model_dump()) for doc in docs]
+    async def list(self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, include_total: bool = True) -> TenantListDto:
+        page = await self.paginate(limit=limit, skip=skip, cursor=cursor)
+        total = await self.count(strategy=settings.list_count_strategy) if include_total else None
+        tenant_dto = [TenantDto(**doc.model_dump()) for doc in page.items]
         result = TenantListDto(
             tenants=tenant_dto,
             skip=skip,
             limit=limit,
             total=total,
-            has_previous=skip > 0,
-            has_next=skip + limit < total
+            total_is_exact=settings.list_count_strategy == "exact",
+            has_previous=skip > 0 or cursor is not None,
+            has_next=page.has_next,
+            next_cursor=page.next_cursor
         )
         return result
     
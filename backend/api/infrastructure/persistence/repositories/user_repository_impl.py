@@ -3,6 +3,7 @@ from typing import Optional
 from beanie import PydanticObjectId
 from api.common.exceptions import NotFoundException
 from api.common.utils import get_logger
+from api.core.config import settings
 from api.domain.dtos.audit_logs_dto import AuditLogDto
 from api.domain.dtos.user_dto import CreateUserDto, UpdateUserDto, UserListDto
 from api.domain.entities.user import User
@@ -11,19 +12,23 @@ from api.common.audit_logs_repository import AuditLogRepository
 
 logger = get_logger(__name__)
 class UserRepository(BaseRepository[User], AuditLogRepository):
+    cache_resource = "users"
+
     def __init__(self):
         super().__init__(User)
 
-    async def list (self, skip: int = 0, limit: int = 10) -> UserListDto:
-        docs = await self.model.find_all().skip(skip).limit(limit).to_list()
-        total = await self.model.count()
+    async def list (self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, include_total: bool = True) -> UserListDto:
+        page = await self.paginate(limit=limit, skip=skip, cursor=cursor)
+        total = await self.count(strategy=settings.list_count_strategy) if include_total else None
         result = UserListDto(
-            users=[await doc.to_serializable_dict() for doc in docs],
+            users=[await doc.to_serializable_dict() for doc in page.items],
             skip=skip,
             limit=limit,
             total=total,
-            has_previous=skip > 0,
-            has_next=skip + limit < total
+            total_is_exact=settings.list_count_strategy == "exact",
+            has_previous=skip > 0 or cursor is not None,
+            has_next=page.has_next,
+            next_cursor=page.next_cursor
         )
         return result
 
@@ -1,31 +1,70 @@
+from dataclasses import dataclass
 from typing import Annotated
+from api.common.dtos.token_dto import TokenPayloadDto
 from api.common.security import oauth2_scheme
+from api.core.config import settings
 from api.core.exceptions import InvalidOperationException
 from api.common.exceptions import UnauthorizedException
 from api.common.utils import get_logger
 from api.domain.dtos.auth_dto import MeResponseDto
 from api.domain.dtos.user_dto import UserDto
+from api.domain.enum.permission import permissions_from_mask
 from api.infrastructure.security.jwt_token_service import JwtTokenService
 from api.usecases.role_service import RoleService
 from api.usecases.subscription_plan_service import SubscriptionPlanService
 from api.usecases.user_service import UserService
-from api.core.container import get_role_service, get_subscription_plan_service, get_user_service, get_jwt_token_service  
-from fastapi import Depends
+from api.core.container import get_role_service, get_subscription_plan_service, get_user_service, get_jwt_token_service
+from fastapi import Depends, Request
+from fastapi.security.utils import get_authorization_scheme_param
 
 
 logger = get_logger(__name__)
 
-async def get_current_user(
-        token: Annotated[str, Depends(oauth2_scheme)],
-        user_service: UserService = Depends(get_user_service),
-        token_service: JwtTokenService = Depends(get_jwt_token_service),
-        role_service: RoleService = Depends(get_role_service),
-        subscription_service: SubscriptionPlanService = Depends(get_subscription_plan_service)
-    ) -> MeResponseDto:
+
+@dataclass
+class ResolvedPrincipal:
+    """
+        Outcome of resolving the bearer token of a request. Stored on `request.state.principal`
+        so middlewares and dependencies share a single resolution per request.
+    """
+    token: str | None
+    user: MeResponseDto | None = None
+    error: Exception | None = None
+    # True when the user was built from the token claims (stateless mode), without its subscription
+    stateless: bool = False
+
+
+async def _load_from_claims(payload: TokenPayloadDto, role_service: RoleService) -> MeResponseDto | None:
+    """
+        Build the current user from the access token claims. Returns None when the token doesn't carry
+        the stateless claims or its role changed since it was issued, the caller then loads from the database.
+    """
+    if payload.profile is None or payload.role is None or payload.perm_mask is None or payload.role_version is None:
+        return None
+    if payload.role_version != await role_service.get_role_version(payload.role.id):
+        logger.debug(f"Role {payload.role.id} changed since the token was issued, loading the user from the database.")
+        return None
+    role = payload.role.model_copy(update={"permissions": permissions_from_mask(payload.perm_mask)})
+    return MeResponseDto(**payload.profile.model_dump(), role=role, subscription=None)
+
+
+async def _load_current_user(
+        token: str | None,
+        user_service: UserService,
+        token_service: JwtTokenService,
+        role_service: RoleService,
+        subscription_service: SubscriptionPlanService,
+        allow_stateless: bool = True
+    ) -> ResolvedPrincipal:
     payload = await token_service.decode_token(token, type="access_token")
     if payload is None:
         logger.error("Payload is None after decoding token.")
         raise UnauthorizedException("JWT token is invalid or has expired.")
+    if allow_stateless and settings.stateless_auth_enabled:
+        me_response = await _load_from_claims(payload, role_service)
+        if me_response is not None:
+            return ResolvedPrincipal(token=token, user=me_response, stateless=True)
+
     user = await user_service.get_user_by_id(user_id=str(payload.sub))
     if user is None:
         logger.error(f"User not found for ID: {payload.sub}")
@@ -38,13 +77,84 @@ async def get_current_user(
     # Get subscription plan for the user
     subscription =  await subscription_service.get_subscription_plan_by_user_id(str(user.id))
     me_response = MeResponseDto(**user_dto.model_dump(), role=role_doc, subscription=subscription)
-    return me_response
+    return ResolvedPrincipal(token=token, user=me_response)
+
+
+async def resolve_principal(
+        request: Request,
+        token: str | None,
+        user_service: UserService,
+        token_service: JwtTokenService,
+        role_service: RoleService,
+        subscription_service: SubscriptionPlanService,
+        allow_stateless: bool = True
+    ) -> ResolvedPrincipal:
+    """
+        Resolve the principal for the given token once per request. Subsequent calls with the same token
+        reuse the result stored on `request.state.principal` instead of decoding the JWT and querying the database again.
+        With `allow_stateless=False` a principal built from token claims is replaced by one loaded from the database.
+    """
+    resolved: ResolvedPrincipal | None = getattr(request.state, "principal", None)
+    if resolved is not None and resolved.token == token and (allow_stateless or not resolved.stateless):
+        return resolved
+
+    try:
+        resolved = await _load_current_user(token, user_service, token_service, role_service, subscription_service, allow_stateless)
+    except Exception as e:
+        resolved = ResolvedPrincipal(token=token, error=e)
+    request.state.principal = resolved
+    return resolved
+
+
+def get_bearer_token(request: Request) -> str | None:
+    """Extract the bearer token from the authorization header. Returns None if the header is missing."""
+    scheme, token = get_authorization_scheme_param(request.headers.get("authorization"))
+    if not token or scheme.lower() != "bearer":
+        return None
+    return token
+
+
+async def get_current_user(
+        request: Request,
+        token: Annotated[str, Depends(oauth2_scheme)],
+        user_service: UserService = Depends(get_user_service),
+        token_service: JwtTokenService = Depends(get_jwt_token_service),
+        role_service: RoleService = Depends(get_role_service),
+        subscription_service: SubscriptionPlanService = Depends(get_subscription_plan_service)
+    ) -> MeResponseDto:
+    resolved = await resolve_principal(request, token, user_service, token_service, role_service, subscription_service)
+    if resolved.error is not None:
+        raise resolved.error
+    return resolved.user
 
 
 
 CurrentUser = Annotated[MeResponseDto, Depends(get_current_user)]
 
-async def current_user_optional(token: Annotated[str, Depends(oauth2_scheme)],
+
+async def get_current_user_fresh(
+        request: Request,
+        token: Annotated[str, Depends(oauth2_scheme)],
+        user_service: UserService = Depends(get_user_service),
+        token_service: JwtTokenService = Depends(get_jwt_token_service),
+        role_service: RoleService = Depends(get_role_service),
+        subscription_service: SubscriptionPlanService = Depends(get_subscription_plan_service)
+    ) -> MeResponseDto:
+    """
+        Current user loaded from the database even in stateless mode, for endpoints that return the
+        full profile (including the subscription) or must see changes made since the token was issued.
+    """
+    resolved = await resolve_principal(request, token, user_service, token_service, role_service, subscription_service, allow_stateless=False)
+    if resolved.error is not None:
+        raise resolved.error
+    return resolved.user
+
+
+CurrentUserFresh = Annotated[MeResponseDto, Depends(get_current_user_fresh)]
+
+async def current_user_optional(
+        request: Request,
+        token: Annotated[str, Depends(oauth2_scheme)],
         user_service: UserService = Depends(get_user_service),
         token_service: JwtTokenService = Depends(get_jwt_token_service),
         subscription_service: SubscriptionPlanService = Depends(get_subscription_plan_service),
@@ -53,11 +163,26 @@ async def current_user_optional(token: Annotated[str, Depends(oauth2_scheme)],
         Optional current user information. If the user is not authenticated, this will be None.
         Useful for endpoints that can be accessed by both authenticated and unauthenticated users.
     """
-    try:
-        return await get_current_user(token, user_service, token_service, role_service, subscription_service)
-    except Exception as e:
-        logger.info(f"Optional current user retrieval failed: {e}")
+    resolved = await resolve_principal(request, token, user_service, token_service, role_service, subscription_service)
+    if resolved.error is not None:
+        logger.info(f"Optional current user retrieval failed: {resolved.error}")
         return None
+    return resolved.user
+
 
+CurrentUserOptional = Annotated[MeResponseDto | None, Depends(current_user_optional)]
 
-CurrentUserOptional = Annotated[MeResponseDto | None, Depends(current_user_optional)]
\ No newline at end of file
+
+async def resolve_current_user_optional(request: Request) -> MeResponseDto | None:
+    """
+        Resolve the current user outside of FastAPI's dependency injection (e.g. in middlewares).
+        Shares the per-request principal with `get_current_user` so the token is only resolved once.
+    """
+    return await current_user_optional(
+        request,
+        get_bearer_token(request),
+        user_service=get_user_service(),
+        token_service=get_jwt_token_service(),
+        subscription_service=get_subscription_plan_service(),
+        role_service=get_role_service()
+    )
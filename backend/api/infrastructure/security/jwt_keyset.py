@@ -0,0 +1,90 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+from api.common.utils import get_logger
+from api.core.config import settings
+
+logger = get_logger(__name__)
+
+asymmetric_algorithms = ("EdDSA", "ES256")
+
+
+@dataclass(frozen=True)
+class JwtKey:
+    kid: str
+    public_key: Any
+    private_key: Any = None
+
+
+class JwtKeySet:
+    """
+        Asymmetric keys for access tokens. Tokens are signed with the active key and carry its `kid`,
+        any key of the set verifies them. Rotate by adding a new key, making it active and keeping the
+        previous one (its public key is enough) until the tokens it signed have expired.
+
+        Keys are PEM files in `directory`: `<kid>.pem` holds a private key, `<kid>.pub.pem` a
+        verification-only public key.
+    """
+    def __init__(self, algorithm: str, keys: list[JwtKey], active_kid: str):
+        if algorithm not in asymmetric_algorithms:
+            raise ValueError(f"Unsupported JWT signing algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.keys = {key.kid: key for key in keys}
+        active = self.keys.get(active_kid)
+        if active is None or active.private_key is None:
+            raise ValueError(f"No private key found for the active JWT key id: {active_kid}")
+        self.active = active
+
+    @classmethod
+    def from_directory(cls, directory: str, algorithm: str, active_kid: str) -> "JwtKeySet":
+        keys: list[JwtKey] = []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            with open(path, "rb") as file:
+                data = file.read()
+            if name.endswith(".pub.pem"):
+                keys.append(JwtKey(kid=name.removesuffix(".pub.pem"), public_key=load_pem_public_key(data)))
+            elif name.endswith(".pem"):
+                private_key = load_pem_private_key(data, password=None)
+                keys.append(JwtKey(kid=name.removesuffix(".pem"), public_key=private_key.public_key(), private_key=private_key))
+        logger.info(f"Loaded {len(keys)} JWT keys, signing with: {active_kid}")
+        return cls(algorithm, keys, active_kid)
+
+    def verification_key(self, kid: Optional[str]) -> Any:
+        key = self.keys.get(kid) if kid is not None else None
+        return key.public_key if key is not None else None
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        """Public keys as a JSON Web Key Set."""
+        return {"keys": [self._to_jwk(key) for key in self.keys.values()]}
+
+    def _to_jwk(self, key: JwtKey) -> dict[str, Any]:
+        if isinstance(key.public_key, ed25519.Ed25519PublicKey):
+            jwk = OKPAlgorithm.to_jwk(key.public_key, as_dict=True)
+            alg = "EdDSA"
+        elif isinstance(key.public_key, ec.EllipticCurvePublicKey):
+            jwk = ECAlgorithm.to_jwk(key.public_key, as_dict=True)
+            alg = "ES256"
+        else:
+            raise ValueError(f"Unsupported key type for JWT key id: {key.kid}")
+        if isinstance(jwk, str):
+            jwk = json.loads(jwk)
+        return {**jwk, "kid": key.kid, "use": "sig", "alg": alg}
+
+
+def load_jwt_keyset() -> Optional[JwtKeySet]:
+    """Keyset configured in the settings. None when access tokens use the shared secret."""
+    if settings.algorithm not in asymmetric_algorithms:
+        return None
+    if not settings.jwt_keys_dir or not settings.jwt_active_kid:
+        raise ValueError(f"JWT_KEYS_DIR and JWT_ACTIVE_KID are required for {settings.algorithm} access tokens")
+    return JwtKeySet.from_directory(settings.jwt_keys_dir, settings.algorithm, settings.jwt_active_kid)
+
+
+jwt_keyset = load_jwt_keyset()
@@ -1,17 +1,47 @@
+import hashlib
+import time
 from datetime import timedelta
 from typing import Literal
 
 import jwt
 from api.common.dtos.token_dto import AccessTokenDto, ActivationTokenPayloadDto, RefreshTokenDto, RefreshTokenDto, RefreshTokenPayloadDto, TokenPayloadDto, TokenSetDto, VerifyEmailTokenPayloadDto
 from api.common.utils import get_logger, get_utc_now
-from api.common.security import ACCESS_TOKEN_EXPIRE_MINUTES, ACTIVATION_TOKEN_EXPIRE_HOURS, ALGORITHM, JWT_SECRET, REFRESH_ALGORITHM, REFRESH_TOKEN_EXPIRE_DAYS, REFRESH_TOKEN_SECRET
+from api.common.security import ACCESS_TOKEN_EXPIRE_MINUTES, ACTIVATION_TOKEN_EXPIRE_HOURS, ALGORITHM, JWT_SECRET, REFRESH_ALGORITHM, REFRESH_TOKEN_EXPIRE_DAYS, REFRESH_TOKEN_SECRET, SECRET_ALGORITHM
 from api.common.exceptions import InvalidOperationException
+from api.common.lru_cache import LRUCache
+from api.core.config import settings
+from api.infrastructure.security.jwt_keyset import JwtKeySet, jwt_keyset
+from api.infrastructure.security.refresh_token_store import RefreshSession
 
 logger  = get_logger(__name__)
 class JwtTokenService:
-    def __init__(self):
+    def __init__(self, verified_cache_size: int = settings.jwt_verified_cache_size, keyset: JwtKeySet | None = jwt_keyset):
+        # Signs and verifies access tokens when an asymmetric algorithm is configured, otherwise the shared secret does
+        self.keyset = keyset
+        # Verified access token payloads by token hash, each expiring with its token
+        self._verified: LRUCache[bytes, TokenPayloadDto] = LRUCache(maxsize=verified_cache_size)
         logger.info("Initialized.")
 
+    def _decode_access_token(self, token: str) -> TokenPayloadDto:
+        """Verify an access token, or reuse the payload of an earlier verification of the same token."""
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cached = self._verified.get(key)
+        if cached is not None:
+            # Callers may modify the payload, never hand out the cached instance.
+            return cached.model_copy(deep=True)
+        if self.keyset is None:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
+        else:
+            public_key = self.keyset.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if public_key is None:
+                raise jwt.InvalidTokenError("Unknown signing key.")
+            payload = jwt.decode(token, public_key, algorithms=[self.keyset.algorithm])
+        decoded = TokenPayloadDto(**payload)
+        remaining = payload.get("exp", 0) - time.time()
+        if remaining > 0:
+            self._verified.set(key, decoded.model_copy(deep=True), ttl=remaining)
+        return decoded
+
     async def get_access_token(self, payload: TokenPayloadDto, expires_delta: timedelta | None = None) -> AccessTokenDto:
         try:
             to_encode = payload.model_dump()
@@ -21,16 +51,31 @@ class JwtTokenService:
                 expire = get_utc_now() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
             to_encode.update({"exp": expire})
 
-            encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=ALGORITHM)
+            if self.keyset is None:
+                encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=ALGORITHM)
+            else:
+                encoded_jwt = jwt.encode(
+                    to_encode,
+                    self.keyset.active.private_key,
+                    algorithm=self.keyset.algorithm,
+                    headers={"kid": self.keyset.active.kid},
+                )
             logger.debug(f"Encoded JWT: {encoded_jwt}")
             return AccessTokenDto(access_token=encoded_jwt, token_type="bearer", expires_in=expire)
         except Exception as e:
             logger.error(f"Error generating access token: {str(e)}")
             raise InvalidOperationException("Failed to generate access token.") from e
 
-    async def get_refresh_token(self, payload: TokenPayloadDto, expires_delta: timedelta | None = None) -> RefreshTokenDto:
+    async def get_refresh_token(
+            self,
+            payload: TokenPayloadDto,
+            expires_delta: timedelta | None = None,
+            session: RefreshSession | None = None
+        ) -> RefreshTokenDto:
         try:
             to_encode = {"sub": str(payload.sub), "tenant_id": str(payload.tenant_id) if payload.tenant_id else None, "type": "refresh"}
+            if session is not None:
+                to_encode.update({"jti": session.jti, "family": session.family})
             if expires_delta:
                 expire = get_utc_now() + expires_delta
             else:
@@ -42,13 +87,13 @@ class JwtTokenService:
             logger.error(f"Error generating refresh token: {str(e)}")
             raise InvalidOperationException("Failed to generate refresh token.") from e
     
-    async def generate_tokens(self, payload: TokenPayloadDto) -> TokenSetDto:
+    async def generate_tokens(self, payload: TokenPayloadDto, session: RefreshSession | None = None) -> TokenSetDto:
         """
-            Generate access and refresh tokens.
+            Generate access and refresh tokens. The refresh token belongs to the given session (see RefreshTokenStore).
         """
         logger.debug(f"Generating tokens for payload: {payload}")
         access_token = await self.get_access_token(payload)
-        refresh_token = await self.get_refresh_token(payload)
+        refresh_token = await self.get_refresh_token(payload, session=session)
         return TokenSetDto(
             access_token=access_token.access_token,
             token_type=access_token.token_type,
@@ -62,12 +107,17 @@ class JwtTokenService:
             token: str, type: Literal["access_token", "refresh_token"] = "access_token") -> TokenPayloadDto | RefreshTokenPayloadDto | None :
         try:
             if type == "access_token":
-                payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
-                return TokenPayloadDto(**payload)
+                return self._decode_access_token(token)
             elif type == "refresh_token":
                 payload = jwt.decode(token, REFRESH_TOKEN_SECRET, algorithms=[REFRESH_ALGORITHM])
                 logger.debug(f"Decoded refresh token payload: {payload}")
-                return RefreshTokenPayloadDto(sub=payload.get("sub"), tenant_id=payload.get("tenant_id", None), type=payload.get("type"))
+                return RefreshTokenPayloadDto(
+                    sub=payload.get("sub"),
+                    tenant_id=payload.get("tenant_id", None),
+                    type=payload.get("type"),
+                    jti=payload.get("jti"),
+                    family=payload.get("family"),
+                )
         except jwt.ExpiredSignatureError:
             logger.error("Token has expired.")
             return None
@@ -81,7 +131,7 @@ class JwtTokenService:
         Returns user_id and email if valid, raises exception if invalid.
         """
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[SECRET_ALGORITHM])
             if payload.get("type") != "activation":
                 raise jwt.InvalidTokenError("Invalid token type")
             
@@ -103,7 +153,7 @@ class JwtTokenService:
             Returns user_id and email if valid, raises exception if invalid.
         """
         try:
-            payload = jwt.decode(token, jwt_secret, algorithms=[ALGORITHM])
+            payload = jwt.decode(token, jwt_secret, algorithms=[SECRET_ALGORITHM])
             logger.debug(f"Decoded password reset token payload: {payload}")
             if payload.get("type") != "password_reset_confirmation":
                 logger.debug(f"Invalid token type: {payload.get('type')}")
@@ -125,7 +175,7 @@ class JwtTokenService:
             Returns user_id and email if valid, raises exception if invalid.
         """
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[SECRET_ALGORITHM])
             logger.debug(f"Decoded change email token payload: {payload}")
             if payload.get("type") != "change_email_confirmation":
                 logger.debug(f"Invalid token type: {payload.get('type')}")
@@ -158,6 +208,6 @@ class JwtTokenService:
             "tenant_id": payload.tenant_id
         }
 
-        return jwt.encode(data, payload.jwt_secret or JWT_SECRET, algorithm=ALGORITHM)
+        return jwt.encode(data, payload.jwt_secret or JWT_SECRET, algorithm=SECRET_ALGORITHM)
 
 
@@ -0,0 +1,184 @@
+import hashlib
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from api.common.cache_events import ResourceChanged
+from api.common.exceptions import UnauthorizedException
+from api.common.utils import get_logger
+from api.core.config import settings
+from api.infrastructure.caching.redis_client import redis
+
+logger = get_logger(__name__)
+
+_FAMILY_PREFIX = "auth:rt:family:"
+_LEGACY_PREFIX = "auth:rt:legacy:"
+
+# Starts a family and registers it in the sessions of its user. Expired families are pruned from
+# the sessions (all families live `ttl` seconds), then the oldest ones beyond the cap are revoked.
+_CREATE_SCRIPT = """
+local ttl = tonumber(ARGV[5])
+local now = tonumber(ARGV[7])
+redis.call('HSET', KEYS[1], 'jti', ARGV[2], 'claims', ARGV[3], 'role_version', ARGV[4], 'sessions', KEYS[2])
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now - ttl)
+redis.call('ZADD', KEYS[2], now, ARGV[1])
+redis.call('EXPIRE', KEYS[2], ttl)
+local excess = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[6])
+if excess > 0 then
+    local oldest = redis.call('ZRANGE', KEYS[2], 0, excess - 1)
+    for _, family in ipairs(oldest) do
+        redis.call('UNLINK', ARGV[8] .. family)
+    end
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, excess - 1)
+end
+return excess
+"""
+
+# One-time use: the presented jti must be the current one of the family, it is replaced by a new jti.
+# Presenting an already rotated jti means the token leaked, the whole family is revoked.
+# Returns {1, claims, role_version} on success, {0} for unknown families and {-1} on reuse.
+_ROTATE_SCRIPT = """
+local current = redis.call('HMGET', KEYS[1], 'jti', 'claims', 'role_version', 'sessions')
+if not current[1] then
+    return {0}
+end
+if current[1] ~= ARGV[1] then
+    redis.call('UNLINK', KEYS[1])
+    redis.call('ZREM', current[4], ARGV[3])
+    return {-1}
+end
+redis.call('HSET', KEYS[1], 'jti', ARGV[2])
+return {1, current[2] or '', current[3] or ''}
+"""
+
+# Replaces the claims of a family that still exists.
+_SET_CLAIMS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HSET', KEYS[1], 'claims', ARGV[1], 'role_version', ARGV[2])
+end
+return 0
+"""
+
+# Revokes every family of a user.
+_REVOKE_ALL_SCRIPT = """
+local families = redis.call('ZRANGE', KEYS[1], 0, -1)
+for _, family in ipairs(families) do
+    redis.call('UNLINK', ARGV[1] .. family)
+end
+redis.call('UNLINK', KEYS[1])
+return #families
+"""
+
+# Drops the cached claims of every family of a user, the next refresh reloads them.
+_DROP_CLAIMS_SCRIPT = """
+local families = redis.call('ZRANGE', KEYS[1], 0, -1)
+for _, family in ipairs(families) do
+    redis.call('HDEL', ARGV[1] .. family, 'claims')
+end
+return #families
+"""
+
+
+@dataclass(frozen=True)
+class RefreshSession:
+    family: str
+    jti: str
+
+
+@dataclass(frozen=True)
+class RotatedSession:
+    family: str
+    jti: str
+    claims: Optional[str] # access token claims (JSON) of the family, None when they must be reloaded
+    role_version: Optional[int]
+
+
+def _sessions_key(user_id: object, tenant_id: Optional[object]) -> str:
+    return f"auth:rt:sessions:{tenant_id or 'host'}:{user_id}"
+
+
+def _family_key(family: str) -> str:
+    return f"{_FAMILY_PREFIX}{family}"
+
+
+class RefreshTokenStore:
+    """
+        Refresh token families in Redis. A login starts a family, every refresh rotates its jti so each
+        refresh token can be used once. Reusing a rotated token revokes the whole family.
+        The family also keeps the access token claims, so refreshing doesn't need the database.
+        Each user has at most `max_sessions` families, starting one more revokes the oldest.
+        Refresh tokens issued before families existed (no jti) can be exchanged once, see `claim_legacy`.
+    """
+    def __init__(self, client: Redis, ttl: int, max_sessions: int):
+        self.client = client
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._create_script = client.register_script(_CREATE_SCRIPT)
+        self._rotate_script = client.register_script(_ROTATE_SCRIPT)
+        self._set_claims_script = client.register_script(_SET_CLAIMS_SCRIPT)
+        self._revoke_all_script = client.register_script(_REVOKE_ALL_SCRIPT)
+        self._drop_claims_script = client.register_script(_DROP_CLAIMS_SCRIPT)
+
+    async def create(self, user_id: object, tenant_id: Optional[object], claims: str, role_version: int) -> RefreshSession:
+        session = RefreshSession(family=uuid.uuid4().hex, jti=uuid.uuid4().hex)
+        revoked = await self._create_script(
+            keys=[_family_key(session.family), _sessions_key(user_id, tenant_id)],
+            args=[session.family, session.jti, claims, role_version, self.ttl, self.max_sessions, time.time(), _FAMILY_PREFIX],
+        )
+        if revoked > 0:
+            logger.info(f"Session limit reached for user {user_id}, revoked {revoked} oldest sessions")
+        return session
+
+    async def rotate(self, family: str, jti: str, user_id: object, tenant_id: Optional[object]) -> RotatedSession:
+        """Use the given refresh token and return the next one. Raises UnauthorizedException for revoked or reused tokens."""
+        new_jti = uuid.uuid4().hex
+        result = await self._rotate_script(keys=[_family_key(family)], args=[jti, new_jti, family])
+        if result[0] == 0:
+            raise UnauthorizedException("Refresh token has been revoked.")
+        if result[0] == -1:
+            logger.warning(f"Reuse of a rotated refresh token detected for user {user_id}, session revoked")
+            raise UnauthorizedException("Refresh token has already been used.")
+        claims, role_version = (value.decode() if isinstance(value, bytes) else value for value in result[1:3])
+        return RotatedSession(
+            family=family,
+            jti=new_jti,
+            claims=claims or None,
+            role_version=int(role_version) if role_version else None,
+        )
+
+    async def claim_legacy(self, token: str) -> bool:
+        """
+            Mark a refresh token without family as used. Returns False when it was used before.
+            Such tokens can't be rotated, the caller starts a family for the user instead.
+        """
+        key = _LEGACY_PREFIX + hashlib.sha256(token.encode()).hexdigest()
+        return bool(await self.client.set(key, 1, nx=True, ex=self.ttl))
+
+    async def set_claims(self, family: str, claims: str, role_version: int) -> None:
+        await self._set_claims_script(keys=[_family_key(family)], args=[claims, role_version])
+
+    async def revoke(self, family: str, user_id: object, tenant_id: Optional[object]) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.unlink(_family_key(family))
+            pipe.zrem(_sessions_key(user_id, tenant_id), family)
+            await pipe.execute()
+
+    async def revoke_all(self, user_id: object, tenant_id: Optional[object]) -> int:
+        return await self._revoke_all_script(keys=[_sessions_key(user_id, tenant_id)], args=[_FAMILY_PREFIX])
+
+    async def on_resource_changed(self, event: ResourceChanged) -> None:
+        """A changed (or deleted) user gets fresh claims on the next refresh."""
+        if event.resource == "users" and event.entity_id is not None:
+            await self._drop_claims_script(keys=[_sessions_key(event.entity_id, event.tenant_id)], args=[_FAMILY_PREFIX])
+
+
+refresh_token_store = RefreshTokenStore(
+    redis,
+    # In seconds despite its name, like the max age of the refresh token cookie
+    ttl=settings.refresh_token_expire_days,
+    max_sessions=settings.refresh_token_max_sessions,
+)
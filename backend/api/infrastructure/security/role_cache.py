@@ -0,0 +1,131 @@
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from redis.asyncio import Redis
+
+from api.common.cache_events import ResourceChanged
+from api.common.lru_cache import LRUCache
+from api.common.tenant_context import get_current_database
+from api.common.utils import get_logger
+from api.core.config import settings
+from api.domain.entities.role import Role
+from api.domain.enum.permission import Permission
+from api.infrastructure.caching.redis_client import redis
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedRole:
+    """A cached role with its permission set, computed once when the role is loaded. Shared, never modify `role`."""
+    role: Role
+    permissions: frozenset[Permission]
+
+    @classmethod
+    def of(cls, role: Role) -> "CachedRole":
+        return cls(role=role, permissions=frozenset(role.permissions or []))
+
+
+class RoleCache:
+    """
+        In-process cache of roles, per tenant database and role id.
+        Roles change rarely but are read on almost every authorized request. Every change of a role
+        (its repository bumps the version and publishes a ResourceChanged event) is broadcast on a Redis
+        channel so each worker drops its copy. Entries also expire after `ttl`, which bounds staleness
+        if an invalidation message is missed.
+    """
+    invalidation_channel = "auth:role_invalidations"
+
+    def __init__(self, client: Redis, enabled: bool = True, max_entries: int = 1024, ttl: int = 300):
+        self.client = client
+        self.enabled = enabled
+        self.entries: LRUCache[tuple[str, str], CachedRole] = LRUCache(maxsize=max_entries, ttl=ttl)
+        # Incremented on every invalidation, loads that raced with one are not stored
+        self._generation = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    def _scope(self) -> str:
+        database = get_current_database()
+        return database.name if database is not None else "default"
+
+    async def get_or_load(self, role_id: str, load: Callable[[], Awaitable[Optional[Role]]]) -> Optional[CachedRole]:
+        """Cached role of the current tenant, loaded with `load` on a miss. Missing roles are not cached."""
+        if not self.enabled:
+            role = await load()
+            return CachedRole.of(role) if role is not None else None
+        key = (self._scope(), str(role_id))
+        cached = self.entries.get(key)
+        if cached is not None:
+            return cached
+        generation = self._generation
+        role = await load()
+        if role is None:
+            return None
+        cached = CachedRole.of(role)
+        if generation == self._generation:
+            self.entries.set(key, cached)
+        return cached
+
+    def evict(self, role_id: str) -> None:
+        self._generation += 1
+        for key in self.entries.keys():
+            if key[1] == role_id:
+                self.entries.pop(key)
+
+    async def on_resource_changed(self, event: ResourceChanged) -> None:
+        if not self.enabled or event.resource != "roles":
+            return
+        if event.entity_id is None:
+            self._generation += 1
+            self.entries.clear()
+        else:
+            self.evict(event.entity_id)
+        await self.client.publish(self.invalidation_channel, event.entity_id or "")
+
+    async def start(self) -> None:
+        """Start listening for role changes made by other workers."""
+        if self.enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    def _clear(self) -> None:
+        self._generation += 1
+        self.entries.clear()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.invalidation_channel)
+                    # Changes may have been missed while (re)connecting.
+                    self._clear()
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        role_id = message["data"].decode()
+                        if role_id:
+                            self.evict(role_id)
+                        else:
+                            self._clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Role invalidation listener disconnected, retrying: {e}")
+                self._clear()
+                await asyncio.sleep(1)
+
+
+role_cache = RoleCache(
+    redis,
+    enabled=settings.role_cache_enabled,
+    max_entries=settings.role_cache_max_entries,
+    ttl=settings.role_cache_ttl,
+)
@@ -0,0 +1,42 @@
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from api.common.cache_events import ResourceChanged
+from api.common.utils import get_logger
+from api.core.config import settings
+from api.infrastructure.caching.redis_client import redis
+
+logger = get_logger(__name__)
+
+# Version stored for roles that no longer exist. Never matches a token claim.
+DELETED_ROLE_VERSION = -1
+
+
+class RoleVersionStore:
+    """
+        Shared (Redis) copy of the current version of each role, so access tokens can be checked for
+        outdated permissions without reading the role. The role document stays the source of truth:
+        entries are dropped whenever a role changes and repopulated from the database on the next check.
+    """
+    def __init__(self, client: Redis, ttl: int):
+        self.client = client
+        self.ttl = ttl
+
+    def _key(self, role_id: str) -> str:
+        return f"auth:role_version:{role_id}"
+
+    async def get(self, role_id: str) -> Optional[int]:
+        value = await self.client.get(self._key(role_id))
+        return int(value) if value is not None else None
+
+    async def set(self, role_id: str, version: int) -> None:
+        await self.client.set(self._key(role_id), version, ex=self.ttl)
+
+    async def on_resource_changed(self, event: ResourceChanged) -> None:
+        if event.resource == "roles" and event.entity_id is not None:
+            await self.client.delete(self._key(event.entity_id))
+            logger.debug(f"Dropped stored version of role {event.entity_id}")
+
+
+role_version_store = RoleVersionStore(redis, ttl=settings.role_version_store_ttl)
@@ -20,7 +20,7 @@ from api.domain.enum.permission import Permission
 from api.infrastructure.externals.sso_auth_provider import SSOAuthProvider
 from api.infrastructure.messaging.celery_worker import handle_post_tenant_creation
 from api.infrastructure.persistence.repositories.user_magic_link_repository_impl import UserMagicLinkRepository
-from api.infrastructure.security.current_user import CurrentUser
+from api.infrastructure.security.current_user import CurrentUser, CurrentUserFresh
 from api.infrastructure.security.passkey_service import PasskeyService
 from api.interfaces.middlewares.tenant_middleware import FrontendHost, get_tenant_id
 from api.interfaces.security.role_checker import check_permissions_for_current_role
@@ -30,12 +30,14 @@ from api.common.dtos.cookies import Cookies
 from api.usecases.magic_link_service import EmailMagicLinkService
 from api.usecases.role_service import RoleService
 from api.domain.enum.role import RoleType
+from api.interfaces.caching.cache_policy import cache_policy, no_cache
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/account", tags=["Account"])
 
 @router.post("/login", response_model=TokenSetDto, status_code=status.HTTP_200_OK)
+@no_cache
 async def login(
     response: Response,
     login_request: Annotated[OAuth2PasswordRequestForm, Depends()],
@@ -60,6 +62,7 @@ async def login(
 
 
 @router.post("/refresh",  response_model=TokenSetDto, status_code=status.HTTP_200_OK)
+@no_cache
 async def refresh_token(
     response: Response,
     cookies: Annotated[Cookies, Cookie()],
@@ -82,16 +85,23 @@ async def refresh_token(
     return token_set
 
 @router.get("/logout", status_code=status.HTTP_200_OK)
+@no_cache
 async def logout(
     response: Response,
     current_user: CurrentUser,
+    cookies: Annotated[Cookies, Cookie()],
     auth_service: AuthService = Depends(get_auth_service)
 ):
     response.delete_cookie("refresh_token")
-    await auth_service.logout(user_id=str(current_user.id), tenant_id=str(current_user.tenant_id) if current_user.tenant_id else None)
+    await auth_service.logout(
+        user_id=str(current_user.id),
+        tenant_id=str(current_user.tenant_id) if current_user.tenant_id else None,
+        refresh_token=cookies.refresh_token
+    )
     return status.HTTP_200_OK
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
+@no_cache
 async def register(
     data: CreateUserDto,
     auth_service: AuthService = Depends(get_auth_service),
@@ -122,8 +132,9 @@ async def register(
         
 
 @router.get("/me", response_model=MeResponseDto, status_code=status.HTTP_200_OK)
+@cache_policy(ttl=60)
 async def read_users_me(
-    current_user: CurrentUser
+    current_user: CurrentUserFresh
 ):
     return current_user
 
@@ -319,6 +330,7 @@ async def email_magic_link_login(
     
        
 @router.get("/email_magic_link_validate", response_model=TokenSetDto, status_code=status.HTTP_200_OK)
+@no_cache
 async def email_magic_link_validate(
     response: Response,
     token: str = Query(..., description="The magic link token"),
@@ -17,6 +17,7 @@ from api.usecases.sso_settings_service import SSOSettingsService
 from api.usecases.tenant_service import TenantService
 from api.usecases.user_preference_service import UserPreferenceService
 from api.core.config import settings
+from api.interfaces.caching.cache_policy import cache_policy
 
 logger = get_logger(__name__)
 
@@ -35,7 +36,10 @@ async def get_tenant(service: TenantService, tenant_id: str | None) -> Tenant |
     finally:
         return current_tenant
 
+# Per user, the response has the user's preferences and passkey status. Any write of the user clears them,
+# changes of the tenant, its branding and SSO settings are published by their repositories.
 @router.get("/", response_model=AppConfigurationDto, status_code=status.HTTP_200_OK)
+@cache_policy(ttl=60, depends_on=["brandings", "sso_settings"])
 async def get_app_configuration(
     current_user: CurrentUserOptional,
     tenant_id =  Depends(get_tenant_id),
@@ -33,10 +33,11 @@ async def list_audit_logs(
     limit: int = 10,
     skip: int = 0,
     action: Optional[AuditActionType] = None,
+    cursor: Optional[str] = None,
     log_service: AuditLogsService = Depends(get_audit_logs_service)
 ):
     tenant_id = str(current_user.tenant_id) if current_user.tenant_id else None
-    return await log_service.read_audit_logs(tenant_id=tenant_id, limit=limit, skip=skip, action=action)
+    return await log_service.read_audit_logs(tenant_id=tenant_id, limit=limit, skip=skip, action=action, cursor=cursor)
 
 @router.post("/download", status_code=status.HTTP_202_ACCEPTED, response_model=DownloadResponseDto)
 async def download_audit_logs(
@@ -2,6 +2,7 @@ from typing import Literal
 
 from fastapi import Depends, Query, APIRouter
 from api.common.utils import get_date_range
+from api.core.config import settings
 from api.core.container import get_user_service
 from api.domain.dtos.dashboard_dto import DashboardMetricsDto
 from api.infrastructure.security.current_user import CurrentUser
@@ -46,8 +47,9 @@ async def get_dashboard_metrics(
     ]
 
     timeseries =  await user_service.aggregate(pipeline)
-    total_users = await user_service.total_count()
-    joined_users = await user_service.total_count(match_stage) if match_stage else total_users
+    total_users = await user_service.total_count(strategy=settings.list_count_strategy)
+    # The time series groups exactly the users that joined in the range
+    joined_users = sum(point.count for point in timeseries) if match_stage else total_users
 
     data = {
         "filter": filter,
@@ -3,11 +3,13 @@ from fastapi import APIRouter, Depends
 from api.domain.enum.feature import Feature as FeatureEnum
 from api.domain.enum.permission import Permission
 from api.interfaces.security.role_checker import check_permissions_for_current_role
+from api.interfaces.caching.cache_policy import cache_policy
 
 router = APIRouter(prefix="/features")
 router.tags = ["Features"]
 
 @router.get("/", response_model=List[FeatureEnum], description="List all available features. Requires HOST_MANAGE_TENANTS permission.")
+@cache_policy(ttl=3600, scope="tenant")
 def list_features(
    _bool: bool = Depends(check_permissions_for_current_role(required_permissions=[Permission.HOST_MANAGE_TENANTS])) 
 ):
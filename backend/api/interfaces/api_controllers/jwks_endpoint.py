@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response, status
+
+from api.common.utils import get_logger
+from api.infrastructure.security.jwt_keyset import jwt_keyset
+from api.interfaces.caching.cache_policy import no_cache
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/.well-known")
+router.tags = ["Security"]
+
+@router.get("/jwks.json", status_code=status.HTTP_200_OK)
+@no_cache
+async def jwks(response: Response):
+    """Public keys verifying access tokens. Empty when access tokens are signed with the shared secret."""
+    # Verifiers may cache the keyset, rotation keeps the previous key published for longer than this
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return jwt_keyset.jwks() if jwt_keyset is not None else {"keys": []}
@@ -6,12 +6,14 @@ from api.domain.dtos.passkey_dto import RegisteredPasskeyCredentialsDto
 from api.infrastructure.security.current_user import CurrentUser
 from api.infrastructure.security.passkey_service import PasskeyService
 from api.usecases.audit_logs_service import AuditLogsService
+from api.interfaces.caching.cache_policy import no_cache
 
 
 router = APIRouter(prefix="/security")
 router.tags = ["Manage Security"]
 
 @router.get("/passkeys", response_model=list[RegisteredPasskeyCredentialsDto], status_code=200)
+@no_cache
 async def get_registered_passkeys(
     current_user: CurrentUser,
     passkey_service: PasskeyService = Depends(get_passkey_service),
@@ -5,6 +5,7 @@ from api.common.utils import get_logger
 from api.domain.dtos.permission_dto import PermissionDto
 from api.domain.enum.permission import Permission
 from api.infrastructure.security.current_user import CurrentUser
+from api.interfaces.caching.cache_policy import cache_policy
 
 logger = get_logger(__name__)
 
@@ -13,6 +14,7 @@ router.tags = ["Permissions"]
 
 
 @router.get("/", response_model=list[PermissionDto])
+@cache_policy(ttl=3600, scope="tenant")
 async def get_permissions(
     current_user: CurrentUser
 ):
@@ -1,4 +1,4 @@
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, status
 from api.common.exceptions import InvalidOperationException
@@ -9,6 +9,7 @@ from api.domain.enum.permission import Permission
 from api.interfaces.security.role_checker import check_permissions_for_current_role
 from api.usecases.role_service import RoleService
 from api.usecases.user_service import UserService
+from api.interfaces.caching.cache_policy import cache_policy
 
 
 logger = get_logger(__name__)
@@ -17,16 +18,18 @@ router = APIRouter(prefix="/roles", tags=["Roles"])
 
 
 @router.get("/", response_model=RoleListDto)
+@cache_policy(scope="tenant", vary=["skip", "limit", "cursor", "include_total"])
 async def list_roles(
-    skip: int = 0, limit: int = 10,
+    skip: int = 0, limit: int = 10, cursor: Optional[str] = None, include_total: bool = True,
     service: RoleService = Depends(get_role_service),
     _bool: bool = Depends(check_permissions_for_current_role(required_permissions=[Permission.ROLE_VIEW_ONLY]))
 
 ):
     logger.info(f"Listing roles with skip={skip}, limit={limit}")
-    return await service.list_roles(skip=skip, limit=limit)
+    return await service.list_roles(skip=skip, limit=limit, cursor=cursor, include_total=include_total)
 
 @router.get("/search_by_name", response_model=List[RoleDto])
+@cache_policy(scope="tenant", vary=["name"])
 async def search_role_by_name(
     name: str,
     _bool: bool = Depends(check_permissions_for_current_role(required_permissions=[Permission.ROLE_VIEW_ONLY])),
@@ -15,6 +15,7 @@ from api.usecases.stripe_setting_service import StripeSettingService
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from api.core.config import settings
+from api.interfaces.caching.cache_policy import no_cache
 
 
 logger = get_logger(__name__)
@@ -69,6 +70,7 @@ SUPPORTED_EVENTS = {
 
 
 @router.post("/stripe/webhooks", status_code=status.HTTP_200_OK)
+@no_cache
 async def stripe_webhook(
     request: Request,
     stripe_setting_service: StripeSettingService = Depends(get_stripe_setting_service),
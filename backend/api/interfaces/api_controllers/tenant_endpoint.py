@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, status
 
 from api.common.dtos.worker_dto import WorkerPayloadDto
@@ -18,18 +19,20 @@ from api.usecases.billing_record_service import BillingRecordService
 from api.usecases.subscription_plan_service import SubscriptionPlanService
 from api.usecases.tenant_service import TenantService
 from api.infrastructure.messaging.celery_worker import handle_post_tenant_creation, handle_post_tenant_deletion, handle_tenant_dns_update
+from api.interfaces.caching.cache_policy import cache_policy
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/tenants", tags=["Tenants"])
 
 @router.get("/", response_model=TenantListDto, status_code=status.HTTP_200_OK)
+@cache_policy(scope="tenant", vary=["skip", "limit", "cursor", "include_total"])
 async def list_tenants(
-    skip: int = 0, limit: int = 10,
+    skip: int = 0, limit: int = 10, cursor: Optional[str] = None, include_total: bool = True,
     service: TenantService = Depends(get_tenant_service),
     _bool: bool = Depends(check_permissions_for_current_role(required_permissions=[Permission.HOST_MANAGE_TENANTS]))    
 ):
-    return await service.list_tenants(skip=skip, limit=limit)
+    return await service.list_tenants(skip=skip, limit=limit, cursor=cursor, include_total=include_total)
 
 @router.post("/", response_model=CreateTenantResponseDto, status_code=status.HTTP_201_CREATED)
 async def create_tenant(
@@ -161,7 +164,7 @@ async def update_tenant_dns_record(
     tenant.custom_domain = data.custom_domain
     tenant.is_active = data.is_active if data.is_active is not None else tenant.is_active
     tenant.custom_domain_status = "activation-progress" if data.custom_domain else None
-    await tenant.save()
+    await tenant_service.save_tenant(tenant)
     handle_tenant_dns_update.delay(
         payload=payload.model_dump_json()
     )
@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, File, UploadFile, status
 from api.common.exceptions import InvalidOperationException
 from api.common.utils import get_logger
@@ -10,6 +11,7 @@ from api.core.container import get_file_service, get_role_service, get_user_serv
 from api.infrastructure.security.current_user import CurrentUser
 from api.usecases.role_service import RoleService
 from api.domain.enum.role import RoleType
+from api.interfaces.caching.cache_policy import cache_policy
 
 
 logger = get_logger(__name__)
@@ -18,12 +20,13 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/", response_model=UserListDto)
+@cache_policy(scope="tenant", vary=["skip", "limit", "cursor", "include_total"])
 async def list_users(
-    skip: int = 0, limit: int = 10,
+    skip: int = 0, limit: int = 10, cursor: Optional[str] = None, include_total: bool = True,
     service: UserService = Depends(get_user_service),
     _bool: bool = Depends(check_permissions_for_current_role(required_permissions=[Permission.USER_VIEW_ONLY]))
 ):
-    return await service.list_users(skip=skip, limit=limit)
+    return await service.list_users(skip=skip, limit=limit, cursor=cursor, include_total=include_total)
 
 
 @router.post("/", response_model=CreateUserResponseDto, status_code=status.HTTP_201_CREATED)
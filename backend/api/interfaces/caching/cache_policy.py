@@ -0,0 +1,68 @@
+# Declarative response cache policies, read by the RedisCacheMiddleware from the matched route.
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional, Sequence, TypeVar
+
+CacheScope = Literal["user", "tenant"]
+
+F = TypeVar("F", bound=Callable)
+
+_POLICY_ATTRIBUTE = "__cache_policy__"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+        How the responses of an endpoint are cached.
+        scope "user":   one entry per user (default).
+        scope "tenant": one entry per tenant and role, shared by all users with the same role. Only for
+                        endpoints whose response depends on nothing but the role's permissions and the
+                        request, e.g. not for endpoints that allow self access.
+        vary:           query parameters that are part of the cache key. None means the whole query string.
+        depends_on:     other cached resources the response is built from, a change of any of them
+                        in the tenant evicts it.
+    """
+    enabled: bool = True
+    ttl: Optional[int] = None  # None falls back to the middleware default
+    scope: CacheScope = "user"
+    vary: Optional[tuple[str, ...]] = None
+    depends_on: tuple[str, ...] = ()
+
+
+DEFAULT_CACHE_POLICY = CachePolicy()
+NO_CACHE_POLICY = CachePolicy(enabled=False)
+
+
+def cache_policy(
+    ttl: Optional[int] = None,
+    scope: CacheScope = "user",
+    vary: Optional[Sequence[str]] = None,
+    depends_on: Sequence[str] = (),
+) -> Callable[[F], F]:
+    """
+        Declare the cache policy of an endpoint. Place it below the route decorator:
+
+            @router.get("/")
+            @cache_policy(ttl=60, scope="tenant", vary=["skip", "limit"])
+            async def list_roles(...): ...
+    """
+    policy = CachePolicy(
+        ttl=ttl,
+        scope=scope,
+        vary=tuple(sorted(vary)) if vary is not None else None,
+        depends_on=tuple(depends_on),
+    )
+
+    def decorator(endpoint: F) -> F:
+        setattr(endpoint, _POLICY_ATTRIBUTE, policy)
+        return endpoint
+    return decorator
+
+
+def no_cache(endpoint: F) -> F:
+    """Never cache the responses of this endpoint, nor invalidate anything when it is called."""
+    setattr(endpoint, _POLICY_ATTRIBUTE, NO_CACHE_POLICY)
+    return endpoint
+
+
+def get_cache_policy(endpoint: Optional[Callable]) -> CachePolicy:
+    return getattr(endpoint, _POLICY_ATTRIBUTE, DEFAULT_CACHE_POLICY)
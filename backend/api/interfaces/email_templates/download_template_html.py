@@ -1,12 +1,25 @@
-def download_template(user_first_name: str) -> str:
-    """HTML email template for Download reports."""
+from typing import Optional
+
+
+def download_template(user_first_name: str, download_url: Optional[str] = None) -> str:
+    """HTML email template for Download reports. Large reports are linked instead of attached."""
+    if download_url is not None:
+        delivery = f"""
+            <p>We wanted to inform you that your download is ready.</p>
+            <p>Your audit logs report is too large to be attached, you can download it here:</p>
+            <p><a href="{download_url}" style="color: #1a73e8;">Download report</a></p>
+            <p>The link is valid for a limited time.</p>
+        """
+    else:
+        delivery = """
+            <p>We wanted to inform you that your download is ready: It is <strong>attached</strong> to this email.</p>
+            <p>Your audit logs report is attached to this email.</p>
+        """
     return f"""
         <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
             <h2 style="color: #333;">Download Report</h2>
             <p>Hello {user_first_name},</p>
-            <p>We wanted to inform you that your download is ready: It is <strong>attached</strong> to this email.</p>
-            <p>Your audit logs report is attached to this email.</p>
-
+            {delivery}
            <p>If you have any questions or need further assistance, feel free to reach out to our support team.</p>
         </div>
-    """
\ No newline at end of file
+    """
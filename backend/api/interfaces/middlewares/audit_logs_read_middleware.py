@@ -1,14 +1,74 @@
+import random
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import Callable, Optional
+
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from api.common.utils import capture_audit_log, get_logger
-from api.core.container import get_jwt_token_service, get_role_service, get_subscription_plan_service, get_user_service
+from api.common.audit_log_writer import audit_log_writer
+from api.common.lru_cache import LRUCache
+from api.common.utils import get_logger
+from api.core.config import settings
 from api.domain.dtos.audit_logs_dto import AuditLogDto
-from api.infrastructure.security.current_user import current_user_optional
+from api.infrastructure.security.current_user import resolve_current_user_optional
+from api.interfaces.middlewares.redis_cache_middleware import REVALIDATION_SCOPE_KEY
 
 logger = get_logger(__name__)
 
-class AuditLogsReadMiddleware(BaseHTTPMiddleware):
+
+@dataclass(frozen=True)
+class AuditReadPolicy:
+    """
+        Which GET requests are recorded as read audit logs.
+        include / exclude: path patterns (fnmatch), a path is audited when it matches an include and no exclude.
+        sample_rates:      fraction of the reads of an entity that is recorded, `default_sample_rate` for the others.
+        dedup_window:      seconds during which identical reads (same user, path and query) are recorded once. 0 disables it.
+    """
+    include: tuple[str, ...] = ("/api/v1/*",)
+    exclude: tuple[str, ...] = ()
+    sample_rates: dict[str, float] = field(default_factory=dict)
+    default_sample_rate: float = 1.0
+    dedup_window: int = 0
+
+    def is_audited(self, path: str) -> bool:
+        return (
+            any(fnmatchcase(path, pattern) for pattern in self.include)
+            and not any(fnmatchcase(path, pattern) for pattern in self.exclude)
+        )
+
+    def sample_rate(self, entity: str) -> float:
+        return self.sample_rates.get(entity, self.default_sample_rate)
+
+
+def audit_read_policy_from_settings() -> AuditReadPolicy:
+    return AuditReadPolicy(
+        include=tuple(settings.audit_read_include),
+        exclude=tuple(settings.audit_read_exclude),
+        sample_rates=dict(settings.audit_read_sample_rates),
+        default_sample_rate=settings.audit_read_default_sample_rate,
+        dedup_window=settings.audit_read_dedup_window,
+    )
+
+
+class AuditLogsReadMiddleware:
+    def __init__(
+            self,
+            app: ASGIApp,
+            policy: Optional[AuditReadPolicy] = None,
+            dedup_max_entries: int = 10_000,
+            sampler: Callable[[], float] = random.random,
+        ):
+        self.app = app
+        self.policy = policy or audit_read_policy_from_settings()
+        # Uniform in [0, 1), a read is recorded when it is below the sample rate of its entity
+        self.sampler = sampler
+        # Recently recorded reads of this worker, by (user, tenant, path, query)
+        self._recent: Optional[LRUCache[tuple[str, Optional[str], str, str], bool]] = LRUCache(
+            maxsize=dedup_max_entries,
+            ttl=self.policy.dedup_window,
+        ) if self.policy.dedup_window > 0 else None
+
     def _get_entity_name(self, path: str) -> str:
         if "/api/v1/users" in path:
             return "User"
@@ -16,34 +76,44 @@ class AuditLogsReadMiddleware(BaseHTTPMiddleware):
             return "Role"
         elif "/api/v1/tenants" in path:
             return "Tenant"
-  
+
         return "Unknown"
-    async def dispatch(self, request: Request, call_next):
-        token = None
-        if "authorization" in request.headers:
-            token = request.headers["authorization"].replace("Bearer ", "")
-        user_service = get_user_service()
-        jwt_service = get_jwt_token_service()
-        role_service = get_role_service()
-        subscription_service = get_subscription_plan_service()    
-        if request.method == "GET":
-            current_user = await current_user_optional(
-                token,
-                user_service=user_service,
-                token_service=jwt_service,
-                role_service=role_service,
-                subscription_service=subscription_service
-            )
-        
-            entity = self._get_entity_name(request.url.path)
-            await capture_audit_log(AuditLogDto(
-                action="read",
-                entity=entity if entity != "Unknown" else "AuditLog",
-                user_id=str(current_user.id) if current_user else "Anonymous",
-                changes={"info": f"Read access to {request.url.path}"},
-                tenant_id=str(current_user.tenant_id) if current_user and current_user.tenant_id else None
-            ))
-    
-        
-        return await call_next(request)
-        
\ No newline at end of file
+
+    def _is_duplicate(self, user_id: str, tenant_id: Optional[str], path: str, query: str) -> bool:
+        if self._recent is None:
+            return False
+        key = (user_id, tenant_id, path, query)
+        if self._recent.get(key):
+            return True
+        self._recent.set(key, True)
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope.get(REVALIDATION_SCOPE_KEY)
+            or not self.policy.is_audited(scope["path"])
+        ):
+            # Not audited (cache refreshes aren't reads of a user), the principal is not even resolved
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        entity = self._get_entity_name(path)
+        entity = entity if entity != "Unknown" else "AuditLog"
+        if self.sampler() < self.policy.sample_rate(entity):
+            request = Request(scope)
+            current_user = await resolve_current_user_optional(request)
+            user_id = str(current_user.id) if current_user else "Anonymous"
+            tenant_id = str(current_user.tenant_id) if current_user and current_user.tenant_id else None
+            if not self._is_duplicate(user_id, tenant_id, path, request.url.query):
+                await audit_log_writer.write(AuditLogDto(
+                    action="read",
+                    entity=entity,
+                    user_id=user_id,
+                    changes={"info": f"Read access to {path}"},
+                    tenant_id=tenant_id
+                ))
+
+        await self.app(scope, receive, send)
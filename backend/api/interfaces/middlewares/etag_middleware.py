@@ -0,0 +1,92 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.common.utils import get_logger
+from api.infrastructure.caching.etag import etag_matches, make_etag
+
+logger = get_logger(__name__)
+
+# Headers a 304 keeps from the 200 response it replaces
+_NOT_MODIFIED_HEADERS = ("etag", "vary", "cache-control", "expires", "content-location", "date")
+
+
+class ETagMiddleware:
+    """
+        Conditional GET support. 200 responses that already carry an ETag (e.g. cache hits) are answered
+        with 304 when the client has that version, without reading their body. Other 200 JSON responses
+        with a Content-Length, sent in a single body message, are buffered to compute a strong ETag first.
+        Streamed responses (no Content-Length, or more than one body message) are passed through untagged,
+        so their first bytes aren't delayed until the whole body is produced.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message: Message | None = None
+        mode = "passthrough"  # "passthrough" | "buffer" | "not_modified"
+
+        async def send_not_modified(headers: Headers) -> None:
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [
+                    (name.encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers.items()
+                    if name in _NOT_MODIFIED_HEADERS
+                ],
+            })
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, mode
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] != 200:
+                    mode = "passthrough"
+                elif "etag" in headers:
+                    mode = "not_modified" if etag_matches(if_none_match, headers["etag"]) else "passthrough"
+                    if mode == "not_modified":
+                        await send_not_modified(headers)
+                        return
+                elif (
+                    "application/json" in headers.get("content-type", "")
+                    and "content-encoding" not in headers
+                    and "content-length" in headers
+                ):
+                    mode = "buffer"
+                    start_message = message
+                    return
+                await send(message)
+                return
+
+            if message["type"] != "http.response.body" or mode == "passthrough":
+                await send(message)
+                return
+
+            if mode == "not_modified":
+                # Body of the replaced response, the client already has it
+                return
+
+            if message.get("more_body", False):
+                # Streamed in several messages, don't hold it back
+                mode = "passthrough"
+                await send(start_message)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(start_message["headers"]))
+            headers["etag"] = make_etag(body)
+            if etag_matches(if_none_match, headers["etag"]):
+                logger.debug(f"Not modified: {scope['path']}")
+                await send_not_modified(headers)
+                return
+            await send({**start_message, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,122 +1,332 @@
-import json
-from redis.asyncio import Redis, from_url
-from starlette.middleware.base import BaseHTTPMiddleware
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlencode
+from starlette.datastructures import Headers
 from starlette.responses import Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from fastapi import Request
+from api.common.lru_cache import LRUCache
 from api.common.utils import get_logger
 from api.core.config import settings
-
-from api.core.container import get_jwt_token_service, get_role_service, get_user_service, get_subscription_plan_service
-from api.infrastructure.security.current_user import  current_user_optional
+from api.infrastructure.caching.cache_record import CachedResponse, accepts_gzip
+from api.infrastructure.caching.etag import gzip_etag, make_etag
+from api.infrastructure.caching.response_cache import (
+    ResponseCache,
+    match_resource,
+    resource_list_tag,
+    resource_tags,
+    response_cache,
+    role_tag,
+    tenant_tag,
+    user_tag,
+)
+from api.interfaces.caching.cache_policy import DEFAULT_CACHE_POLICY, CachePolicy, get_cache_policy
+from api.infrastructure.security.current_user import get_bearer_token, resolve_current_user_optional
 
 logger = get_logger(__name__)
 
 redis_cache_expiry = 300  # Cache expiry time in seconds (5 minutes)
-redis: Redis =  from_url(url=settings.redis_uri, decode_responses=True)
-
-not_allowed_cache_paths = [
-    "/api/v1/account/login",
-    "/api/v1/account/logout",
-    "/api/v1/account/register",
-    "/api/v1/account/refresh_token",
-    "/api/v1/app_configuration/",
-    "/api/v1/security/passkeys",
-    "/api/v1/configurations/stripe/webhooks",
-]
-
-
-class RedisCacheMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, expiry: int = redis_cache_expiry):
-        super().__init__(app)
+
+# Set on the scope of background refreshes of stale entries, inner middlewares (e.g. audit logs) skip them
+REVALIDATION_SCOPE_KEY = "cache.revalidation"
+
+class RedisCacheMiddleware:
+    lock_poll_interval = 0.05  # seconds between checks while another worker fills a key
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            expiry: int = redis_cache_expiry,
+            cache: ResponseCache = response_cache,
+            lock_timeout_ms: int = settings.response_cache_lock_timeout_ms,
+        ):
+        self.app = app
         self.expiry = expiry
+        self.cache = cache
+        self.lock_timeout_ms = lock_timeout_ms
+        # Cache fills in progress in this worker, by cache key
+        self._inflight: dict[str, asyncio.Future[Optional[CachedResponse]]] = {}
+        # Cache policy of the route matched by (method, path)
+        self._policies: LRUCache[tuple[str, str], CachePolicy] = LRUCache(maxsize=4096)
+        # Background refreshes in progress, referenced until done
+        self._revalidations: set[asyncio.Task] = set()
 
     async def _clear_cache(self, user_id: str, tenant_id: str):
-        async for key in redis.scan_iter(f"cache:cu{user_id}:ct{tenant_id}:*"):
-            await redis.delete(key)
+        await self.cache.invalidate_user(user_id, tenant_id)
+
+    def _get_policy(self, scope: Scope) -> CachePolicy:
+        """Cache policy declared on the endpoint of the route this request matches (see cache_policy)."""
+        app = scope.get("app")
+        if app is None:
+            return DEFAULT_CACHE_POLICY
+        key = (scope["method"], scope["path"])
+        policy = self._policies.get(key)
+        if policy is None:
+            policy = DEFAULT_CACHE_POLICY
+            for route in app.router.routes:
+                match, _ = route.matches(scope)
+                if match == Match.FULL:
+                    policy = get_cache_policy(getattr(route, "endpoint", None))
+                    break
+            self._policies.set(key, policy)
+        return policy
 
-    async def dispatch(self, request: Request, call_next):
-        token = None
-        if "authorization" in request.headers:
-            token = request.headers["authorization"].replace("Bearer ", "")
+    def _get_resource(self, path: str, current_user) -> Optional[tuple[str, Optional[str]]]:
+        if current_user is not None and path.endswith("/account/me"):
+            # The profile of the current user is an entry of the users resource.
+            return "users", str(current_user.id)
+        return match_resource(path)
 
-        if any(request.url.path.endswith(path) for path in not_allowed_cache_paths) or token is None:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        policy = self._get_policy(scope)
+        request = Request(scope)
+        token = get_bearer_token(request)
+
+        if not policy.enabled or token is None:
             logger.debug(f"Bypassing cache for path: {request.url.path}")
-            return await call_next(request)
-            
+            await self.app(scope, receive, send)
+            return
+
         try:
-            
-            user_service = get_user_service()
-            jwt_service = get_jwt_token_service()
-            role_service = get_role_service()
-            subscription_service = get_subscription_plan_service()
-
-            current_user = await current_user_optional(
-                token,
-                user_service=user_service,
-                token_service=jwt_service,
-                role_service=role_service,
-                subscription_service=subscription_service
-            )
+            current_user = await resolve_current_user_optional(request)
         except Exception as e:
             logger.debug(f"Could not resolve current_user in middleware: {e}")
             current_user = None
 
         user_id = getattr(current_user, "id", "anonymous")
         tenant_id = getattr(current_user, "tenant_id", "default")
-        cache_base = f"cu{user_id}:ct{tenant_id}:{request.url.path}?{request.url.query}"
+        if policy.vary is None:
+            query = request.url.query
+        else:
+            query = urlencode([(name, value) for name in policy.vary for value in request.query_params.getlist(name)])
+        if policy.scope == "tenant":
+            # Shared by the users of the tenant with the same role, they pass the same permission checks.
+            role_id = getattr(current_user, "role_id", None)
+            cache_base = f"ct{tenant_id}:cr{role_id}:{request.url.path}?{query}"
+            tags = [tenant_tag(tenant_id), role_tag(tenant_id, role_id)]
+        else:
+            cache_base = f"cu{user_id}:ct{tenant_id}:{request.url.path}?{query}"
+            tags = [user_tag(user_id, tenant_id), tenant_tag(tenant_id)]
         logger.debug(f"Cache base string: {cache_base}")
         cache_key = f"cache:{cache_base}"
+        resource = self._get_resource(request.url.path, current_user)
 
         logger.debug(request.method + " " + request.url.path + "?" + request.url.query)
         # Only cache GET requests
         if request.method != "GET":
-            logger.debug(f"Clearing cache for key: {cache_key}")
-            await self._clear_cache(user_id, tenant_id)
-            logger.debug("Cache cleared for non-GET request.")
-            return await call_next(request)
-           
+            # Writes to a cached resource are invalidated by its repository, only for the affected entries.
+            # Anything else may have changed the user's view, so clear it.
+            if resource is None:
+                logger.debug(f"Clearing cache for key: {cache_key}")
+                await self._clear_cache(user_id, tenant_id)
+                logger.debug("Cache cleared for non-GET request.")
+            await self.app(scope, receive, send)
+            return
+
+
+        if resource is not None:
+            tags.extend(resource_tags(tenant_id, *resource))
+        tags.extend(resource_list_tag(tenant_id, dependency) for dependency in policy.depends_on)
+        context = _CacheContext(
+            key=cache_key,
+            tags=tags,
+            ttl=policy.ttl or self.expiry,
+            user_id=user_id,
+            tenant_id=tenant_id,
+        )
 
         # --- Try reading from cache
-        cached_value = await redis.get(cache_key)
-        if cached_value:
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
             logger.debug(f"Cache hit for key: {cache_key}")
-            cached = json.loads(cached_value)
-            return Response(
-                content=cached["body"],
-                status_code=cached["status"],
-                media_type=cached["media_type"],
-                headers=cached.get("headers", {}),
-            )
-
-        # --- Cache miss → execute route handler
-        response = await call_next(request)
-
-        # Read and rebuild response body
-        body = b"".join([chunk async for chunk in response.body_iterator])
-        body_text = body.decode()
-        content_type = response.headers.get("content-type", "")
-
-        # Cache only 200 OK + JSON responses
-        if response.status_code == 200  and "application/json" in content_type:
-            to_cache = json.dumps({
-                "body": body_text,
-                "status": response.status_code,
-                "media_type": content_type,
-            })
-            await redis.set(cache_key, to_cache, ex=self.expiry)
-            logger.debug(f"Cache set for key: {cache_key}")
-
-        if response.status_code == 401 and "application/json" in content_type and request.url.path not in not_allowed_cache_paths:
-            logger.debug(f"Response status {response.status_code} not cached.")
-            await self._clear_cache(user_id, tenant_id)
-            logger.debug(f"Cleared cache for user: {user_id}, tenant: {tenant_id}")
-            return await call_next(request)
-
-
-        # Return new Response (since body_iterator is consumed)
-        return Response(
-            content=body_text,
-            status_code=response.status_code,
-            headers=dict(response.headers),
-            media_type=content_type,
-        )
\ No newline at end of file
+            await self._send_cached(cached, request, scope, receive, send)
+            if not cached.is_fresh:
+                # The client already has the stale copy, refresh it in the background.
+                self._schedule_revalidation(scope, context)
+            return
+
+        # --- Cache miss → execute route handler once per key, concurrent requests wait for its result
+        await self._fill(request, scope, receive, send, context)
+
+    async def _send_cached(self, cached: CachedResponse, request: Request, scope: Scope, receive: Receive, send: Send):
+        headers = dict(cached.headers)
+        body = cached.body
+        if cached.encoding is not None:
+            headers["vary"] = "Accept-Encoding"
+            if accepts_gzip(request.headers.get("accept-encoding")):
+                # Pass the stored compressed bytes straight through
+                headers["content-encoding"] = cached.encoding
+                if "etag" in headers:
+                    headers["etag"] = gzip_etag(headers["etag"])
+            else:
+                body = cached.decompressed_body()
+        response = Response(
+            content=body,
+            status_code=cached.status,
+            media_type=cached.media_type,
+            headers=headers,
+        )
+        await response(scope, receive, send)
+
+    async def _fill(self, request: Request, scope: Scope, receive: Receive, send: Send, context: "_CacheContext"):
+        """
+            Single-flight fill of a missing key. The first request of this worker takes the Redis lock and
+            runs the handler, other requests of this worker await its result. Workers that don't get the
+            lock wait for the holder to store the entry. Whoever times out runs the handler itself.
+        """
+        inflight = self._inflight.get(context.key)
+        if inflight is not None:
+            cached = await self._wait_inflight(inflight)
+            if cached is not None:
+                await self._send_cached(cached, request, scope, receive, send)
+                return
+            await self._run_and_cache(scope, receive, send, context)
+            return
+
+        future: asyncio.Future[Optional[CachedResponse]] = asyncio.get_running_loop().create_future()
+        self._inflight[context.key] = future
+        try:
+            lock = await self.cache.acquire_lock(context.key, self.lock_timeout_ms)
+            if lock is None:
+                cached = await self._wait_for_lock_holder(context.key)
+                if cached is not None:
+                    future.set_result(cached)
+                    await self._send_cached(cached, request, scope, receive, send)
+                    return
+            try:
+                future.set_result(await self._run_and_cache(scope, receive, send, context))
+            finally:
+                if lock is not None:
+                    await self.cache.release_lock(context.key, lock)
+        finally:
+            if not future.done():
+                future.set_result(None)
+            self._inflight.pop(context.key, None)
+
+    def _schedule_revalidation(self, scope: Scope, context: "_CacheContext") -> None:
+        """
+            Refresh a stale entry in a detached task, the request completes right away.
+            The refresh runs on a copy of the scope marked with REVALIDATION_SCOPE_KEY, with its own state.
+        """
+        if context.key in self._inflight:
+            return
+        refresh_scope = {**scope, "state": dict(scope.get("state", {})), REVALIDATION_SCOPE_KEY: True}
+        task = asyncio.create_task(self._revalidate(refresh_scope, context))
+        self._revalidations.add(task)
+        task.add_done_callback(self._revalidations.discard)
+
+    async def _revalidate(self, scope: Scope, context: "_CacheContext"):
+        """Refresh a stale entry, unless another request is already doing it. Runs detached, so errors are only logged."""
+        try:
+            lock = await self.cache.acquire_lock(context.key, self.lock_timeout_ms)
+            if lock is None:
+                return
+            try:
+                logger.debug(f"Revalidating stale cache key: {context.key}")
+                await self._run_and_cache(scope, _empty_request, _discard, context)
+            finally:
+                await self.cache.release_lock(context.key, lock)
+        except Exception as e:
+            logger.warning(f"Could not revalidate cache key {context.key}: {e}")
+
+    async def _wait_inflight(self, future: asyncio.Future) -> Optional[CachedResponse]:
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.lock_timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _wait_for_lock_holder(self, key: str) -> Optional[CachedResponse]:
+        """Poll for the entry another worker is filling. Returns None once the lock is gone or times out."""
+        deadline = time.monotonic() + self.lock_timeout_ms / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
+            if not await self.cache.is_locked(key):
+                return None
+        return None
+
+    async def _run_and_cache(self, scope: Scope, receive: Receive, send: Send, context: "_CacheContext") -> Optional[CachedResponse]:
+        """
+            Execute the route handler, passing the response through.
+            Body chunks are only collected (teed) when the response is cacheable.
+            Returns the stored entry, None when the response was not cacheable.
+        """
+        status_code = 0
+        content_type = ""
+        should_cache = False
+        body_chunks: list[bytes] = []
+        stored: Optional[CachedResponse] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, content_type, should_cache
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = Headers(raw=message["headers"])
+                content_type = response_headers.get("content-type", "")
+                # Cache only 200 OK + JSON responses, as sent by the handler (not already encoded)
+                should_cache = (
+                    status_code == 200
+                    and "application/json" in content_type
+                    and "content-encoding" not in response_headers
+                )
+                await send(message)
+                return
+
+            if message["type"] == "http.response.body":
+                if should_cache:
+                    body_chunks.append(message.get("body", b""))
+                await send(message)
+                if not message.get("more_body", False):
+                    await on_response_complete()
+                return
+
+            await send(message)
+
+        async def on_response_complete() -> None:
+            nonlocal stored
+            if should_cache:
+                body = b"".join(body_chunks)
+                to_cache = CachedResponse(
+                    body=body,
+                    status=status_code,
+                    media_type=content_type,
+                    # Served on hits, so conditional requests are answered without touching the body
+                    headers={"etag": make_etag(body)},
+                )
+                stored = await self.cache.set(context.key, to_cache, ttl=context.ttl, tags=context.tags)
+                logger.debug(f"Cache set for key: {context.key}")
+
+            if status_code == 401 and "application/json" in content_type:
+                logger.debug(f"Response status {status_code} not cached.")
+                await self._clear_cache(context.user_id, context.tenant_id)
+                logger.debug(f"Cleared cache for user: {context.user_id}, tenant: {context.tenant_id}")
+
+        await self.app(scope, receive, send_wrapper)
+        return stored
+
+
+@dataclass(frozen=True)
+class _CacheContext:
+    key: str
+    tags: list[str]
+    ttl: int
+    user_id: str
+    tenant_id: str
+
+
+async def _discard(message: Message) -> None:
+    """ASGI send for background refreshes, the client already got its response."""
+
+
+async def _empty_request() -> Message:
+    """ASGI receive for background refreshes, GET requests have no body."""
+    return {"type": "http.request", "body": b"", "more_body": False}
@@ -1,9 +1,9 @@
 from typing import Annotated, Optional
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 from fastapi import  Depends, Request
 from beanie import PydanticObjectId
+from api.common.tenant_context import reset_current_database, set_current_database
 from api.common.utils import get_host_main_domain_name, get_logger, is_subdomain
-from api.core.config import settings
 
 from api.core.container import get_tenant_service
 from api.core.exceptions import TenantNotFoundException
@@ -12,8 +12,16 @@ from api.infrastructure.persistence.mongodb import mongo_client as db
 
 logger = get_logger(__name__)
 
-class TenantMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class TenantMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
         tenant_id: Optional[str] = None
         tenant_host = get_tenant_host(request)
         logger.debug(f"Tenant host found: {tenant_host}")
@@ -28,36 +36,36 @@ class TenantMiddleware(BaseHTTPMiddleware):
                 else:
                     logger.debug(f"Host '{tenant_host}' identified as custom domain.")
                     tenant = await tenant_service.find_by_custom_domain(tenant_host)
-                
+
                 tenant_id = str(tenant.id)
                 logger.debug(f"Tenant ID resolved from custom domain '{tenant_host}': {tenant_id}")
                 request.state.frontend_host = tenant_host
             except TenantNotFoundException as e:
                 logger.warning(f"Error resolving tenant from custom domain '{tenant_host}': {e}")
-                
-        
+
+
         if tenant_id is None:
             tenant_id = request.headers.get("X-Tenant-ID") or request.query_params.get('tenant_id') or None
 
- 
+
         if tenant_id is not None:
             logger.debug(f"Tenant ID found: {tenant_id}")
             request.state.tenant_id = PydanticObjectId(tenant_id)
-            # Initialize the database for the tenant and initialize Beanie with tenant-specific models
-            await db.init_db(f"tenant_{tenant_id}", is_tenant=True)
-            logger.debug(f"Database initialized for tenant: tenant_{tenant_id}")
-            return await call_next(request)
-        
-        
-        # If no tenant ID is provided, ensure we are using the default database
-        if db.is_tenant_active():
-            # Reset to default DB if no tenant ID is provided
-            await db.init_db(settings.mongo_db_name, is_tenant=False)
-        request.state.tenant_id = None
-        logger.debug("No tenant ID provided, using default database.")
-
-        return await call_next(request)
-        
+            # Route this request to the tenant database. Models and indexes are initialized once per tenant database.
+            database = await db.get_tenant_database(f"tenant_{tenant_id}")
+            logger.debug(f"Request routed to tenant database: tenant_{tenant_id}")
+        else:
+            # If no tenant ID is provided, route the request to the default (host) database
+            request.state.tenant_id = None
+            database = await db.get_database()
+            logger.debug("No tenant ID provided, using default database.")
+
+        token = set_current_database(database)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_current_database(token)
+
 
 
 def get_tenant_host(request: Request) -> Optional[str]:
@@ -85,7 +93,7 @@ def get_tenant_host(request: Request) -> Optional[str]:
     if host.startswith("localhost") or host.startswith("127.0.0.1"):
         # Handle localhost with optional
         return None
-    
+
     logger.debug(f"Extracted host: {host}")
     return host
 
@@ -96,4 +104,4 @@ def frontend_dynamic_host(request: Request) -> str:
    return getattr(request.state, "frontend_host", get_host_main_domain_name())
 
 
-FrontendHost = Annotated[str, Depends(frontend_dynamic_host)]
\ No newline at end of file
+FrontendHost = Annotated[str, Depends(frontend_dynamic_host)]
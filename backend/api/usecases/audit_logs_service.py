@@ -1,35 +1,83 @@
-from io import BytesIO
-from typing import List, Optional
+import os
+from typing import AsyncIterator, BinaryIO, Optional
 
 from fastapi import UploadFile
 from api.common.audit_logs_repository import AuditLogRepository
 from api.common.utils import get_logger
+from api.core.config import settings
 from api.domain.dtos.audit_logs_dto import AuditActionType, AuditLogDto, AuditLogListDto
+from api.domain.interfaces.audit_log_store import IAuditLogStore
 from api.domain.interfaces.email_service import IEmailService
 from api.interfaces.email_templates.download_template_html import download_template
+from api.usecases.file_service import FileService
 
 logger = get_logger(__name__)
 
 class AuditLogsService:
-    def __init__(self, audit_log_repository: AuditLogRepository, email_service: IEmailService):
+    def __init__(self, audit_log_repository: AuditLogRepository, email_service: IEmailService, audit_log_store: IAuditLogStore, file_service: FileService):
         self.audit_log_repository: AuditLogRepository = audit_log_repository
         self.email_service: IEmailService = email_service
+        self.audit_log_store: IAuditLogStore = audit_log_store
+        self.file_service: FileService = file_service
 
-    async def read_audit_logs(self, tenant_id: Optional[str] = None, limit: int = 10, skip: int = 0, action: Optional[AuditActionType] = None) -> AuditLogListDto:
-        return await self.audit_log_repository.list_audit_logs(tenant_id=tenant_id, limit=limit, skip=skip, action=action)
+    async def read_audit_logs(self, tenant_id: Optional[str] = None, limit: int = 10, skip: int = 0, action: Optional[AuditActionType] = None, cursor: Optional[str] = None) -> AuditLogListDto:
+        return await self.audit_log_store.list(tenant_id=tenant_id, limit=limit, skip=skip, action=action, cursor=cursor)
 
+    def iterate_audit_logs(self, action: Optional[AuditActionType] = None, tenant_id: Optional[str] = None) -> AsyncIterator[AuditLogDto]:
+        """All audit logs of a tenant, newest first, without loading them all at once."""
+        return self.audit_log_store.iterate(tenant_id=tenant_id, action=action)
 
-    async def generate_audit_logs_download(self, action: Optional[AuditActionType] = None, tenant_id: Optional[str] = None) -> List[AuditLogDto]:
-        return await self.audit_log_repository.return_all_audit_logs(action=action, tenant_id=tenant_id)
+    async def export_audit_logs(self, destination: BinaryIO, action: Optional[AuditActionType] = None, tenant_id: Optional[str] = None) -> int:
+        """
+            Write the audit logs as an xlsx workbook to `destination`, e.g. a temporary file.
+            Rows are streamed from the store into a write-only workbook, memory doesn't grow with the number of logs.
+            Returns the number of exported logs.
+        """
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title="Audit Logs")
+        ws.append(["Timestamp", "Tenant", "User", "Action", "Entity", "Changes"])
+        rows = 0
+        async for log in self.iterate_audit_logs(action=action, tenant_id=tenant_id):
+            ws.append([
+                log.timestamp,
+                log.tenant_id or "host",
+                log.user_id,
+                log.action,
+                log.entity,
+                str(log.changes)
+            ])
+            rows += 1
+        wb.save(destination)
+        return rows
 
     async def create_audit_log(self, audit_log: AuditLogDto) -> None:
         await self.audit_log_repository.add_audit_log(audit_log)
 
-    async def send_audit_log_report_via_email(self, to_email: str, first_name: str, attachment_data: BytesIO, attachment_filename: str) -> None:
+    async def send_audit_log_report_via_email(self, to_email: str, first_name: str, attachment_data: BinaryIO, attachment_filename: str) -> None:
+        """
+            Email a report. Reports larger than `audit_log_report_max_attachment_size` are uploaded to the
+            configured storage and the email contains a signed link instead.
+        """
+        size = attachment_data.seek(0, os.SEEK_END)
+        attachment_data.seek(0)
+        if size <= settings.audit_log_report_max_attachment_size:
+            await self.email_service.send_email(
+              to=to_email,
+              subject="Audit Logs Report",
+              body=download_template(user_first_name=first_name),
+              type="html",
+              attachments=[UploadFile(file=attachment_data, filename=attachment_filename)]
+            )
+            return
+
+        logger.info(f"Audit log report {attachment_filename} is {size} bytes, sending a download link")
+        key = await self.file_service.upload_file(UploadFile(file=attachment_data, filename=f"reports/{attachment_filename}"))
+        url = await self.file_service.get_file_url(file_key=key, expires_in=settings.audit_log_report_link_ttl)
         await self.email_service.send_email(
           to=to_email,
           subject="Audit Logs Report",
-          body=download_template(user_first_name=first_name),
-          type="html",
-          attachments=[UploadFile(file=attachment_data, filename=attachment_filename)]
-        )
\ No newline at end of file
+          body=download_template(user_first_name=first_name, download_url=url),
+          type="html"
+        )
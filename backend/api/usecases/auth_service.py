@@ -4,22 +4,24 @@ from fastapi_sso import OpenID
 from pydantic import EmailStr
 from api.common.dtos.token_dto import ActivationTokenPayloadDto, RefreshTokenPayloadDto, TokenPayloadDto, TokenRefreshRequestDto, TokenSetDto
 from api.common.exceptions import ForbiddenException, InvalidOperationException, UnauthorizedException
-from api.common.security import verify_password
+from api.common.security import verify_password_async
 from api.common.utils import get_logger, get_utc_now, is_tenancy_enabled, get_email_sharing_link
+from api.core.config import settings
 from api.core.exceptions import TenantNotFoundException, UserNotFoundException
 from api.domain.dtos.audit_logs_dto import AuditLogDto
 from api.domain.dtos.login_dto import LoginRequestDto
 from api.domain.dtos.role_dto import RoleDto
 from api.domain.dtos.tenant_dto import CreateTenantDto
-from api.domain.dtos.user_dto import CreateUserDto, UserActivationRequestDto, UserResendActivationEmailRequestDto
+from api.domain.dtos.user_dto import CreateUserDto, UserActivationRequestDto, UserDto, UserResendActivationEmailRequestDto
 from api.domain.entities.role import Role
 from api.domain.entities.sso_settings import SSOProvider
 from api.domain.entities.tenant import validate_subdomain
 from api.domain.entities.user import User
-from api.domain.enum.permission import Permission
+from api.domain.enum.permission import Permission, permissions_to_mask
 from api.domain.enum.role import RoleType
 from api.domain.interfaces.email_service import IEmailService
 from api.infrastructure.security.jwt_token_service import JwtTokenService
+from api.infrastructure.security.refresh_token_store import RefreshSession, RefreshTokenStore
 from api.interfaces.email_templates.password_reset_email_template_html import password_reset_email_template_html
 from api.interfaces.email_templates.notify_password_changes_template_html import notify_password_change_template_html
 from api.interfaces.email_templates.activation_template_html import activation_template_html
@@ -42,7 +44,8 @@ class AuthService:
             jwt_token_service: JwtTokenService,
             email_service: IEmailService,
             audit_log_service: AuditLogsService,
-            sso_settings_service: SSOSettingsService
+            sso_settings_service: SSOSettingsService,
+            refresh_token_store: RefreshTokenStore
         ):
         self.user_service: UserService = user_service
         self.tenant_service: TenantService = tenant_service
@@ -51,15 +54,16 @@ class AuthService:
         self.email_service: IEmailService = email_service
         self.audit_log_service: AuditLogsService = audit_log_service
         self.sso_settings_service: SSOSettingsService = sso_settings_service
+        self.refresh_token_store: RefreshTokenStore = refresh_token_store
         logger.info("Initialized.")
         print(self.email_service, "email service in auth service")
 
-    async def _get_token_set(self, user: User) -> TokenSetDto:
+    async def _get_token_payload(self, user: User, role: Role) -> TokenPayloadDto:
         """
-            Helper method to generate a TokenSetDto for the given user. Dont use this method outside this class.
+            Access token claims of the given user. In stateless mode they also carry everything needed to
+            authorize requests without loading the user and role: permission bitmask, role version and profile.
         """
-        role = await self.role_service.get_role_by_id(role_id=user.role_id)
-        role_doc = await role.to_serializable_dict()    
+        role_doc = await role.to_serializable_dict()
         payload = TokenPayloadDto(
                 sub=user.id,
                 email=user.email,
@@ -68,8 +72,26 @@ class AuthService:
                 role=RoleDto(**role_doc) if role_doc is not None else None,
                 tenant_id=user.tenant_id
             )
+        if settings.stateless_auth_enabled:
+            payload.perm_mask = permissions_to_mask(role.permissions or [])
+            payload.role_version = role.version
+            payload.profile = UserDto(**await user.to_serializable_dict())
+        return payload
 
-        res = await self.jwt_token_service.generate_tokens(payload)
+    async def _get_token_set(self, user: User) -> TokenSetDto:
+        """
+            Helper method to generate a TokenSetDto for the given user. Dont use this method outside this class.
+        """
+        role = await self.role_service.get_role_by_id(role_id=user.role_id)
+        payload = await self._get_token_payload(user, role)
+        session = await self.refresh_token_store.create(
+            user_id=user.id,
+            tenant_id=user.tenant_id,
+            claims=payload.model_dump_json(),
+            role_version=role.version
+        )
+
+        res = await self.jwt_token_service.generate_tokens(payload, session=session)
         await self.audit_log_service.create_audit_log(audit_log=AuditLogDto(
             entity="User",
             action="login",
@@ -139,7 +161,7 @@ class AuthService:
 
     async def login(self, req: LoginRequestDto) -> TokenSetDto:
         user = await self.user_service.find_by_email(email=req.email)
-        if verify_password(req.password, user.password) is False:
+        if await verify_password_async(req.password, user.password) is False:
             raise UnauthorizedException("Authentication failed. Please check your credentials.")
 
         return await self._get_token_set(user)
@@ -156,7 +178,7 @@ class AuthService:
             user = await self.user_service.find_by_email(email=email)
             if user.sso_provider_id != provider_name:
                 user.sso_provider_id = provider_name
-                await user.save()
+                await self.user_service.save_user(user)
             return await self._get_token_set(user)
         except UserNotFoundException:
             logger.error(f"User not found for email: {email}")
@@ -176,7 +198,7 @@ class AuthService:
             user.is_active = True
             user.activated_at = get_utc_now()
             user.sso_provider_id = provider_name
-            await user.save()
+            await self.user_service.save_user(user)
         return await self._get_token_set(user)
 
     async def new_user_creation(self, new_user: CreateUserDto, tenant_id: Optional[str] = None) -> None:
@@ -249,7 +271,15 @@ class AuthService:
 
 
 
-    async def logout(self, user_id: str, tenant_id: str | None) -> None:
+    async def logout(self, user_id: str, tenant_id: str | None, refresh_token: str | None = None) -> None:
+        """Revoke the session of the given refresh token, or every session of the user when there is none."""
+        payload = None
+        if refresh_token is not None:
+            payload = await self.jwt_token_service.decode_token(token=refresh_token, type="refresh_token")
+        if payload is not None and payload.family is not None and str(payload.sub) == user_id:
+            await self.refresh_token_store.revoke(payload.family, user_id=user_id, tenant_id=tenant_id)
+        else:
+            await self.refresh_token_store.revoke_all(user_id=user_id, tenant_id=tenant_id)
         await self.audit_log_service.create_audit_log(audit_log=AuditLogDto(
             entity="User",
             action="logout",
@@ -263,26 +293,56 @@ class AuthService:
         """
             Refresh the access token using the provided refresh token.
             On success, returns a new TokenSetDto containing the new access and refresh tokens.
-            Raises UnauthorizedException if the refresh token is invalid or expired.
+            Raises UnauthorizedException if the refresh token is invalid, expired, revoked or was already used.
+            The access token claims are kept with the session, the database is only read when the user or its role changed.
         """
         refresh_token_payload: RefreshTokenPayloadDto = await self.jwt_token_service.decode_token(token=token.refresh_token, type="refresh_token")
 
         if refresh_token_payload is None:
             raise UnauthorizedException("Invalid refresh token")
-        
+        if refresh_token_payload.family is None or refresh_token_payload.jti is None:
+            return await self._migrate_legacy_refresh_token(token.refresh_token, refresh_token_payload)
+
+        rotated = await self.refresh_token_store.rotate(
+            family=refresh_token_payload.family,
+            jti=refresh_token_payload.jti,
+            user_id=refresh_token_payload.sub,
+            tenant_id=refresh_token_payload.tenant_id
+        )
+        payload = None
+        if rotated.claims is not None and rotated.role_version is not None:
+            payload = TokenPayloadDto.model_validate_json(rotated.claims)
+            if payload.role is None or rotated.role_version != await self.role_service.get_role_version(payload.role.id):
+                payload = None
+
+        if payload is None:
+            user = await self.user_service.get_user_by_id(user_id=str(refresh_token_payload.sub))
+            role = await self.role_service.get_role_by_id(role_id=user.role_id)
+            payload = await self._get_token_payload(user, role)
+            await self.refresh_token_store.set_claims(rotated.family, payload.model_dump_json(), role.version)
+
+        return await self.jwt_token_service.generate_tokens(payload, session=RefreshSession(family=rotated.family, jti=rotated.jti))
+
+
+
+    async def _migrate_legacy_refresh_token(self, refresh_token: str, refresh_token_payload: RefreshTokenPayloadDto) -> TokenSetDto:
+        """
+            Exchange a refresh token issued before token families for the tokens of a new family, once.
+            Keeps users logged in across the upgrade, the returned refresh token is rotated like any other.
+        """
+        if not await self.refresh_token_store.claim_legacy(refresh_token):
+            raise UnauthorizedException("Refresh token has already been used.")
         user = await self.user_service.get_user_by_id(user_id=str(refresh_token_payload.sub))
         role = await self.role_service.get_role_by_id(role_id=user.role_id)
-        role_doc = await role.to_serializable_dict()    
-        payload = TokenPayloadDto(
-            sub=user.id,
-            email=user.email,
-            is_active=user.is_active,
-            activated_at=user.activated_at,
-            role=RoleDto(**role_doc) if role_doc is not None else None,
-            tenant_id=user.tenant_id
+        payload = await self._get_token_payload(user, role)
+        session = await self.refresh_token_store.create(
+            user_id=user.id,
+            tenant_id=user.tenant_id,
+            claims=payload.model_dump_json(),
+            role_version=role.version
         )
-        return await self.jwt_token_service.generate_tokens(payload)
-
+        logger.info(f"Migrated a legacy refresh token of user {user.id} to a token family")
+        return await self.jwt_token_service.generate_tokens(payload, session=session)
 
 
     async def initate_password_reset(self, email: EmailStr, domain: str) -> None:
@@ -378,7 +438,7 @@ class AuthService:
         
         user.is_active = True
         user.activated_at = get_utc_now()
-        await user.save()
+        await self.user_service.save_user(user)
         logger.info(f"User {user.id} ({user.email}) has been activated.")
         
 
@@ -427,7 +487,7 @@ class AuthService:
         
         user.email = payload.email
         logger.info(f"User {user.id} changed email to {payload.email}.")
-        await user.save()
+        await self.user_service.save_user(user)
         html = notify_email_change_template_html(user_first_name=user.first_name)
         await self.email_service.send_email(
             to=user.email,
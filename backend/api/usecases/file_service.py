@@ -5,5 +5,5 @@ from api.infrastructure.externals.file_upload import FileUpload
 class FileService(FileUpload, FileRetrieval):
 
 
-    async def get_file_url(self, file_key: str) -> str:
-        return await self.generate_read_url(file_key)
\ No newline at end of file
+    async def get_file_url(self, file_key: str, expires_in: int = 3600) -> str:
+        return await self.generate_read_url(file_key, expires_in)
@@ -7,7 +7,7 @@ from api.domain.interfaces.email_service import IEmailService
 from api.infrastructure.persistence.repositories.user_magic_link_repository_impl import UserMagicLinkRepository
 from api.interfaces.email_templates.magic_link_login_template_html import magic_link_login_template
 from api.usecases.tenant_service import TenantService
-from api.common.security import hash_it, JWT_SECRET, validate_hashed_value
+from api.common.security import hash_it_async, JWT_SECRET, validate_hashed_value_async
 
 
 class EmailMagicLinkService:
@@ -29,7 +29,7 @@ class EmailMagicLinkService:
             user_dto (UserDto): The user data transfer object containing user information.
         """
         try:
-            token = hash_it(user_dto.id + JWT_SECRET)
+            token = await hash_it_async(user_dto.id + JWT_SECRET)
             record = await self.user_magic_link_repo.create_magic_link(user_id=user_dto.id, token=token)
             domain = get_host_main_domain_name()
             if user_dto.tenant_id:
@@ -62,7 +62,7 @@ class EmailMagicLinkService:
         if record is None:
             return False
         
-        result = validate_hashed_value(value=user_id, hashed_value=token)
+        result = await validate_hashed_value_async(value=user_id, hashed_value=token)
         if result:
             # Optionally, you can delete the magic link after successful validation to prevent reuse
             await self.user_magic_link_repo.delete(id=str(record.id))
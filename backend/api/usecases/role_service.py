@@ -1,19 +1,25 @@
+from typing import Optional
 from beanie import PydanticObjectId
 from api.common.utils import get_logger
 from api.core.exceptions import RoleAlreadyExistsException, RoleNotFoundException
 from api.domain.dtos.role_dto import CreateRoleDto, RoleListDto, UpdateRoleDto, UpdateRoleDto
 from api.domain.entities.role import Role
+from api.domain.enum.permission import Permission
 from api.infrastructure.persistence.repositories.role_repository_impl import RoleRepository
+from api.infrastructure.security.role_cache import CachedRole, RoleCache
+from api.infrastructure.security.role_version_store import DELETED_ROLE_VERSION, RoleVersionStore
 
 logger = get_logger(__name__)
 
 class RoleService:
-    def __init__(self, role_repository: RoleRepository):
+    def __init__(self, role_repository: RoleRepository, role_version_store: RoleVersionStore, role_cache: RoleCache):
         self.role_repository = role_repository
+        self.role_version_store = role_version_store
+        self.role_cache = role_cache
         logger.info("Initialized.")
 
-    async def list_roles(self, skip: int = 0, limit: int = 10) -> RoleListDto:
-        return await self.role_repository.list(skip=skip, limit=limit)
+    async def list_roles(self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, include_total: bool = True) -> RoleListDto:
+        return await self.role_repository.list(skip=skip, limit=limit, cursor=cursor, include_total=include_total)
     
     async def find_by_name(self, name: str) -> Role:
         """Find a role by its name. Raises RoleNotFoundException if not found."""
@@ -25,11 +31,30 @@ class RoleService:
     async def search_role_by_name(self, name: str) -> list[Role]:
         return await self.role_repository.search({"name": {"$regex": name, "$options": "i"}})
 
-    async def get_role_by_id(self, role_id: str) -> Role:
-        existing = await self.role_repository.get(id=role_id)
-        if existing is None:
+    async def _get_cached_role(self, role_id: str) -> CachedRole:
+        cached = await self.role_cache.get_or_load(str(role_id), lambda: self.role_repository.get(id=role_id))
+        if cached is None:
             raise RoleNotFoundException(role_id=role_id)
-        return existing
+        return cached
+
+    async def get_role_by_id(self, role_id: str) -> Role:
+        """Served from the role cache. Returns a copy, changing it doesn't affect the cached role."""
+        cached = await self._get_cached_role(role_id)
+        return cached.role.model_copy(deep=True)
+
+    async def get_role_permissions(self, role_id: str) -> frozenset[Permission]:
+        """Permission set of a role, computed once when the role is cached."""
+        cached = await self._get_cached_role(role_id)
+        return cached.permissions
+
+    async def get_role_version(self, role_id: str) -> int:
+        """Current version of a role, from the shared version store when possible. Deleted roles have a negative version."""
+        version = await self.role_version_store.get(role_id)
+        if version is None:
+            role = await self.role_repository.get(id=role_id)
+            version = role.version if role is not None else DELETED_ROLE_VERSION
+            await self.role_version_store.set(role_id, version)
+        return version
 
     async def create_role(self, role_data: CreateRoleDto) -> PydanticObjectId:
         existing = await self.role_repository.single_or_none(name=role_data.name)
@@ -1,24 +1,111 @@
-from typing import List
+import asyncio
+import contextlib
+from typing import List, Optional
 from beanie import PydanticObjectId
+from redis.asyncio import Redis
 
+from api.common.lru_cache import LRUCache
 from api.common.utils import get_logger, validate_password
+from api.core.config import settings
 from api.core.exceptions import TenantNotFoundException
 from api.domain.dtos.tenant_dto import CreateTenantDto, FeatureDto, TenantListDto, UpdateTenantDto
 from api.domain.entities.tenant import Feature, Tenant
+from api.infrastructure.caching.redis_client import redis
 from api.infrastructure.persistence.repositories.tenant_repository_impl import TenantRepository
 from api.domain.enum.feature import Feature as FeatureEnum
 
 logger = get_logger(__name__)
 
+# Marker stored in the tenant cache for lookups that didn't match any tenant (negative caching).
+_TENANT_NOT_FOUND = object()
+
 class TenantService:
-    def __init__(self, tenant_repository: TenantRepository):
+    """
+        Tenant lookups are cached in-process, every worker has its own copy. Changes are broadcast on a Redis
+        channel so each worker drops its cached tenants. Entries also expire after `tenant_cache_ttl`, which
+        bounds staleness if an invalidation message is missed.
+    """
+    invalidation_channel = "tenants:invalidations"
+
+    def __init__(self, tenant_repository: TenantRepository, client: Redis = redis):
         self.tenant_repository = tenant_repository
+        self.client = client
+        self._tenant_cache: LRUCache[tuple[str, str], Tenant | object] = LRUCache(maxsize=settings.tenant_cache_size, ttl=settings.tenant_cache_ttl)
+        self._listener: Optional[asyncio.Task] = None
         logger.info("Initialized.")
 
+    async def _cached_lookup(self, field: str, value: str, loader) -> Tenant:
+        """
+            Resolve a tenant through the in-process TTL cache. Unknown values are cached as well (for a shorter time)
+            so repeated requests for an unknown host don't hit the database. Raises TenantNotFoundException if not found.
+        """
+        key = (field, str(value))
+        cached = self._tenant_cache.get(key)
+        if cached is _TENANT_NOT_FOUND:
+            raise TenantNotFoundException(value)
+        if cached is not None:
+            # Callers may mutate and save the returned document, never hand out the cached instance.
+            return cached.model_copy(deep=True)
+
+        existing = await loader()
+        if existing is None:
+            self._tenant_cache.set(key, _TENANT_NOT_FOUND, ttl=settings.tenant_cache_negative_ttl)
+            raise TenantNotFoundException(value)
+        self._tenant_cache.set(key, existing.model_copy(deep=True))
+        return existing
 
-    async def list_tenants(self, skip: int = 0, limit: int = 10) -> TenantListDto:
-        """List tenants with pagination."""
-        return await self.tenant_repository.list(skip=skip, limit=limit)
+    async def invalidate_tenant_cache(self) -> None:
+        """
+            Drop all cached tenant lookups, in this worker and the others.
+            Call this whenever a tenant is created, updated or deleted.
+        """
+        self._tenant_cache.clear()
+        try:
+            await self.client.publish(self.invalidation_channel, "")
+        except Exception as e:
+            # The change is saved, other workers catch up when their entries expire.
+            logger.warning(f"Failed to broadcast tenant cache invalidation: {e}")
+        logger.debug("Tenant cache invalidated.")
+
+    async def start(self) -> None:
+        """Start listening for tenant changes made by other workers."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.invalidation_channel)
+                    # Changes may have been missed while (re)connecting.
+                    self._tenant_cache.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._tenant_cache.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Tenant invalidation listener disconnected, retrying: {e}")
+                self._tenant_cache.clear()
+                await asyncio.sleep(1)
+
+
+    async def save_tenant(self, tenant: Tenant) -> Tenant:
+        """Persist changes made to a loaded tenant."""
+        await self.tenant_repository.save(tenant)
+        await self.invalidate_tenant_cache()
+        return tenant
+
+    async def list_tenants(self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, include_total: bool = True) -> TenantListDto:
+        """List tenants with pagination, by offset (`skip`) or from a `cursor` returned as `next_cursor`."""
+        return await self.tenant_repository.list(skip=skip, limit=limit, cursor=cursor, include_total=include_total)
 
     async def find_by_name(self, name: str) -> Tenant | None:
         """Get tenant by name. Raises TenantNotFoundException if not found."""
@@ -28,36 +115,40 @@ class TenantService:
         return exisiting
 
     async def find_by_custom_domain(self, custom_domain: str) -> Tenant | None:
-        """Get tenant by custom domain. Raises TenantNotFoundException if not found."""
-        existing = await self.tenant_repository.single_or_none(custom_domain=custom_domain)
-        if existing is None:
-            raise TenantNotFoundException(custom_domain)
-        return existing
+        """Get tenant by custom domain. Cached for a short time. Raises TenantNotFoundException if not found."""
+        return await self._cached_lookup(
+            "custom_domain", custom_domain,
+            lambda: self.tenant_repository.single_or_none(custom_domain=custom_domain)
+        )
 
     async def find_by_subdomain(self, subdomain: str) -> Tenant | None:
-        """Get tenant by subdomain. Raises TenantNotFoundException if not found."""
-        existing = await self.tenant_repository.single_or_none(subdomain=subdomain)
-        if existing is None:
-            raise TenantNotFoundException(subdomain)
-        return existing
+        """Get tenant by subdomain. Cached for a short time. Raises TenantNotFoundException if not found."""
+        return await self._cached_lookup(
+            "subdomain", subdomain,
+            lambda: self.tenant_repository.single_or_none(subdomain=subdomain)
+        )
 
     async def get_tenant_by_id(self, tenant_id: str) -> Tenant:
-        """Get tenant by ID. Raises TenantNotFoundException if not found."""
-        existing = await self.tenant_repository.get(id=tenant_id)
-        if existing is None:
-            raise TenantNotFoundException(tenant_id)
-        return existing
+        """Get tenant by ID. Cached for a short time. Raises TenantNotFoundException if not found."""
+        return await self._cached_lookup(
+            "id", tenant_id,
+            lambda: self.tenant_repository.get(id=str(tenant_id))
+        )
 
     async def create_tenant(self, tenant_data: CreateTenantDto) -> PydanticObjectId | None:
         """Create a new tenant. Raises InvalidOperationException if admin password is weak."""
         validate_password(tenant_data.admin_password)
         response = await self.tenant_repository.create(tenant_data)
+        # The subdomain may have been cached as unknown
+        await self.invalidate_tenant_cache()
         return response
 
 
     async def delete_tenant(self, tenant_id: str) -> None:
         """Delete tenant by ID. Raises TenantNotFoundException if not found."""
-        if await self.tenant_repository.delete(id=tenant_id) is None:
+        deleted = await self.tenant_repository.delete(id=tenant_id)
+        await self.invalidate_tenant_cache()
+        if deleted is None:
             raise TenantNotFoundException(tenant_id)
 
     async def total_count(self) -> int:
@@ -80,7 +171,7 @@ class TenantService:
             tenant.features.append(Feature(name=feature.name, enabled=feature.enabled))
         
         # Save the updated tenant.. 
-        await tenant.save()
+        await self.save_tenant(tenant)
         logger.debug(f"Feature '{feature.name}' updated to '{feature.enabled}' for tenant '{tenant_id}'")
 
 
@@ -91,6 +182,7 @@ class TenantService:
         tenant.custom_domain = data.custom_domain
         tenant.subscription_id = data.subscription_id
         await self.tenant_repository.update(tenant_id, tenant.model_dump(exclude_none=True))
+        await self.invalidate_tenant_cache()
 
 
     async def get_features_by_tenant_id(self, tenant_id: str) -> List[FeatureDto]:
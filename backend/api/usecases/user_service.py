@@ -1,6 +1,7 @@
-from typing import Any
+from typing import Any, Optional
 from beanie import PydanticObjectId
 from pydantic import EmailStr
+from api.common.base_repository import CountStrategy
 from api.common.exceptions import InvalidOperationException
 from api.common.utils import get_logger
 from api.core.exceptions import EmailAlreadyExistsException, UserNotFoundException
@@ -10,7 +11,7 @@ from api.domain.dtos.user_dto import CreateUserDto, UpdateUserDto, UserDto, User
 from api.domain.entities.user_password_reset import UserPasswordReset
 from api.infrastructure.persistence.repositories.user_password_reset_repository_impl import UserPasswordResetRepository
 from api.infrastructure.persistence.repositories.user_repository_impl import UserRepository
-from api.common.security import hash_it
+from api.common.security import hash_it_async
 
 logger = get_logger(__name__)
 
@@ -26,8 +27,8 @@ class UserService:
         logger.info("Initialized.")
 
 
-    async def list_users(self, skip: int = 0, limit: int = 10) -> UserListDto:
-        return await self.user_repository.list(skip=skip, limit=limit)
+    async def list_users(self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, include_total: bool = True) -> UserListDto:
+        return await self.user_repository.list(skip=skip, limit=limit, cursor=cursor, include_total=include_total)
 
     async def find_by_email(self, email: EmailStr) -> User:
         """Find user by email. Returns User model. Raises UserNotFoundException if not found."""
@@ -36,6 +37,10 @@ class UserService:
             raise UserNotFoundException(email)
         return existing
     
+    async def save_user(self, user: User) -> User:
+        """Persist changes made to a loaded user."""
+        return await self.user_repository.save(user)
+
     async def get_user_by_id(self, user_id: str) -> User:
         """Get user by ID. Returns User model. Raises UserNotFoundException if not found."""
         existing = await self.user_repository.get(id=user_id)
@@ -48,7 +53,7 @@ class UserService:
         existing = await self.user_repository.single_or_none(email=user_data.email)
         if existing is not None:
             raise EmailAlreadyExistsException(user_data.email)
-        user_data.password = hash_it(user_data.password)
+        user_data.password = await hash_it_async(user_data.password)
         user_id = await self.user_repository.create(user_data)
         
         # Todo: Refactor this to use Celery task to Or fire and forget 
@@ -99,14 +104,14 @@ class UserService:
         existing = await self.user_repository.get(id=user_id)
         if existing is None:
             raise UserNotFoundException(user_id)
-        hashed_password = hash_it(new_password)
+        hashed_password = await hash_it_async(new_password)
         existing.password = hashed_password
-        await existing.save()
+        await self.user_repository.save(existing)
         return existing
 
-    async def total_count(self, params: Any | None = None) -> int:
+    async def total_count(self, params: Any | None = None, strategy: CountStrategy = "exact") -> int:
         """Get total user count."""
-        return await self.user_repository.count(params=params)
+        return await self.user_repository.count(params=params, strategy=strategy)
     
     async def request_password_reset(self, email: EmailStr) -> UserPasswordReset:
         """Set password reset for user by ID. Returns None otherwise, Raises InvalidOperationException on failure."""
@@ -0,0 +1,69 @@
+"""
+    Event loop latency during a burst of logins.
+
+    Runs the same number of concurrent password verifications twice: inline on the event loop (how
+    AuthService.login used to call verify_password) and through the bounded password hasher pool.
+    A probe task sleeps in short intervals meanwhile and records how late it wakes up, which is the
+    delay every other request on the worker would see. Only the hashing is exercised, no database is touched.
+
+    Usage (from the backend directory, with the .env settings available):
+        uv run python -m benchmarks.login_storm [logins]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from api.common.security import hash_it, password_hasher, verify_password, verify_password_async
+
+PROBE_INTERVAL = 0.005  # seconds
+
+
+async def probe(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def inline_login(password: str, hashed: str) -> bool:
+    return verify_password(password, hashed)
+
+
+async def storm(login, logins: int, hashed: str) -> tuple[float, list[float]]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login("secret-password", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    return elapsed, lags
+
+
+def report(name: str, elapsed: float, lags: list[float]) -> None:
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{name:<22} total {elapsed:6.2f} s   loop lag median {statistics.median(lags_ms):7.1f} ms"
+        f"   p99 {p99:7.1f} ms   max {lags_ms[-1]:7.1f} ms"
+    )
+
+
+async def main(logins: int) -> None:
+    hashed = hash_it("secret-password")
+    report("inline", *await storm(inline_login, logins, hashed))
+    report(f"pool ({password_hasher.max_workers} workers)", *await storm(verify_password_async, logins, hashed))
+    stats = password_hasher.stats
+    print(
+        f"pool stats: {stats.completed} completed, avg wait {stats.wait_seconds / stats.completed * 1000:.1f} ms,"
+        f" avg run {stats.run_seconds / stats.completed * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
@@ -0,0 +1,169 @@
+"""
+    Micro-benchmark for the per-request overhead of the HTTP middlewares.
+
+    Compares pass-through layers implemented with Starlette's BaseHTTPMiddleware (how TenantMiddleware,
+    RedisCacheMiddleware and AuditLogsReadMiddleware used to be written) against the pure ASGI middlewares
+    of the application, in the application order Tenant -> ETag -> RedisCache -> AuditLogsRead.
+    Requests come without a bearer token from localhost, so every middleware takes its pass-through
+    path and no database/redis is touched.
+
+    Two cases:
+      - POST with a small JSON response: per-request overhead.
+      - GET of a streamed response (chunks produced every STREAM_CHUNK_DELAY seconds): time to first byte
+        and total time, for a JSON and an NDJSON stream. The ETag middleware only tags (and buffers) responses
+        with a Content-Length, streams of any media type are passed through chunk by chunk.
+
+    Usage (from the backend directory, with the .env settings available):
+        uv run python -m benchmarks.middleware_overhead [iterations]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from api.interfaces.middlewares.audit_logs_read_middleware import AuditLogsReadMiddleware, AuditReadPolicy
+from api.interfaces.middlewares.etag_middleware import ETagMiddleware
+from api.interfaces.middlewares.redis_cache_middleware import RedisCacheMiddleware
+from api.interfaces.middlewares.tenant_middleware import TenantMiddleware
+
+
+class PassThroughHTTPMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+STREAM_CHUNKS = 20
+STREAM_CHUNK_DELAY = 0.001  # seconds between two chunks of the streamed response
+
+
+async def endpoint(request):
+    return JSONResponse({"status": "Ok"})
+
+
+async def stream_endpoint(request):
+    async def chunks():
+        for n in range(STREAM_CHUNKS):
+            await asyncio.sleep(STREAM_CHUNK_DELAY)
+            yield b'{"n": %d}\n' % n
+    return StreamingResponse(chunks(), media_type=request.query_params.get("media_type", "application/x-ndjson"))
+
+
+def build_app(middleware: list[Middleware]) -> Starlette:
+    return Starlette(
+        routes=[
+            Route("/api/v1/health/", endpoint, methods=["POST"]),
+            Route("/api/v1/stream/", stream_endpoint, methods=["GET"]),
+        ],
+        middleware=middleware,
+    )
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "POST",
+    "scheme": "http",
+    "path": "/api/v1/health/",
+    "raw_path": b"/api/v1/health/",
+    "query_string": b"",
+    "root_path": "",
+    "headers": [(b"host", b"localhost:8000"), (b"content-length", b"0")],
+    "client": ("127.0.0.1", 12345),
+    "server": ("127.0.0.1", 8000),
+}
+
+
+async def run(app: Starlette, iterations: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Warm up
+    for _ in range(100):
+        await app(dict(SCOPE), receive, send)
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def stream_scope(media_type: str) -> dict:
+    return {
+        **SCOPE,
+        "method": "GET",
+        "path": "/api/v1/stream/",
+        "raw_path": b"/api/v1/stream/",
+        "query_string": f"media_type={media_type}".encode(),
+        "headers": [(b"host", b"localhost:8000")],
+    }
+
+
+async def run_stream(app: Starlette, iterations: int, media_type: str) -> tuple[float, float]:
+    """Median time to first body byte and median total time of a streamed GET, in milliseconds."""
+    scope = stream_scope(media_type)
+
+    async def request() -> tuple[float, float]:
+        first_byte: float | None = None
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                # The client stays connected, streaming responses wait for a disconnect until they are done
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            nonlocal first_byte
+            if first_byte is None and message["type"] == "http.response.body" and message.get("body"):
+                first_byte = time.perf_counter()
+
+        started = time.perf_counter()
+        await app(dict(scope), receive, send)
+        return (first_byte - started) * 1000, (time.perf_counter() - started) * 1000
+
+    await request()  # Warm up
+    ttfb, total = zip(*[await request() for _ in range(iterations)])
+    return statistics.median(ttfb), statistics.median(total)
+
+
+async def main(iterations: int) -> None:
+    variants = {
+        "no middleware": build_app([]),
+        "4 x BaseHTTPMiddleware": build_app([Middleware(PassThroughHTTPMiddleware) for _ in range(4)]),
+        "4 x pure ASGI (app middlewares)": build_app([
+            Middleware(TenantMiddleware),
+            Middleware(ETagMiddleware),
+            Middleware(RedisCacheMiddleware),
+            # The streamed route is not audited, so nothing is written to the database
+            Middleware(AuditLogsReadMiddleware, policy=AuditReadPolicy(exclude=("/api/v1/stream/",))),
+        ]),
+    }
+    print("POST, small JSON response")
+    baseline = None
+    for name, app in variants.items():
+        per_request = await run(app, iterations)
+        baseline = per_request if baseline is None else baseline
+        print(f"{name:<34} {per_request:8.1f} us/request  (+{per_request - baseline:6.1f} us)")
+
+    stream_iterations = max(10, iterations // 100)
+    for media_type in ("application/x-ndjson", "application/json"):
+        print(f"\nGET, {STREAM_CHUNKS} chunks streamed as {media_type} (median of {stream_iterations})")
+        for name, app in variants.items():
+            ttfb, total = await run_stream(app, stream_iterations, media_type)
+            print(f"{name:<34} first byte {ttfb:7.2f} ms   total {total:7.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from api.common.audit_log_writer import AuditLogWriter
+from api.domain.dtos.audit_logs_dto import AuditLogDto
+
+
+class RecordingStore:
+    """Audit log store keeping the appended batches. Appends wait while `paused` is cleared."""
+    def __init__(self):
+        self.batches: list[list[AuditLogDto]] = []
+        self.paused = asyncio.Event()
+        self.paused.set()
+
+    @property
+    def user_ids(self) -> list[str]:
+        return [log.user_id for batch in self.batches for log in batch]
+
+    async def append(self, logs):
+        await self.paused.wait()
+        self.batches.append(list(logs))
+
+
+def make_log(i: int) -> AuditLogDto:
+    return AuditLogDto(action="read", entity="User", user_id=str(i), changes={})
+
+
+def make_writer(tmp_path, **kwargs) -> tuple[AuditLogWriter, RecordingStore]:
+    options = dict(max_queue_size=100, batch_size=10, flush_interval=60, spill_path=str(tmp_path / "spill.jsonl"))
+    options.update(kwargs)
+    writer = AuditLogWriter(**options)
+    store = RecordingStore()
+    writer.use_store(store)
+    return writer, store
+
+
+async def wait_until(condition, timeout: float = 2.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def fill_queue(writer: AuditLogWriter, store: RecordingStore) -> int:
+    """Hold the flusher on a full first batch and fill the queue behind it. Returns the number of logs written."""
+    store.paused.clear()
+    for i in range(writer.batch_size):
+        await writer.write(make_log(i))
+        await asyncio.sleep(0) # let the flusher take it
+    await wait_until(lambda: writer._writing is not None)
+    for i in range(writer.batch_size, writer.batch_size + writer.max_queue_size):
+        await writer.write(make_log(i))
+    assert writer._queue.full()
+    return writer.batch_size + writer.max_queue_size
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_is_full(tmp_path):
+    writer, store = make_writer(tmp_path)
+    await writer.start()
+    for i in range(10):
+        await writer.write(make_log(i))
+
+    # Long before the flush interval
+    await wait_until(lambda: len(store.batches) == 1)
+    assert store.user_ids == [str(i) for i in range(10)]
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_flushes_partial_batch_after_interval(tmp_path):
+    writer, store = make_writer(tmp_path, flush_interval=0.05)
+    await writer.start()
+    await writer.write(make_log(1))
+    await writer.write(make_log(2))
+
+    await wait_until(lambda: len(store.batches) == 1)
+    assert store.user_ids == ["1", "2"]
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_queued_logs(tmp_path):
+    writer, store = make_writer(tmp_path)
+    await writer.start()
+    for i in range(25):
+        await writer.write(make_log(i))
+
+    await writer.stop()
+
+    assert sorted(store.user_ids, key=int) == [str(i) for i in range(25)]
+    assert writer.stats.written == 25
+    # Written directly once stopped
+    await writer.write(make_log(25))
+    assert store.user_ids[-1] == "25"
+
+
+@pytest.mark.asyncio
+async def test_drop_policy_discards_overflow(tmp_path):
+    writer, store = make_writer(tmp_path, max_queue_size=5, overflow_policy="drop")
+    await writer.start()
+    written = await fill_queue(writer, store)
+
+    await writer.write(make_log(99))
+    assert writer.stats.dropped == 1
+
+    store.paused.set()
+    await writer.stop()
+    assert "99" not in store.user_ids
+    assert len(store.user_ids) == written
+
+
+@pytest.mark.asyncio
+async def test_block_policy_waits_for_room(tmp_path):
+    writer, store = make_writer(tmp_path, max_queue_size=5, overflow_policy="block")
+    await writer.start()
+    await fill_queue(writer, store)
+
+    blocked = asyncio.create_task(writer.write(make_log(99)))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    store.paused.set()
+    await asyncio.wait_for(blocked, timeout=2)
+    await writer.stop()
+    assert "99" in store.user_ids
+    assert writer.stats.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_spill_policy_spills_to_file_and_replays(tmp_path):
+    writer, store = make_writer(tmp_path, max_queue_size=5, overflow_policy="spill")
+    await writer.start()
+    await fill_queue(writer, store)
+
+    await writer.write(make_log(99))
+    await writer.write(make_log(100))
+    assert writer.stats.spilled == 2
+    assert (tmp_path / "spill.jsonl").exists()
+    assert "99" not in store.user_ids
+
+    # Replayed by the flusher once the store accepts writes again
+    store.paused.set()
+    await wait_until(lambda: writer.stats.replayed == 2)
+    assert {"99", "100"} <= set(store.user_ids)
+    assert not (tmp_path / "spill.jsonl").exists()
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_spill_file_left_over_is_replayed_on_start(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    spill.write_bytes(b"".join((make_log(i).model_dump_json() + "\n").encode() for i in range(15)) + b'{"partial')
+    writer, store = make_writer(tmp_path)
+
+    await writer.start()
+
+    assert store.user_ids == [str(i) for i in range(15)]
+    assert [len(batch) for batch in store.batches] == [10, 5]
+    assert not spill.exists()
+    assert list(tmp_path.iterdir()) == []
+    await writer.stop()
@@ -0,0 +1,61 @@
+import pytest
+
+from api.common.base_repository import BaseRepository
+from api.common.cache_events import ResourceChanged
+from api.common.count_cache import CountCache, count_cache
+
+
+class CountedModel:
+    """Stands in for a document model, counts how often the collection is counted."""
+    calls = 0
+    total = 3
+
+    @classmethod
+    async def count(cls) -> int:
+        cls.calls += 1
+        return cls.total
+
+
+class CountedRepository(BaseRepository[CountedModel]):
+    cache_resource = "counted"
+
+    def __init__(self):
+        super().__init__(CountedModel)
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    CountedModel.calls = 0
+    CountedModel.total = 3
+    count_cache.entries.clear()
+
+
+@pytest.mark.asyncio
+async def test_cached_count_is_shared_by_repository_instances():
+    assert await CountedRepository().count(strategy="cached") == 3
+    assert await CountedRepository().count(strategy="cached") == 3
+    assert CountedModel.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_resource_change_evicts_counts_of_every_instance():
+    first, second = CountedRepository(), CountedRepository()
+    await first.count(strategy="cached")
+    CountedModel.total = 4
+
+    await count_cache.on_resource_changed(ResourceChanged(resource="counted", tenant_id="t1"))
+
+    assert await second.count(strategy="cached") == 4
+    assert CountedModel.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_evict_keeps_other_resources():
+    cache = CountCache()
+    cache.set("users", None, 1)
+    cache.set("roles", {"name": "admin"}, 2)
+
+    cache.evict("users")
+
+    assert cache.get("users", None) is None
+    assert cache.get("roles", {"name": "admin"}) == 2
@@ -0,0 +1,77 @@
+import pytest
+
+from api.common import lru_cache
+from api.common.lru_cache import LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(lru_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_evicts_least_recently_used():
+    evicted = []
+    cache = LRUCache(maxsize=2, on_evict=lambda key, value: evicted.append(key))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # Reading marks "a" as recently used, "b" goes first
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.keys() == ["a", "c"]
+    assert evicted == ["b"]
+    # Overwriting refreshes the position too
+    cache.set("a", 10)
+    cache.set("d", 4)
+    assert cache.keys() == ["a", "d"]
+    assert cache.get("a") == 10
+
+
+def test_entries_expire_after_ttl(clock: Clock):
+    cache = LRUCache(maxsize=10, ttl=5)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=1)
+
+    clock.now += 1
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.now += 4
+    assert cache.get("default", "missing") == "missing"
+    assert len(cache) == 0
+
+
+def test_weight_bound(clock: Clock):
+    cache = LRUCache(maxsize=10, maxweight=10, weigher=len)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    assert cache.weight == 8
+
+    cache.set("c", b"1234")
+    assert cache.keys() == ["b", "c"]
+    assert cache.weight == 8
+
+    # Heavier than the whole cache: not stored, and the previous value is dropped
+    cache.set("b", b"x" * 11)
+    assert cache.keys() == ["c"]
+    assert cache.weight == 4
+
+    assert cache.pop("c") == b"1234"
+    assert cache.weight == 0
+
+
+def test_weight_requires_weigher():
+    with pytest.raises(ValueError):
+        LRUCache(maxweight=10)
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
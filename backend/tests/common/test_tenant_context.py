@@ -0,0 +1,142 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo import AsyncMongoClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from api.common.tenant_context import get_current_database, reset_current_database, set_current_database
+from api.domain.entities.api_base_model import ApiBaseModel
+from api.interfaces.middlewares import tenant_middleware
+from api.interfaces.middlewares.tenant_middleware import TenantMiddleware
+
+TENANT_A = "68c302ef6bf7a039b7e9b390"
+TENANT_B = "68c302ef6bf7a039b7e9b391"
+
+
+class Note(ApiBaseModel):
+    text: str = ""
+
+
+@pytest.fixture
+async def client():
+    # Handles only, nothing here talks to a server
+    client = AsyncMongoClient("mongodb://localhost:27012")
+    yield client
+    await client.close()
+
+
+@pytest.fixture(autouse=True)
+def note_collection(monkeypatch: pytest.MonkeyPatch):
+    # Set by init_beanie, which needs a server
+    monkeypatch.setattr(Note, "get_collection_name", classmethod(lambda cls: "notes"))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_contexts_resolve_their_own_database(client: AsyncMongoClient):
+    both_routed = asyncio.Barrier(2)
+
+    async def handle(db_name: str):
+        token = set_current_database(client[db_name])
+        try:
+            # Both contexts are routed before either resolves its collection
+            await both_routed.wait()
+            collection = Note.get_pymongo_collection()
+            await asyncio.sleep(0)
+            return collection, Note.get_pymongo_collection(), get_current_database().name
+        finally:
+            reset_current_database(token)
+
+    (a, a_again, a_db), (b, b_again, b_db) = await asyncio.gather(handle(f"tenant_{TENANT_A}"), handle(f"tenant_{TENANT_B}"))
+
+    assert (a_db, b_db) == (f"tenant_{TENANT_A}", f"tenant_{TENANT_B}")
+    assert a.full_name == f"tenant_{TENANT_A}.notes"
+    assert b.full_name == f"tenant_{TENANT_B}.notes"
+    # The handles are cached per database, never shared between tenants
+    assert a_again is a and b_again is b
+    assert a is not b
+
+
+def make_app(seen: list[str | None], fail: bool = False) -> Starlette:
+    async def endpoint(request):
+        database = get_current_database()
+        seen.append(database.name if database is not None else None)
+        if fail:
+            raise RuntimeError("endpoint failed")
+        return PlainTextResponse("ok")
+    return Starlette(routes=[Route("/", endpoint)])
+
+
+@pytest.fixture
+def routed_databases(monkeypatch: pytest.MonkeyPatch, client: AsyncMongoClient):
+    """The TenantMiddleware routes to handles of `client`: tenant_<id>, or `host` without a tenant."""
+    async def get_tenant_database(db_name: str):
+        return client[db_name]
+
+    async def get_database():
+        return client["host"]
+
+    monkeypatch.setattr(tenant_middleware, "db", SimpleNamespace(get_tenant_database=get_tenant_database, get_database=get_database))
+
+
+async def request(app, tenant_id: str | None = None) -> None:
+    headers = [(b"host", b"localhost")]
+    if tenant_id is not None:
+        headers.append((b"x-tenant-id", tenant_id.encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/", "raw_path": b"/", "query_string": b"", "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 12345), "server": ("localhost", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+@pytest.mark.asyncio
+async def test_context_is_reset_after_the_request(routed_databases):
+    seen: list[str | None] = []
+    app = TenantMiddleware(make_app(seen))
+
+    await request(app, TENANT_A)
+    assert get_current_database() is None
+    await request(app)
+    assert get_current_database() is None
+
+    assert seen == [f"tenant_{TENANT_A}", "host"]
+
+
+@pytest.mark.asyncio
+async def test_context_is_reset_when_the_request_fails(routed_databases):
+    seen: list[str | None] = []
+    app = TenantMiddleware(make_app(seen, fail=True))
+
+    with pytest.raises(RuntimeError):
+        await request(app, TENANT_A)
+
+    assert seen == [f"tenant_{TENANT_A}"]
+    assert get_current_database() is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_routed_to_their_tenant(routed_databases):
+    seen: list[tuple[str, str]] = []
+    both_started = asyncio.Barrier(2)
+
+    async def endpoint(request):
+        await both_started.wait()
+        seen.append((request.headers["x-tenant-id"], get_current_database().name))
+        return PlainTextResponse("ok")
+
+    app = TenantMiddleware(Starlette(routes=[Route("/", endpoint)]))
+
+    await asyncio.gather(request(app, TENANT_A), request(app, TENANT_B))
+
+    assert sorted(seen) == [(TENANT_A, f"tenant_{TENANT_A}"), (TENANT_B, f"tenant_{TENANT_B}")]
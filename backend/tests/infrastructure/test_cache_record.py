@@ -0,0 +1,65 @@
+import pytest
+
+from api.infrastructure.caching.cache_record import (
+    CachedResponse,
+    InvalidCacheRecord,
+    accepts_gzip,
+    decode_record,
+    encode_record,
+)
+
+BODY = b'{"items": [' + b", ".join(b'{"id": %d, "name": "item"}' % i for i in range(200)) + b"]}"
+
+
+def make_response(**kwargs) -> CachedResponse:
+    return CachedResponse(
+        body=BODY,
+        status=200,
+        media_type="application/json",
+        headers={"etag": '"abc"', "x-total": "200"},
+        **kwargs,
+    )
+
+
+def test_round_trip_uncompressed():
+    cached = make_response(fresh_until=1_700_000_000.5)
+
+    assert decode_record(encode_record(cached)) == cached
+
+
+def test_round_trip_compressed():
+    cached = make_response().compress(min_size=1024)
+    assert cached.encoding == "gzip"
+    assert len(cached.body) < len(BODY)
+
+    decoded = decode_record(encode_record(cached))
+
+    assert decoded == cached
+    assert decoded.fresh_until is None
+    assert decoded.decompressed_body() == BODY
+
+
+def test_small_bodies_are_not_compressed():
+    cached = make_response().compress(min_size=len(BODY) + 1)
+
+    assert cached.encoding is None
+    assert decode_record(encode_record(cached)).body == BODY
+
+
+def test_rejects_other_data():
+    with pytest.raises(InvalidCacheRecord):
+        decode_record(b"RC")
+    with pytest.raises(InvalidCacheRecord):
+        decode_record(b'{"legacy": "json entry", "padding": 0}')
+
+
+@pytest.mark.parametrize(("header", "expected"), [
+    (None, False),
+    ("gzip", True),
+    ("br, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("*", True),
+    ("identity", False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
@@ -0,0 +1,144 @@
+from types import SimpleNamespace
+
+import pytest
+from beanie import PydanticObjectId
+from fastapi import Request
+
+from api.common.dtos.token_dto import TokenPayloadDto
+from api.core.config import settings
+from api.domain.dtos.role_dto import RoleDto
+from api.domain.dtos.user_dto import UserDto
+from api.domain.enum.permission import PERMISSION_BITS, Permission, permissions_from_mask, permissions_to_mask
+from api.infrastructure.security.current_user import resolve_principal
+from api.infrastructure.security.role_version_store import DELETED_ROLE_VERSION
+
+USER_ID = PydanticObjectId()
+ROLE_ID = PydanticObjectId()
+TOKEN = "access-token"
+
+
+def test_permission_mask_round_trip():
+    assert permissions_from_mask(permissions_to_mask([])) == []
+    for permission in Permission:
+        assert permissions_from_mask(permissions_to_mask([permission])) == [permission]
+    everything = list(Permission)
+    assert set(permissions_from_mask(permissions_to_mask(everything))) == set(everything)
+    # Permission values (as stored on roles) encode like the enum members
+    some = [Permission.USER_VIEW_ONLY, Permission.AUDIT_LOGS_DOWNLOAD]
+    assert permissions_to_mask([p.value for p in some]) == permissions_to_mask(some)
+
+
+def test_permission_bits_are_unique_and_cover_every_permission():
+    assert set(PERMISSION_BITS) == set(Permission)
+    assert len(set(PERMISSION_BITS.values())) == len(PERMISSION_BITS)
+    # Issued tokens depend on these bits
+    assert PERMISSION_BITS[Permission.FULL_ACCESS] == 0
+    assert PERMISSION_BITS[Permission.AUDIT_LOGS_DOWNLOAD] == 17
+
+
+def stateless_payload(permissions: list[Permission], role_version: int) -> TokenPayloadDto:
+    role = RoleDto(id=str(ROLE_ID), name="Editor", description=None, created_at="", updated_at="")
+    profile = UserDto(
+        id=str(USER_ID),
+        first_name="Ada",
+        last_name="Lovelace",
+        email="ada@example.com",
+        gender="other",
+        role_id=str(ROLE_ID),
+        is_active=True,
+        created_at="",
+        updated_at="",
+    )
+    return TokenPayloadDto(
+        sub=USER_ID,
+        email="ada@example.com",
+        is_active=True,
+        role=role,
+        perm_mask=permissions_to_mask(permissions),
+        role_version=role_version,
+        profile=profile,
+    )
+
+
+class Services:
+    """The services resolve_principal depends on, with a role at `role_version` granting `permissions`."""
+    def __init__(self, payload: TokenPayloadDto, role_version: int, permissions: list[Permission]):
+        self.users_loaded = 0
+        role_doc = payload.role.model_copy(update={"permissions": permissions}).model_dump()
+
+        async def decode_token(token: str, type: str):
+            return payload
+
+        async def get_role_version(role_id: str) -> int:
+            return role_version
+
+        async def get_user_by_id(user_id: str):
+            self.users_loaded += 1
+
+            async def to_serializable_dict():
+                return payload.profile.model_dump()
+            return SimpleNamespace(id=USER_ID, role_id=str(ROLE_ID), to_serializable_dict=to_serializable_dict)
+
+        async def get_role_by_id(role_id: str):
+            async def to_serializable_dict():
+                return role_doc
+            return SimpleNamespace(to_serializable_dict=to_serializable_dict)
+
+        async def get_subscription_plan_by_user_id(user_id: str):
+            return None
+
+        self.token_service = SimpleNamespace(decode_token=decode_token)
+        self.role_service = SimpleNamespace(get_role_version=get_role_version, get_role_by_id=get_role_by_id)
+        self.user_service = SimpleNamespace(get_user_by_id=get_user_by_id)
+        self.subscription_service = SimpleNamespace(get_subscription_plan_by_user_id=get_subscription_plan_by_user_id)
+
+    async def resolve(self):
+        request = Request({"type": "http", "headers": []})
+        return await resolve_principal(
+            request, TOKEN, self.user_service, self.token_service, self.role_service, self.subscription_service,
+        )
+
+
+@pytest.fixture(autouse=True)
+def stateless_auth(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "stateless_auth_enabled", True)
+
+
+@pytest.mark.asyncio
+async def test_current_role_version_uses_token_claims():
+    granted = [Permission.USER_VIEW_ONLY, Permission.ROLE_VIEW_ONLY]
+    services = Services(stateless_payload(granted, role_version=3), role_version=3, permissions=granted)
+
+    resolved = await services.resolve()
+
+    assert resolved.error is None
+    assert resolved.stateless
+    assert services.users_loaded == 0
+    assert resolved.user.role.permissions == granted
+
+
+@pytest.mark.asyncio
+async def test_stale_role_version_loads_from_the_database():
+    # The role lost USER_VIEW_ONLY after the token was issued
+    services = Services(
+        stateless_payload([Permission.USER_VIEW_ONLY, Permission.ROLE_VIEW_ONLY], role_version=3),
+        role_version=4,
+        permissions=[Permission.ROLE_VIEW_ONLY],
+    )
+
+    resolved = await services.resolve()
+
+    assert resolved.error is None
+    assert not resolved.stateless
+    assert services.users_loaded == 1
+    assert resolved.user.role.permissions == [Permission.ROLE_VIEW_ONLY]
+
+
+@pytest.mark.asyncio
+async def test_deleted_role_is_not_trusted_from_claims():
+    services = Services(stateless_payload([Permission.FULL_ACCESS], role_version=3), role_version=DELETED_ROLE_VERSION, permissions=[])
+
+    resolved = await services.resolve()
+
+    assert not resolved.stateless
+    assert Permission.FULL_ACCESS not in resolved.user.role.permissions
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from api.domain.dtos.audit_logs_dto import AuditLogDto
+from api.infrastructure.persistence.repositories.file_audit_log_store_impl import FileAuditLogStore
+
+
+def make_logs(count: int, tenant_id: str = "tenant1", start: int = 0) -> list[AuditLogDto]:
+    return [
+        AuditLogDto(action="read" if i % 3 else "create", entity="User", user_id=str(i), changes={}, tenant_id=tenant_id)
+        for i in range(start, start + count)
+    ]
+
+
+def segment(store: FileAuditLogStore, tenant_id: str, suffix: str) -> str:
+    tenant_dir = os.path.join(store.directory, tenant_id)
+    name = next(name for name in os.listdir(tenant_dir) if name.endswith(suffix))
+    return os.path.join(tenant_dir, name)
+
+
+@pytest.mark.asyncio
+async def test_pages_newest_first_across_compressed_segments(tmp_path):
+    """
+        Logs of a previous day are compressed on day rollover and paging by cursor returns every log once:
+    """
+    store = FileAuditLogStore(str(tmp_path))
+    await store.append(make_logs(600))
+    # Move today's segment to an older day, the next append rolls over
+    path = segment(store, "tenant1", ".jsonl")
+    for suffix in (".jsonl", ".idx.json"):
+        os.rename(path.replace(".jsonl", suffix), os.path.join(os.path.dirname(path), "20200101" + suffix))
+    store._open_days.clear()
+    await store.append(make_logs(50, start=600))
+
+    names = sorted(os.listdir(tmp_path / "tenant1"))
+    assert "20200101.jsonl.gz" in names and "20200101.jsonl" not in names
+    assert "20200101.lock" in names
+
+    page = await store.list("tenant1", limit=5)
+    assert page.total == 650
+    assert [log.user_id for log in page.logs] == ["649", "648", "647", "646", "645"]
+
+    user_ids, cursor = [], None
+    while True:
+        page = await store.list("tenant1", limit=97, cursor=cursor)
+        user_ids.extend(int(log.user_id) for log in page.logs)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert user_ids == list(range(649, -1, -1))
+
+    page = await store.list("tenant1", limit=3, action="create")
+    assert page.total == 217
+    assert [log.user_id for log in page.logs] == ["648", "645", "642"]
+
+
+@pytest.mark.asyncio
+async def test_partial_line_is_truncated_before_appending(tmp_path):
+    """
+        A line left half written (crash mid-write) is discarded instead of being glued to the next log:
+    """
+    store = FileAuditLogStore(str(tmp_path))
+    await store.append(make_logs(3))
+    with open(segment(store, "tenant1", ".jsonl"), "ab") as f:
+        f.write(make_logs(1, start=3)[0].model_dump_json().encode()) # complete line, unindexed
+        f.write(b"\n")
+        f.write(b'{"action": "read", "ent') # partial line
+
+    await store.append(make_logs(2, start=4))
+
+    page = await store.list("tenant1", limit=10)
+    assert page.total == 6
+    assert [log.user_id for log in page.logs] == ["5", "4", "3", "2", "1", "0"]
+
+
+@pytest.mark.asyncio
+async def test_failing_tenant_does_not_drop_other_tenants(tmp_path):
+    """
+        An error writing one tenant's logs still writes the logs of the other tenants:
+    """
+    store = FileAuditLogStore(str(tmp_path))
+    (tmp_path / "broken").write_text("not a directory")
+
+    await store.append(make_logs(2, tenant_id="broken") + make_logs(3, tenant_id="tenant1"))
+
+    assert (await store.list("tenant1")).total == 3
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from pathlib import Path
+
+import jwt
+import pytest
+from beanie import PydanticObjectId
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+
+from api.common.dtos.token_dto import TokenPayloadDto
+from api.common.utils import get_utc_now
+from api.infrastructure.security.jwt_keyset import JwtKeySet
+from api.infrastructure.security.jwt_token_service import JwtTokenService
+
+PREVIOUS_KID = "2025-01"
+ACTIVE_KID = "2025-02"
+
+
+def write_private_key(directory: Path, kid: str, key) -> None:
+    (directory / f"{kid}.pem").write_bytes(key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()))
+
+
+def write_public_key(directory: Path, kid: str, key) -> None:
+    (directory / f"{kid}.pub.pem").write_bytes(key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo))
+
+
+@pytest.fixture
+def previous_key() -> ed25519.Ed25519PrivateKey:
+    return ed25519.Ed25519PrivateKey.generate()
+
+
+@pytest.fixture
+def keyset(tmp_path: Path, previous_key: ed25519.Ed25519PrivateKey) -> JwtKeySet:
+    """Halfway through a rotation: signing with the new key, the previous one only verifies."""
+    write_private_key(tmp_path, ACTIVE_KID, ed25519.Ed25519PrivateKey.generate())
+    write_public_key(tmp_path, PREVIOUS_KID, previous_key)
+    return JwtKeySet.from_directory(str(tmp_path), "EdDSA", ACTIVE_KID)
+
+
+def make_payload() -> TokenPayloadDto:
+    return TokenPayloadDto(sub=PydanticObjectId(), email="ada@example.com", is_active=True)
+
+
+def claims() -> dict:
+    return {**make_payload().model_dump(mode="json"), "exp": get_utc_now() + timedelta(minutes=5)}
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_signed_with_the_active_key(keyset: JwtKeySet):
+    service = JwtTokenService(keyset=keyset)
+
+    token = (await service.get_access_token(make_payload())).access_token
+
+    assert jwt.get_unverified_header(token) == {"alg": "EdDSA", "kid": ACTIVE_KID, "typ": "JWT"}
+    jwt.decode(token, keyset.keys[ACTIVE_KID].public_key, algorithms=["EdDSA"])
+    assert (await service.decode_token(token)).email == "ada@example.com"
+
+
+@pytest.mark.asyncio
+async def test_tokens_of_the_previous_key_verify_during_rotation(keyset: JwtKeySet, previous_key):
+    token = jwt.encode(claims(), previous_key, algorithm="EdDSA", headers={"kid": PREVIOUS_KID})
+
+    assert (await JwtTokenService(keyset=keyset).decode_token(token)).email == "ada@example.com"
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_is_rejected(keyset: JwtKeySet):
+    retired_key = ed25519.Ed25519PrivateKey.generate()
+    service = JwtTokenService(keyset=keyset)
+
+    assert await service.decode_token(jwt.encode(claims(), retired_key, algorithm="EdDSA", headers={"kid": "2024-12"})) is None
+    assert await service.decode_token(jwt.encode(claims(), retired_key, algorithm="EdDSA")) is None
+
+
+@pytest.mark.asyncio
+async def test_known_kid_signed_by_another_key_is_rejected(keyset: JwtKeySet):
+    forged = jwt.encode(claims(), ed25519.Ed25519PrivateKey.generate(), algorithm="EdDSA", headers={"kid": ACTIVE_KID})
+
+    assert await JwtTokenService(keyset=keyset).decode_token(forged) is None
+
+
+@pytest.mark.asyncio
+async def test_shared_secret_token_is_rejected(keyset: JwtKeySet):
+    token = jwt.encode(claims(), "a-shared-secret-of-at-least-32-bytes", algorithm="HS256", headers={"kid": ACTIVE_KID})
+
+    assert await JwtTokenService(keyset=keyset).decode_token(token) is None
+
+
+def test_jwks_has_only_public_material(keyset: JwtKeySet):
+    jwks = keyset.jwks()
+
+    assert {key["kid"] for key in jwks["keys"]} == {ACTIVE_KID, PREVIOUS_KID}
+    for key in jwks["keys"]:
+        assert set(key) == {"kty", "crv", "x", "kid", "use", "alg"}
+        assert (key["kty"], key["crv"], key["use"], key["alg"]) == ("OKP", "Ed25519", "sig", "EdDSA")
+
+
+def test_jwks_of_ec_keys_has_only_public_material(tmp_path: Path):
+    write_private_key(tmp_path, ACTIVE_KID, ec.generate_private_key(ec.SECP256R1()))
+
+    [key] = JwtKeySet.from_directory(str(tmp_path), "ES256", ACTIVE_KID).jwks()["keys"]
+
+    assert set(key) == {"kty", "crv", "x", "y", "kid", "use", "alg"}
+    assert (key["kty"], key["crv"], key["alg"]) == ("EC", "P-256", "ES256")
+
+
+def test_active_key_must_be_a_private_key(tmp_path: Path, previous_key):
+    write_public_key(tmp_path, PREVIOUS_KID, previous_key)
+
+    with pytest.raises(ValueError):
+        JwtKeySet.from_directory(str(tmp_path), "EdDSA", PREVIOUS_KID)
@@ -0,0 +1,106 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from beanie import PydanticObjectId
+
+from api.common.dtos.token_dto import TokenPayloadDto
+from api.domain.dtos.role_dto import RoleDto
+from api.domain.enum.permission import Permission
+from api.infrastructure.security import jwt_token_service
+from api.infrastructure.security.jwt_token_service import JwtTokenService
+
+
+def make_payload(email: str = "ada@example.com") -> TokenPayloadDto:
+    role = RoleDto(id="r1", name="admin", description=None, permissions=[], created_at="", updated_at="")
+    return TokenPayloadDto(sub=PydanticObjectId(), email=email, is_active=True, role=role)
+
+
+@pytest.fixture
+def verifications(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Tokens whose signature was verified."""
+    verified: list[str] = []
+    decode = jwt_token_service.jwt.decode
+
+    def counting_decode(token, *args, **kwargs):
+        verified.append(token)
+        return decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(jwt_token_service.jwt, "decode", counting_decode)
+    return verified
+
+
+async def issue(service: JwtTokenService, expires_in: timedelta = timedelta(minutes=5), email: str = "ada@example.com") -> str:
+    return (await service.get_access_token(make_payload(email), expires_delta=expires_in)).access_token
+
+
+@pytest.mark.asyncio
+async def test_repeat_decode_skips_verification(verifications: list[str]):
+    service = JwtTokenService(keyset=None)
+    token = await issue(service)
+
+    first = await service.decode_token(token)
+    second = await service.decode_token(token)
+
+    assert first == second
+    assert first.email == "ada@example.com"
+    assert verifications == [token]
+
+
+@pytest.mark.asyncio
+async def test_cached_payload_is_not_shared(verifications: list[str]):
+    service = JwtTokenService(keyset=None)
+    token = await issue(service)
+
+    first = await service.decode_token(token)
+    first.is_active = False
+    first.role.permissions.append(Permission.FULL_ACCESS)
+    second = await service.decode_token(token)
+    second.email = "eve@example.com"
+    third = await service.decode_token(token)
+
+    assert third.is_active and third.role.permissions == [] and third.email == "ada@example.com"
+    assert len(verifications) == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_token_expires_with_the_token(verifications: list[str]):
+    service = JwtTokenService(keyset=None)
+    token = await issue(service, expires_in=timedelta(seconds=1))
+    assert await service.decode_token(token) is not None
+
+    # Past `exp` the cached payload is gone and the token fails verification
+    await asyncio.sleep(1.1)
+
+    assert await service.decode_token(token) is None
+    assert verifications == [token, token]
+
+
+@pytest.mark.asyncio
+async def test_tampered_token_is_verified(verifications: list[str]):
+    service = JwtTokenService(keyset=None)
+    token = await issue(service)
+    assert await service.decode_token(token) is not None
+    header, payload, signature = token.split(".")
+    tampered = f"{header}.{payload}.{signature[:-4]}AAAA"
+
+    assert await service.decode_token(tampered) is None
+    assert verifications == [token, tampered]
+    # The rejected token is not cached
+    assert await service.decode_token(tampered) is None
+    assert len(verifications) == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_keeps_the_most_recent_tokens(verifications: list[str]):
+    service = JwtTokenService(verified_cache_size=2, keyset=None)
+    tokens = [await issue(service, email=f"user{n}@example.com") for n in range(3)]
+
+    for token in tokens:
+        await service.decode_token(token)
+    assert len(service._verified) == 2
+
+    # The oldest one was evicted, the others are still cached
+    assert (await service.decode_token(tokens[0])).email == "user0@example.com"
+    await service.decode_token(tokens[2])
+    assert verifications == [*tokens, tokens[0]]
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from api.domain.dtos.audit_logs_dto import AuditLogDto
+from api.domain.entities.audit_log import AuditLog
+from api.infrastructure.persistence.mongodb import Database
+from api.infrastructure.persistence.repositories.mongo_audit_log_store_impl import MongoAuditLogStore
+
+TEST_MONGO_URI = "mongodb://localhost:27012/test_db"
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def store():
+    db = Database(uri=TEST_MONGO_URI, models=[AuditLog])
+    await db.init_db("api_test_audit_logs", is_tenant=False)
+    yield MongoAuditLogStore(count_ttl=0)
+    await db.drop()
+
+
+def make_logs(tenant_id: str, count: int, per_timestamp: int) -> list[AuditLogDto]:
+    """`count` logs numbered in `changes`, `per_timestamp` of them share each timestamp."""
+    return [
+        AuditLogDto(
+            entity="user",
+            action="create" if n % 2 else "update",
+            changes={"n": n},
+            user_id="u1",
+            tenant_id=tenant_id,
+            timestamp=(START + timedelta(seconds=n // per_timestamp)).isoformat(),
+        )
+        for n in range(count)
+    ]
+
+
+async def read_all_pages(store: MongoAuditLogStore, tenant_id: str, limit: int, action=None) -> list[AuditLogDto]:
+    logs: list[AuditLogDto] = []
+    cursor = None
+    while True:
+        page = await store.list(tenant_id=tenant_id, limit=limit, action=action, cursor=cursor)
+        logs.extend(page.logs)
+        if page.next_cursor is None:
+            assert not page.has_next
+            return logs
+        assert len(page.logs) == limit
+        cursor = page.next_cursor
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_return_each_entry_once(store: MongoAuditLogStore):
+    tenant_id = str(ObjectId())
+    # Pages of 4 split the groups of 5 logs sharing a timestamp
+    await store.append(make_logs(tenant_id, count=25, per_timestamp=5))
+    await store.append(make_logs(str(ObjectId()), count=5, per_timestamp=5))
+
+    logs = await read_all_pages(store, tenant_id, limit=4)
+
+    assert sorted(log.changes["n"] for log in logs) == list(range(25))
+    timestamps = [log.timestamp for log in logs]
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert await store.count(tenant_id) == 25
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_with_an_action_filter(store: MongoAuditLogStore):
+    tenant_id = str(ObjectId())
+    await store.append(make_logs(tenant_id, count=20, per_timestamp=4))
+
+    logs = await read_all_pages(store, tenant_id, limit=3, action="create")
+
+    assert sorted(log.changes["n"] for log in logs) == list(range(1, 20, 2))
+
+
+@pytest.mark.asyncio
+async def test_cursor_of_the_last_full_page(store: MongoAuditLogStore):
+    tenant_id = str(ObjectId())
+    await store.append(make_logs(tenant_id, count=6, per_timestamp=6))
+
+    first = await store.list(tenant_id=tenant_id, limit=3)
+    second = await store.list(tenant_id=tenant_id, limit=3, cursor=first.next_cursor)
+
+    assert first.has_next and first.next_cursor is not None
+    assert len(second.logs) == 3 and not second.has_next and second.next_cursor is None
+    assert {log.changes["n"] for log in first.logs}.isdisjoint(log.changes["n"] for log in second.logs)
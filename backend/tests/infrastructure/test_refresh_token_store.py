@@ -0,0 +1,147 @@
+from types import SimpleNamespace
+
+import pytest
+from beanie import PydanticObjectId
+
+from api.common.dtos.token_dto import TokenPayloadDto, TokenRefreshRequestDto
+from api.common.exceptions import UnauthorizedException
+from api.domain.dtos.role_dto import RoleDto
+from api.infrastructure.security.jwt_token_service import JwtTokenService
+from api.infrastructure.security.refresh_token_store import RefreshTokenStore
+from api.usecases.auth_service import AuthService
+
+fakeredis = pytest.importorskip("fakeredis")
+
+USER_ID = PydanticObjectId()
+ROLE_ID = PydanticObjectId()
+
+
+@pytest.fixture
+def store() -> RefreshTokenStore:
+    return RefreshTokenStore(fakeredis.FakeAsyncRedis(), ttl=3600, max_sessions=3)
+
+
+@pytest.mark.asyncio
+async def test_rotate_replaces_the_token(store: RefreshTokenStore):
+    session = await store.create(USER_ID, None, claims='{"claims": 1}', role_version=2)
+
+    rotated = await store.rotate(session.family, session.jti, USER_ID, None)
+
+    assert rotated.family == session.family
+    assert rotated.jti != session.jti
+    assert rotated.claims == '{"claims": 1}'
+    assert rotated.role_version == 2
+    # The new token can be used in turn
+    await store.rotate(rotated.family, rotated.jti, USER_ID, None)
+
+
+@pytest.mark.asyncio
+async def test_reusing_a_rotated_token_revokes_the_family(store: RefreshTokenStore):
+    session = await store.create(USER_ID, None, claims="{}", role_version=1)
+    rotated = await store.rotate(session.family, session.jti, USER_ID, None)
+
+    with pytest.raises(UnauthorizedException):
+        await store.rotate(session.family, session.jti, USER_ID, None)
+    # The legitimate holder is logged out too
+    with pytest.raises(UnauthorizedException):
+        await store.rotate(rotated.family, rotated.jti, USER_ID, None)
+
+
+@pytest.mark.asyncio
+async def test_revoke_all_revokes_every_session(store: RefreshTokenStore):
+    sessions = [await store.create(USER_ID, None, claims="{}", role_version=1) for _ in range(2)]
+    other = await store.create(PydanticObjectId(), None, claims="{}", role_version=1)
+
+    assert await store.revoke_all(USER_ID, None) == 2
+
+    for session in sessions:
+        with pytest.raises(UnauthorizedException):
+            await store.rotate(session.family, session.jti, USER_ID, None)
+    await store.rotate(other.family, other.jti, None, None)
+
+
+@pytest.mark.asyncio
+async def test_session_cap_revokes_the_oldest(store: RefreshTokenStore):
+    sessions = [await store.create(USER_ID, None, claims="{}", role_version=1) for _ in range(4)]
+
+    with pytest.raises(UnauthorizedException):
+        await store.rotate(sessions[0].family, sessions[0].jti, USER_ID, None)
+    for session in sessions[1:]:
+        await store.rotate(session.family, session.jti, USER_ID, None)
+
+
+@pytest.mark.asyncio
+async def test_legacy_token_is_claimed_once(store: RefreshTokenStore):
+    assert await store.claim_legacy("legacy-token") is True
+    assert await store.claim_legacy("legacy-token") is False
+
+
+def make_auth_service(store: RefreshTokenStore) -> AuthService:
+    role = SimpleNamespace(id=ROLE_ID, version=1)
+    user = SimpleNamespace(id=USER_ID, tenant_id=None, role_id=ROLE_ID)
+
+    async def get_user_by_id(user_id: str):
+        return user
+
+    async def get_role_by_id(role_id):
+        return role
+
+    async def get_role_version(role_id: str) -> int:
+        return role.version
+
+    service = AuthService(
+        user_service=SimpleNamespace(get_user_by_id=get_user_by_id),
+        tenant_service=None,
+        role_service=SimpleNamespace(get_role_by_id=get_role_by_id, get_role_version=get_role_version),
+        jwt_token_service=JwtTokenService(keyset=None),
+        email_service=None,
+        audit_log_service=None,
+        sso_settings_service=None,
+        refresh_token_store=store,
+    )
+    service.loaded = 0
+
+    async def get_token_payload(user, role):
+        service.loaded += 1
+        return TokenPayloadDto(
+            sub=user.id,
+            email="user@example.com",
+            is_active=True,
+            role=RoleDto(id=str(role.id), name="Admin", description=None, created_at="", updated_at=""),
+        )
+    service._get_token_payload = get_token_payload
+    return service
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_and_detects_reuse(store: RefreshTokenStore):
+    service = make_auth_service(store)
+    payload = await service._get_token_payload(SimpleNamespace(id=USER_ID), SimpleNamespace(id=ROLE_ID))
+    session = await store.create(USER_ID, None, claims=payload.model_dump_json(), role_version=1)
+    tokens = await service.jwt_token_service.generate_tokens(payload, session=session)
+
+    refreshed = await service.refresh_token(TokenRefreshRequestDto(refresh_token=tokens.refresh_token))
+    # Claims of the session are reused, nothing is loaded
+    assert service.loaded == 1
+    assert refreshed.refresh_token != tokens.refresh_token
+
+    with pytest.raises(UnauthorizedException):
+        await service.refresh_token(TokenRefreshRequestDto(refresh_token=tokens.refresh_token))
+    with pytest.raises(UnauthorizedException):
+        await service.refresh_token(TokenRefreshRequestDto(refresh_token=refreshed.refresh_token))
+
+
+@pytest.mark.asyncio
+async def test_legacy_refresh_token_is_migrated_once(store: RefreshTokenStore):
+    service = make_auth_service(store)
+    payload = await service._get_token_payload(SimpleNamespace(id=USER_ID), SimpleNamespace(id=ROLE_ID))
+    # Issued before token families: no jti nor family
+    legacy = (await service.jwt_token_service.get_refresh_token(payload)).refresh_token
+
+    migrated = await service.refresh_token(TokenRefreshRequestDto(refresh_token=legacy))
+    assert (await service.jwt_token_service.decode_token(migrated.refresh_token, type="refresh_token")).family is not None
+
+    with pytest.raises(UnauthorizedException):
+        await service.refresh_token(TokenRefreshRequestDto(refresh_token=legacy))
+    # The migrated session rotates like any other
+    await service.refresh_token(TokenRefreshRequestDto(refresh_token=migrated.refresh_token))
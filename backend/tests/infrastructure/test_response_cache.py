@@ -0,0 +1,55 @@
+import pytest
+
+from api.infrastructure.caching.cache_record import CachedResponse
+from api.infrastructure.caching.response_cache import ResponseCache, tenant_tag, user_tag
+
+fakeredis = pytest.importorskip("fakeredis")
+
+TENANT_ID = "68c302ef6bf7a039b7e9b390"
+
+
+def make_response(body: bytes = b'{"items": []}') -> CachedResponse:
+    return CachedResponse(body=body, status=200, media_type="application/json")
+
+
+@pytest.fixture
+def cache() -> ResponseCache:
+    return ResponseCache(fakeredis.FakeAsyncRedis(), l1_enabled=True)
+
+
+@pytest.mark.asyncio
+async def test_invalidate_deletes_the_entries_of_the_tags(cache: ResponseCache):
+    await cache.set("cache:a", make_response(), ttl=60, tags=[user_tag("u1", TENANT_ID), tenant_tag(TENANT_ID)])
+    await cache.set("cache:b", make_response(), ttl=60, tags=[user_tag("u2", TENANT_ID), tenant_tag(TENANT_ID)])
+    await cache.set("cache:c", make_response(), ttl=60, tags=[user_tag("u3", None), tenant_tag(None)])
+
+    assert await cache.invalidate(user_tag("u1", TENANT_ID)) == 1
+    assert await cache.get("cache:a") is None
+    assert await cache.get("cache:b") is not None
+
+    # cache:a is still registered in the tenant tag, deleting it again is harmless
+    assert await cache.invalidate(tenant_tag(TENANT_ID)) == 2
+    assert await cache.get("cache:b") is None
+    assert await cache.get("cache:c") is not None
+    # Emptied tag sets are deleted
+    assert not await cache.client.exists(tenant_tag(TENANT_ID), user_tag("u1", TENANT_ID))
+
+
+@pytest.mark.asyncio
+async def test_invalidate_keeps_entries_registered_after_reading_the_tag(cache: ResponseCache):
+    tag = tenant_tag(TENANT_ID)
+    await cache.set("cache:a", make_response(), ttl=60, tags=[tag])
+    members = await cache.client.smembers(tag)
+    # Another worker stores an entry between the SMEMBERS and the script
+    await cache.set("cache:b", make_response(), ttl=60, tags=[tag])
+    await cache._invalidate_script(keys=[tag, *members], args=["", 1])
+
+    assert await cache.client.smembers(tag) == {b"cache:b"}
+    assert await cache.invalidate(tag) == 1
+    assert await cache.get("cache:b") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_of_unknown_tags(cache: ResponseCache):
+    assert await cache.invalidate() == 0
+    assert await cache.invalidate(tenant_tag("missing")) == 0
@@ -0,0 +1,57 @@
+import pytest
+from beanie import PydanticObjectId
+
+from api.domain.entities.role import Role
+from api.domain.enum.permission import Permission
+from api.infrastructure.security.role_cache import RoleCache
+from api.usecases.role_service import RoleService
+
+
+class RoleRepositoryStub:
+    def __init__(self, role: Role):
+        self.role = role
+        self.loads = 0
+
+    async def get(self, id: str) -> Role:
+        self.loads += 1
+        return self.role
+
+
+def make_service() -> tuple[RoleService, RoleRepositoryStub]:
+    # Without validation, the document isn't bound to an initialized collection
+    role = Role.model_construct(
+        id=PydanticObjectId(),
+        name="Editor",
+        description="",
+        permissions=[Permission.USER_VIEW_ONLY, Permission.ROLE_VIEW_ONLY],
+    )
+    repository = RoleRepositoryStub(role)
+    return RoleService(repository, role_version_store=None, role_cache=RoleCache(client=None)), repository
+
+
+@pytest.mark.asyncio
+async def test_permission_set_is_computed_once():
+    service, repository = make_service()
+    role_id = str(repository.role.id)
+
+    permissions = await service.get_role_permissions(role_id)
+
+    assert permissions == frozenset({Permission.USER_VIEW_ONLY, Permission.ROLE_VIEW_ONLY})
+    assert await service.get_role_permissions(role_id) is permissions
+    assert repository.loads == 1
+
+
+@pytest.mark.asyncio
+async def test_returned_role_is_a_copy():
+    service, repository = make_service()
+    role_id = str(repository.role.id)
+
+    role = await service.get_role_by_id(role_id)
+    role.permissions.append(Permission.FULL_ACCESS)
+    role.name = "Changed"
+
+    again = await service.get_role_by_id(role_id)
+    assert again.name == "Editor"
+    assert Permission.FULL_ACCESS not in again.permissions
+    assert Permission.FULL_ACCESS not in await service.get_role_permissions(role_id)
+    assert repository.loads == 1
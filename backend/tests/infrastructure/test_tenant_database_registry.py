@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from api.common.tenant_context import get_current_database
+from api.domain.entities.role import Role
+from api.infrastructure.persistence import mongodb
+from api.infrastructure.persistence.mongodb import Database
+
+
+class InitBeanie:
+    """Stands in for init_beanie, records the databases it ran for and the routed database meanwhile."""
+    def __init__(self, fail: bool = False):
+        self.calls: list[str] = []
+        self.routed: list[str] = []
+        self.fail = fail
+
+    async def __call__(self, database, document_models):
+        self.calls.append(database.name)
+        self.routed.append(get_current_database().name)
+        # Creating indexes takes a few round trips, let the other requests run meanwhile
+        for _ in range(5):
+            await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError("Mongo is down")
+
+
+@pytest.fixture
+async def db():
+    # Handles only, init_beanie is the only thing that would talk to a server
+    db = Database(uri="mongodb://localhost:27012", models=[Role])
+    yield db
+    await db.close()
+
+
+@pytest.fixture
+def init_beanie(monkeypatch: pytest.MonkeyPatch) -> InitBeanie:
+    init_beanie = InitBeanie()
+    monkeypatch.setattr(mongodb, "init_beanie", init_beanie)
+    return init_beanie
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_initialize_a_tenant_once(db: Database, init_beanie: InitBeanie):
+    names = ["tenant_a", "tenant_b"] * 20
+
+    databases = await asyncio.gather(*(db.get_tenant_database(name) for name in names))
+
+    assert sorted(init_beanie.calls) == ["tenant_a", "tenant_b"]
+    # Every request of a tenant gets the same handle
+    assert len({id(database) for database in databases[0::2]}) == 1
+    assert len({id(database) for database in databases[1::2]}) == 1
+    assert databases[0].name == "tenant_a" and databases[1].name == "tenant_b"
+
+
+@pytest.mark.asyncio
+async def test_initialized_tenant_is_not_initialized_again(db: Database, init_beanie: InitBeanie):
+    first = await db.get_tenant_database("tenant_a")
+
+    assert await db.get_tenant_database("tenant_a") is first
+    assert init_beanie.calls == ["tenant_a"]
+
+
+@pytest.mark.asyncio
+async def test_initialization_is_routed_to_the_tenant(db: Database, init_beanie: InitBeanie):
+    await db.get_tenant_database("tenant_a")
+
+    assert init_beanie.routed == ["tenant_a"]
+    assert get_current_database() is None
+
+
+@pytest.mark.asyncio
+async def test_failed_initialization_is_retried(db: Database, monkeypatch: pytest.MonkeyPatch):
+    failing = InitBeanie(fail=True)
+    monkeypatch.setattr(mongodb, "init_beanie", failing)
+
+    results = await asyncio.gather(*(db.get_tenant_database("tenant_a") for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert db.registry.get("tenant_a") is None
+    assert get_current_database() is None
+
+    working = InitBeanie()
+    monkeypatch.setattr(mongodb, "init_beanie", working)
+    assert (await db.get_tenant_database("tenant_a")).name == "tenant_a"
+    assert working.calls == ["tenant_a"]
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from api.common.tenant_context import reset_current_database, set_current_database
+from api.domain.entities.role import Role
+from api.infrastructure.persistence.mongodb import Database
+
+TEST_MONGO_URI = "mongodb://localhost:27012/test_db"
+
+TENANT_DATABASES = ("api_test_tenant_a", "api_test_tenant_b")
+
+
+@pytest.fixture
+async def db():
+    db = Database(uri=TEST_MONGO_URI, models=[Role])
+    await db.init_db("api_test_host", is_tenant=False)
+    yield db
+    for name in (*TENANT_DATABASES, "api_test_host"):
+        await db.client.drop_database(name)
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_tenants_do_not_see_each_others_documents(db: Database):
+    both_inserted = asyncio.Barrier(2)
+
+    async def handle(db_name: str) -> list[str]:
+        token = set_current_database(await db.get_tenant_database(db_name))
+        try:
+            await Role(name=f"role-of-{db_name}", description=None).insert()
+            await both_inserted.wait()
+            return [role.name for role in await Role.find_all().to_list()]
+        finally:
+            reset_current_database(token)
+
+    a, b = await asyncio.gather(*(handle(name) for name in TENANT_DATABASES))
+
+    assert a == ["role-of-api_test_tenant_a"]
+    assert b == ["role-of-api_test_tenant_b"]
+    # Nothing was written to the globally bound (host) database
+    assert await Role.find_all().to_list() == []
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from api.core.config import settings
+from api.domain.dtos.audit_logs_dto import AuditLogDto
+from api.domain.entities.audit_log import AuditLog
+from api.infrastructure.messaging import celery_worker
+from api.infrastructure.persistence.repositories.mongo_audit_log_store_impl import MongoAuditLogStore
+
+TEST_MONGO_URI = "mongodb://localhost:27012/test_db"
+HOST_DB_NAME = "api_test_worker_host"
+
+
+@pytest.fixture
+async def tenant_worker(monkeypatch: pytest.MonkeyPatch):
+    """Celery task setup of a tenant: only the tenant database is initialized."""
+    monkeypatch.setattr(celery_worker, "mongo_uri", TEST_MONGO_URI)
+    monkeypatch.setattr(settings, "mongo_db_name", HOST_DB_NAME)
+    tenant_id = str(ObjectId())
+    databases = []
+
+    async def open_task_db():
+        db = await celery_worker._get_current_tenant_db(tenant_id=tenant_id)
+        databases.append(db)
+        return db
+
+    yield tenant_id, open_task_db
+    for db in databases:
+        await db.client.drop_database(HOST_DB_NAME)
+        await db.client.drop_database(f"tenant_{tenant_id}")
+        await db.close()
+
+
+def make_log(tenant_id: str, n: int) -> AuditLogDto:
+    return AuditLogDto(
+        entity="tenant",
+        action="create",
+        changes={"n": n},
+        user_id="u1",
+        tenant_id=tenant_id,
+        timestamp=datetime(2025, 1, 1, 0, 0, n, tzinfo=timezone.utc).isoformat(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_tenant_task_writes_and_reads_audit_logs_in_the_host_database(tenant_worker):
+    tenant_id, open_task_db = tenant_worker
+    db = await open_task_db()
+    store = MongoAuditLogStore(count_ttl=0)
+
+    await store.append([make_log(tenant_id, n) for n in range(3)])
+    logs = [log async for log in store.iterate(tenant_id=tenant_id)]
+
+    assert [log.changes["n"] for log in logs] == [2, 1, 0]
+    assert AuditLog.get_pymongo_collection().database.name == HOST_DB_NAME
+    assert "audit_logs" not in await db.db.list_collection_names()
+
+
+@pytest.mark.asyncio
+async def test_next_tenant_task_rebinds_audit_logs_to_its_client(tenant_worker):
+    tenant_id, open_task_db = tenant_worker
+    store = MongoAuditLogStore(count_ttl=0)
+    first = await open_task_db()
+    await store.append([make_log(tenant_id, 0)])
+    # Each task closes its client when it's done
+    await first.close()
+
+    await open_task_db()
+    await store.append([make_log(tenant_id, 1)])
+
+    assert await store.count(tenant_id) == 2
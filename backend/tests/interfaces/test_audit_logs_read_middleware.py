@@ -0,0 +1,165 @@
+from types import SimpleNamespace
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from api.common import lru_cache
+from api.core.config import settings
+from api.interfaces.middlewares import audit_logs_read_middleware
+from api.interfaces.middlewares.audit_logs_read_middleware import (
+    AuditLogsReadMiddleware,
+    AuditReadPolicy,
+    audit_read_policy_from_settings,
+)
+
+# Bearer token -> user, the tokens are not verified in these tests
+USERS = {
+    "alice": SimpleNamespace(id="u1", tenant_id="t1"),
+    "bob": SimpleNamespace(id="u2", tenant_id="t1"),
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class Sampler:
+    """Returns the given values in turn, in place of random.random."""
+    def __init__(self, *values: float):
+        self.values = list(values)
+
+    def __call__(self) -> float:
+        return self.values.pop(0)
+
+
+class RecordingAuditLogWriter:
+    def __init__(self):
+        self.logs = []
+
+    async def write(self, log) -> None:
+        self.logs.append(log)
+
+
+@pytest.fixture
+def audit_logs(monkeypatch: pytest.MonkeyPatch) -> RecordingAuditLogWriter:
+    async def resolve_user(request):
+        return USERS.get(request.headers.get("authorization", "").removeprefix("Bearer "))
+
+    writer = RecordingAuditLogWriter()
+    monkeypatch.setattr(audit_logs_read_middleware, "audit_log_writer", writer)
+    monkeypatch.setattr(audit_logs_read_middleware, "resolve_current_user_optional", resolve_user)
+    return writer
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    # The dedup window is the expiry of the recently recorded reads
+    monkeypatch.setattr(lru_cache, "time", clock)
+    return clock
+
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+
+def make_middleware(policy: AuditReadPolicy, sampler=lambda: 0.0) -> AuditLogsReadMiddleware:
+    return AuditLogsReadMiddleware(Starlette(routes=[Route("/{path:path}", ok)]), policy=policy, sampler=sampler)
+
+
+async def get(middleware: AuditLogsReadMiddleware, path: str, user: str = "alice", query: str = "") -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"test"), (b"authorization", f"Bearer {user}".encode())],
+        "client": ("127.0.0.1", 12345), "server": ("test", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await middleware(scope, receive, send)
+
+
+@pytest.mark.asyncio
+async def test_excluded_paths_are_not_recorded(audit_logs: RecordingAuditLogWriter, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "audit_read_dedup_window", 0)
+    middleware = make_middleware(audit_read_policy_from_settings())
+
+    await get(middleware, "/api/v1/health")
+    await get(middleware, "/api/v1/health/ready")
+    await get(middleware, "/api/v1/app_configuration/")
+    # Static assets and the UI are outside of the included paths
+    await get(middleware, "/assets/index-4f2a.js")
+    await get(middleware, "/favicon.ico")
+    await get(middleware, "/api/v1/users/")
+
+    [log] = audit_logs.logs
+    assert (log.action, log.entity, log.user_id, log.tenant_id) == ("read", "User", "u1", "t1")
+    assert log.changes == {"info": "Read access to /api/v1/users/"}
+
+
+@pytest.mark.asyncio
+async def test_reads_are_sampled_per_entity(audit_logs: RecordingAuditLogWriter):
+    policy = AuditReadPolicy(sample_rates={"User": 0.25}, default_sample_rate=1.0)
+    middleware = make_middleware(policy, sampler=Sampler(0.1, 0.25, 0.9, 0.99))
+
+    await get(middleware, "/api/v1/users/1")  # 0.1 < 0.25, recorded
+    await get(middleware, "/api/v1/users/2")  # 0.25, not recorded
+    await get(middleware, "/api/v1/users/3")  # 0.9, not recorded
+    await get(middleware, "/api/v1/roles/1")  # 0.99 < 1.0, recorded
+
+    assert [log.changes["info"] for log in audit_logs.logs] == [
+        "Read access to /api/v1/users/1",
+        "Read access to /api/v1/roles/1",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unsampled_read_does_not_resolve_the_user(audit_logs: RecordingAuditLogWriter, monkeypatch: pytest.MonkeyPatch):
+    async def resolve_user(request):
+        raise AssertionError("resolved an unsampled read")
+
+    monkeypatch.setattr(audit_logs_read_middleware, "resolve_current_user_optional", resolve_user)
+    middleware = make_middleware(AuditReadPolicy(default_sample_rate=0.0))
+
+    await get(middleware, "/api/v1/users/")
+
+    assert audit_logs.logs == []
+
+
+@pytest.mark.asyncio
+async def test_duplicate_reads_inside_the_window_are_recorded_once(audit_logs: RecordingAuditLogWriter, clock: Clock):
+    middleware = make_middleware(AuditReadPolicy(dedup_window=60))
+
+    await get(middleware, "/api/v1/users/", query="skip=0")
+    clock.now += 59
+    await get(middleware, "/api/v1/users/", query="skip=0")
+    assert len(audit_logs.logs) == 1
+
+    # Another user, another query
+    await get(middleware, "/api/v1/users/", user="bob", query="skip=0")
+    await get(middleware, "/api/v1/users/", query="skip=10")
+    assert [log.user_id for log in audit_logs.logs] == ["u1", "u2", "u1"]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_read_after_the_window_is_recorded(audit_logs: RecordingAuditLogWriter, clock: Clock):
+    middleware = make_middleware(AuditReadPolicy(dedup_window=60))
+
+    await get(middleware, "/api/v1/users/")
+    clock.now += 60
+    await get(middleware, "/api/v1/users/")
+    clock.now += 30
+    await get(middleware, "/api/v1/users/")
+
+    assert len(audit_logs.logs) == 2
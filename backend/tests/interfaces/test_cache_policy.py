@@ -0,0 +1,177 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from api.common.cache_events import ResourceChanged
+from api.infrastructure.caching.response_cache import ResponseCache
+from api.interfaces.caching.cache_policy import (
+    DEFAULT_CACHE_POLICY,
+    NO_CACHE_POLICY,
+    CachePolicy,
+    cache_policy,
+    get_cache_policy,
+    no_cache,
+)
+from api.interfaces.middlewares import redis_cache_middleware
+from api.interfaces.middlewares.redis_cache_middleware import RedisCacheMiddleware
+
+fakeredis = pytest.importorskip("fakeredis")
+
+# Bearer token -> user, the tokens are not verified in these tests
+USERS = {
+    "alice": SimpleNamespace(id="u1", tenant_id="t1", role_id="r1"),
+    "bob": SimpleNamespace(id="u2", tenant_id="t1", role_id="r1"),
+    "carol": SimpleNamespace(id="u3", tenant_id="t1", role_id="r2"),
+    "dave": SimpleNamespace(id="u4", tenant_id="t2", role_id="r1"),
+}
+
+
+def make_app() -> tuple[FastAPI, dict[str, int]]:
+    app = FastAPI()
+    calls = {"roles": 0, "reports": 0, "profile": 0, "configuration": 0}
+
+    @app.get("/api/v1/roles")
+    @cache_policy(ttl=60, scope="tenant", vary=["limit"])
+    async def list_roles():
+        calls["roles"] += 1
+        return {"calls": calls["roles"]}
+
+    @app.get("/api/v1/reports")
+    @no_cache
+    async def list_reports():
+        calls["reports"] += 1
+        return {"calls": calls["reports"]}
+
+    @app.get("/api/v1/profile")
+    async def profile():
+        calls["profile"] += 1
+        return {"calls": calls["profile"]}
+
+    @app.get("/api/v1/configuration")
+    @cache_policy(ttl=60, depends_on=["brandings"])
+    async def configuration():
+        calls["configuration"] += 1
+        return {"calls": calls["configuration"]}
+
+    return app, calls
+
+
+@pytest.fixture
+def cache() -> ResponseCache:
+    return ResponseCache(fakeredis.FakeAsyncRedis())
+
+
+@pytest.fixture
+def cached_app(cache: ResponseCache, monkeypatch: pytest.MonkeyPatch):
+    async def resolve_user(request):
+        return USERS.get(request.headers["authorization"].removeprefix("Bearer "))
+
+    monkeypatch.setattr(redis_cache_middleware, "resolve_current_user_optional", resolve_user)
+    app, calls = make_app()
+    # Added like in the application, the policy is read from the app the router sets on the scope
+    app.add_middleware(RedisCacheMiddleware, cache=cache)
+    return app, calls
+
+
+async def get(app: FastAPI, path: str, user: str) -> dict:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(path, headers={"Authorization": f"Bearer {user}"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_decorators_attach_the_policy():
+    @cache_policy(ttl=30, scope="tenant", vary=["skip", "limit"])
+    async def cached(): ...
+
+    @cache_policy(depends_on=["brandings"])
+    async def dependent(): ...
+
+    @no_cache
+    async def uncached(): ...
+
+    async def plain(): ...
+
+    assert get_cache_policy(cached) == CachePolicy(ttl=30, scope="tenant", vary=("limit", "skip"))
+    assert get_cache_policy(dependent) == CachePolicy(depends_on=("brandings",))
+    assert get_cache_policy(uncached) is NO_CACHE_POLICY
+    assert get_cache_policy(plain) is DEFAULT_CACHE_POLICY
+    assert get_cache_policy(None) is DEFAULT_CACHE_POLICY
+
+
+def test_get_policy_of_the_matched_route(cache: ResponseCache):
+    inner, _ = make_app()
+    middleware = RedisCacheMiddleware(inner, cache=cache)
+
+    def policy(path: str) -> CachePolicy:
+        return middleware._get_policy({"type": "http", "method": "GET", "path": path, "app": inner})
+
+    assert policy("/api/v1/roles") == CachePolicy(ttl=60, scope="tenant", vary=("limit",))
+    assert policy("/api/v1/reports") is NO_CACHE_POLICY
+    assert policy("/api/v1/profile") is DEFAULT_CACHE_POLICY
+    assert policy("/api/v1/unknown") is DEFAULT_CACHE_POLICY
+
+
+@pytest.mark.asyncio
+async def test_no_cache_endpoint_skips_the_cache(cached_app, cache: ResponseCache):
+    app, calls = cached_app
+
+    assert await get(app, "/api/v1/reports", "alice") == {"calls": 1}
+    assert await get(app, "/api/v1/reports", "alice") == {"calls": 2}
+    assert calls["reports"] == 2
+    assert await cache.client.keys("cache:*") == []
+
+
+@pytest.mark.asyncio
+async def test_default_policy_caches_per_user(cached_app):
+    app, calls = cached_app
+
+    assert await get(app, "/api/v1/profile", "alice") == {"calls": 1}
+    assert await get(app, "/api/v1/profile", "alice") == {"calls": 1}
+    assert await get(app, "/api/v1/profile", "bob") == {"calls": 2}
+
+
+@pytest.mark.asyncio
+async def test_tenant_policy_keys_on_tenant_and_role(cached_app):
+    app, calls = cached_app
+
+    assert await get(app, "/api/v1/roles?limit=10", "alice") == {"calls": 1}
+    # Same tenant and role: shared entry, other query parameters are not part of the key
+    assert await get(app, "/api/v1/roles?limit=10&utm=x", "bob") == {"calls": 1}
+    # Other role, other tenant, other varied parameter
+    assert await get(app, "/api/v1/roles?limit=10", "carol") == {"calls": 2}
+    assert await get(app, "/api/v1/roles?limit=10", "dave") == {"calls": 3}
+    assert await get(app, "/api/v1/roles?limit=20", "alice") == {"calls": 4}
+    assert calls["roles"] == 4
+
+
+@pytest.mark.asyncio
+async def test_change_of_a_dependency_evicts_the_response(cached_app, cache: ResponseCache):
+    app, calls = cached_app
+
+    assert await get(app, "/api/v1/configuration", "alice") == {"calls": 1}
+    assert await get(app, "/api/v1/configuration", "dave") == {"calls": 2}
+    assert await get(app, "/api/v1/configuration", "alice") == {"calls": 1}
+
+    await cache.on_resource_changed(ResourceChanged(resource="brandings", entity_id="b1", tenant_id="t1"))
+
+    assert await get(app, "/api/v1/configuration", "alice") == {"calls": 3}
+    # Other tenant, other branding
+    assert await get(app, "/api/v1/configuration", "dave") == {"calls": 2}
+
+
+@pytest.mark.asyncio
+async def test_change_of_a_tenant_evicts_its_responses(cached_app, cache: ResponseCache):
+    app, calls = cached_app
+    await get(app, "/api/v1/profile", "alice")
+    await get(app, "/api/v1/roles?limit=10", "alice")
+    await get(app, "/api/v1/profile", "dave")
+
+    # Tenants are host level data, the changed tenant is the entity
+    await cache.on_resource_changed(ResourceChanged(resource="tenants", entity_id="t1"))
+
+    assert await get(app, "/api/v1/profile", "alice") == {"calls": 3}
+    assert await get(app, "/api/v1/roles?limit=10", "alice") == {"calls": 2}
+    assert await get(app, "/api/v1/profile", "dave") == {"calls": 2}
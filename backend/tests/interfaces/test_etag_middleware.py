@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from api.infrastructure.caching.etag import make_etag
+from api.interfaces.middlewares.etag_middleware import ETagMiddleware
+
+BODY = b'{"items":[1,2,3]}'
+CACHED_ETAG = '"cached-version"'
+
+
+async def items(request):
+    return Response(BODY, media_type="application/json")
+
+
+async def cached_items(request):
+    # Like a response cache hit, already tagged
+    return JSONResponse({"items": [1, 2, 3]}, headers={"etag": CACHED_ETAG, "cache-control": "private"})
+
+
+async def stream(request):
+    async def chunks():
+        for n in range(3):
+            await asyncio.sleep(0)
+            yield b'{"n": %d}\n' % n
+    return StreamingResponse(chunks(), media_type=request.query_params.get("media_type", "application/json"))
+
+
+app = ETagMiddleware(Starlette(routes=[
+    Route("/items", items),
+    Route("/cached-items", cached_items),
+    Route("/stream", stream),
+]))
+
+
+async def get(path: str, if_none_match: str | None = None) -> list[dict]:
+    """ASGI messages sent for a GET of `path`."""
+    query = b""
+    if "?" in path:
+        path, query = path.split("?", 1)
+        query = query.encode()
+    headers = [(b"host", b"test")]
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query, "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 12345), "server": ("test", 80),
+    }
+    received = False
+    messages: list[dict] = []
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages
+
+
+def response_headers(messages: list[dict]) -> dict[str, str]:
+    return {name.decode(): value.decode() for name, value in messages[0]["headers"]}
+
+
+def response_body(messages: list[dict]) -> bytes:
+    return b"".join(message.get("body", b"") for message in messages[1:])
+
+
+@pytest.mark.asyncio
+async def test_json_response_is_tagged():
+    messages = await get("/items")
+
+    assert messages[0]["status"] == 200
+    assert response_headers(messages)["etag"] == make_etag(BODY)
+    assert response_body(messages) == BODY
+
+
+@pytest.mark.asyncio
+async def test_matching_if_none_match_is_not_modified():
+    messages = await get("/items", if_none_match=make_etag(BODY))
+
+    assert messages[0]["status"] == 304
+    assert response_headers(messages) == {"etag": make_etag(BODY)}
+    assert response_body(messages) == b""
+
+
+@pytest.mark.asyncio
+async def test_other_if_none_match_gets_the_body():
+    messages = await get("/items", if_none_match='"other", W/"older"')
+
+    assert messages[0]["status"] == 200
+    assert response_headers(messages)["etag"] == make_etag(BODY)
+    assert response_body(messages) == BODY
+
+
+@pytest.mark.asyncio
+async def test_tagged_response_keeps_its_etag():
+    assert response_headers(await get("/cached-items"))["etag"] == CACHED_ETAG
+
+    messages = await get("/cached-items", if_none_match=CACHED_ETAG)
+
+    assert messages[0]["status"] == 304
+    assert response_headers(messages) == {"etag": CACHED_ETAG, "cache-control": "private"}
+    assert response_body(messages) == b""
+
+
+@pytest.mark.parametrize("media_type", ["application/json", "application/x-ndjson"])
+@pytest.mark.asyncio
+async def test_streamed_response_is_passed_through(media_type: str):
+    messages = await get(f"/stream?media_type={media_type}")
+
+    assert messages[0]["status"] == 200
+    assert "etag" not in response_headers(messages)
+    # Chunk by chunk, as the endpoint produced them
+    assert [message.get("body") for message in messages[1:4]] == [b'{"n": 0}\n', b'{"n": 1}\n', b'{"n": 2}\n']
+    assert all(message.get("more_body") for message in messages[1:4])
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_ignores_if_none_match():
+    messages = await get("/stream", if_none_match="*")
+
+    assert messages[0]["status"] == 200
+    assert response_body(messages) == b'{"n": 0}\n{"n": 1}\n{"n": 2}\n'
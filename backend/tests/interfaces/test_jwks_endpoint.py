@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from api.infrastructure.security.jwt_keyset import JwtKeySet
+from api.interfaces.api_controllers import jwks_endpoint
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(jwks_endpoint.router)
+    return app
+
+
+async def get_jwks() -> tuple[dict, str]:
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url="http://test") as client:
+        response = await client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    return response.json(), response.headers["cache-control"]
+
+
+@pytest.mark.asyncio
+async def test_jwks_publishes_the_public_keys(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    key = ed25519.Ed25519PrivateKey.generate()
+    (tmp_path / "2025-02.pem").write_bytes(key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()))
+    monkeypatch.setattr(jwks_endpoint, "jwt_keyset", JwtKeySet.from_directory(str(tmp_path), "EdDSA", "2025-02"))
+
+    jwks, cache_control = await get_jwks()
+
+    [jwk] = jwks["keys"]
+    assert jwk["kid"] == "2025-02" and jwk["alg"] == "EdDSA"
+    # No private key material ("d") is ever published
+    assert "d" not in jwk
+    assert cache_control == "public, max-age=300"
+
+
+@pytest.mark.asyncio
+async def test_jwks_is_empty_with_a_shared_secret(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(jwks_endpoint, "jwt_keyset", None)
+
+    jwks, _ = await get_jwks()
+
+    assert jwks == {"keys": []}
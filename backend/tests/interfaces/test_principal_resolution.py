@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+
+import pytest
+from beanie import PydanticObjectId
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from api.common.dtos.token_dto import TokenPayloadDto
+from api.core.container import get_jwt_token_service, get_role_service, get_subscription_plan_service, get_user_service
+from api.infrastructure.caching.response_cache import ResponseCache
+from api.infrastructure.security import current_user as current_user_module
+from api.infrastructure.security.current_user import CurrentUser
+from api.interfaces.middlewares import audit_logs_read_middleware
+from api.interfaces.middlewares.audit_logs_read_middleware import AuditLogsReadMiddleware, AuditReadPolicy
+from api.interfaces.middlewares.redis_cache_middleware import RedisCacheMiddleware
+
+fakeredis = pytest.importorskip("fakeredis")
+
+USER_ID = PydanticObjectId()
+ROLE_ID = PydanticObjectId()
+TOKEN = "access-token"
+
+
+class Services:
+    """The services the principal is resolved with, counting the token decodes and user lookups."""
+    def __init__(self):
+        self.decoded = 0
+        self.users_loaded = 0
+
+        async def decode_token(token: str, type: str):
+            self.decoded += 1
+            return TokenPayloadDto(sub=USER_ID, email="ada@example.com", is_active=True)
+
+        async def get_user_by_id(user_id: str):
+            self.users_loaded += 1
+
+            async def to_serializable_dict():
+                return {
+                    "id": str(USER_ID), "first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com",
+                    "gender": "other", "role_id": str(ROLE_ID), "is_active": True, "created_at": "", "updated_at": "",
+                }
+            return SimpleNamespace(id=USER_ID, role_id=str(ROLE_ID), to_serializable_dict=to_serializable_dict)
+
+        async def get_role_by_id(role_id: str):
+            async def to_serializable_dict():
+                return {"id": str(ROLE_ID), "name": "Editor", "description": None, "created_at": "", "updated_at": ""}
+            return SimpleNamespace(to_serializable_dict=to_serializable_dict)
+
+        async def get_subscription_plan_by_user_id(user_id: str):
+            return None
+
+        self.token_service = SimpleNamespace(decode_token=decode_token)
+        self.user_service = SimpleNamespace(get_user_by_id=get_user_by_id)
+        self.role_service = SimpleNamespace(get_role_by_id=get_role_by_id)
+        self.subscription_service = SimpleNamespace(get_subscription_plan_by_user_id=get_subscription_plan_by_user_id)
+
+
+class RecordingAuditLogWriter:
+    def __init__(self):
+        self.logs = []
+
+    async def write(self, log) -> None:
+        self.logs.append(log)
+
+
+@pytest.fixture
+def services(monkeypatch: pytest.MonkeyPatch) -> Services:
+    services = Services()
+    # Middlewares resolve the services from the container, endpoints through dependencies
+    monkeypatch.setattr(current_user_module, "get_jwt_token_service", lambda: services.token_service)
+    monkeypatch.setattr(current_user_module, "get_user_service", lambda: services.user_service)
+    monkeypatch.setattr(current_user_module, "get_role_service", lambda: services.role_service)
+    monkeypatch.setattr(current_user_module, "get_subscription_plan_service", lambda: services.subscription_service)
+    return services
+
+
+@pytest.fixture
+def audit_logs(monkeypatch: pytest.MonkeyPatch) -> RecordingAuditLogWriter:
+    writer = RecordingAuditLogWriter()
+    monkeypatch.setattr(audit_logs_read_middleware, "audit_log_writer", writer)
+    return writer
+
+
+def make_app(services: Services) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/users/me")
+    async def me(current_user: CurrentUser):
+        return {"email": current_user.email}
+
+    app.dependency_overrides[get_jwt_token_service] = lambda: services.token_service
+    app.dependency_overrides[get_user_service] = lambda: services.user_service
+    app.dependency_overrides[get_role_service] = lambda: services.role_service
+    app.dependency_overrides[get_subscription_plan_service] = lambda: services.subscription_service
+    # Same order as the application: the cache runs first, then the audit of reads, then the endpoint
+    app.add_middleware(AuditLogsReadMiddleware, policy=AuditReadPolicy())
+    app.add_middleware(RedisCacheMiddleware, cache=ResponseCache(fakeredis.FakeAsyncRedis()))
+    return app
+
+
+@pytest.mark.asyncio
+async def test_principal_is_resolved_once_per_request(services: Services, audit_logs: RecordingAuditLogWriter):
+    app = make_app(services)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {TOKEN}"})
+
+    assert response.status_code == 200
+    assert response.json() == {"email": "ada@example.com"}
+    # Cache key, audit log and the endpoint's CurrentUser all come from one resolution
+    assert services.decoded == 1
+    assert services.users_loaded == 1
+    [log] = audit_logs.logs
+    assert log.user_id == str(USER_ID)
+
+
+@pytest.mark.asyncio
+async def test_each_request_resolves_its_own_principal(services: Services, audit_logs: RecordingAuditLogWriter):
+    app = make_app(services)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for _ in range(2):
+            response = await client.get("/api/v1/users/other", headers={"Authorization": f"Bearer {TOKEN}"})
+            assert response.status_code == 404
+
+    assert services.decoded == 2
+    assert services.users_loaded == 2
@@ -152,6 +152,39 @@ async def test_list_of_roles_paginated_in_host(client: AsyncClient):
     assert data.limit == 1
 
 
+@pytest.mark.asyncio
+async def test_list_of_roles_with_cursor_in_host(client: AsyncClient):
+    """
+        List roles page by page with the cursor of the previous page:
+    """
+    for i in range(3):
+        new_role = CreateRoleDto(
+          name=f"Cursor Role {i}",
+          description=f"A role for testing purposes {i}",
+        )
+        response = await client.post("/roles/", json=new_role.model_dump())
+        assert response.status_code == 201
+
+    names = []
+    cursor = None
+    while True:
+        url = "/roles/?limit=2&include_total=false" + (f"&cursor={cursor}" if cursor else "")
+        response = await client.get(url)
+        assert response.status_code == 200
+        data = RoleListDto.model_validate(response.json())
+        assert data.total is None
+        names.extend(role.name for role in data.roles)
+        if not data.has_next:
+            assert data.next_cursor is None
+            break
+        cursor = data.next_cursor
+
+    assert names == ["Cursor Role 0", "Cursor Role 1", "Cursor Role 2"]
+
+    response = await client.get("/roles/?limit=2&cursor=invalid")
+    assert response.status_code == 406
+
+
 @pytest.mark.asyncio
 async def test_create_role_with_default_permissions_in_host(client: AsyncClient):
     """
@@ -0,0 +1,191 @@
+import io
+from types import SimpleNamespace
+from typing import Dict
+
+import pytest
+from openpyxl import load_workbook
+
+from api.common.dtos.worker_dto import WorkerPayloadDto
+from api.core.config import settings
+from api.domain.dtos.audit_logs_dto import AuditLogDto
+from api.infrastructure.messaging import celery_worker
+from api.usecases.audit_logs_service import AuditLogsService
+
+TENANT_ID = "68c302ef6bf7a039b7e9b390"
+
+
+class ListAuditLogStore:
+    """Audit log store over a list, only what the export needs."""
+    def __init__(self, logs: list[AuditLogDto]):
+        self.logs = logs
+        self.iterated_with = None
+
+    async def iterate(self, tenant_id=None, action=None):
+        self.iterated_with = (tenant_id, action)
+        for log in self.logs:
+            if action is None or log.action == action:
+                yield log
+
+
+class RecordingEmailService:
+    def __init__(self, fail: bool = False):
+        self.sent: list[dict] = []
+        self.fail = fail
+
+    async def send_email(self, to, subject, body, type, attachments=[]):
+        if self.fail:
+            raise RuntimeError("SMTP is down")
+        self.sent.append({
+            "to": to,
+            "body": body,
+            "attachments": [(attachment.filename, attachment.file.read()) for attachment in attachments],
+        })
+
+
+class RecordingFileService:
+    def __init__(self):
+        self.uploaded: dict[str, bytes] = {}
+        self.url_ttls: list[int] = []
+
+    async def upload_file(self, file) -> str:
+        self.uploaded[file.filename] = file.file.read()
+        return file.filename
+
+    async def get_file_url(self, file_key: str, expires_in: int = 3600) -> str:
+        self.url_ttls.append(expires_in)
+        return f"https://files.example.com/{file_key}?signature=abc"
+
+
+def make_logs(count: int) -> list[AuditLogDto]:
+    return [
+        AuditLogDto(entity="user", action="create" if n % 2 else "update", changes={"n": n}, tenant_id=TENANT_ID)
+        for n in range(count)
+    ]
+
+
+def make_service(logs: list[AuditLogDto], email_service=None) -> AuditLogsService:
+    return AuditLogsService(
+        audit_log_repository=None,
+        email_service=email_service or RecordingEmailService(),
+        audit_log_store=ListAuditLogStore(logs),
+        file_service=RecordingFileService(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_export_writes_a_row_per_log():
+    service = make_service(make_logs(250))
+    destination = io.BytesIO()
+
+    rows = await service.export_audit_logs(destination, tenant_id=TENANT_ID)
+
+    assert rows == 250
+    sheet = load_workbook(destination, read_only=True)["Audit Logs"]
+    values = list(sheet.values)
+    assert values[0] == ("Timestamp", "Tenant", "User", "Action", "Entity", "Changes")
+    assert len(values) == 251
+    assert values[1][1] == TENANT_ID and values[1][5] == "{'n': 0}"
+    assert service.audit_log_store.iterated_with == (TENANT_ID, None)
+
+
+@pytest.mark.asyncio
+async def test_export_of_an_action():
+    service = make_service(make_logs(10))
+
+    assert await service.export_audit_logs(io.BytesIO(), action="create") == 5
+
+
+@pytest.mark.asyncio
+async def test_small_report_is_attached(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "audit_log_report_max_attachment_size", 1024)
+    service = make_service([])
+    report = io.BytesIO(b"x" * 1024)
+
+    await service.send_audit_log_report_via_email("ada@example.com", "Ada", report, "report.xlsx")
+
+    [email] = service.email_service.sent
+    assert email["attachments"] == [("report.xlsx", b"x" * 1024)]
+    assert service.file_service.uploaded == {}
+
+
+@pytest.mark.asyncio
+async def test_large_report_is_linked(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "audit_log_report_max_attachment_size", 1024)
+    monkeypatch.setattr(settings, "audit_log_report_link_ttl", 600)
+    service = make_service([])
+    report = io.BytesIO(b"x" * 1025)
+
+    await service.send_audit_log_report_via_email("ada@example.com", "Ada", report, "report.xlsx")
+
+    assert service.file_service.uploaded == {"reports/report.xlsx": b"x" * 1025}
+    assert service.file_service.url_ttls == [600]
+    [email] = service.email_service.sent
+    assert email["attachments"] == []
+    assert "https://files.example.com/reports/report.xlsx?signature=abc" in email["body"]
+
+
+@pytest.fixture
+def report_task(monkeypatch: pytest.MonkeyPatch):
+    """Runs the report Celery task with in-memory services, recording the temporary files it creates."""
+    async def get_user_by_id(user_id: str):
+        return SimpleNamespace(email="ada@example.com", first_name="Ada")
+
+    db = SimpleNamespace(closed=False)
+
+    async def close():
+        db.closed = True
+    db.close = close
+
+    async def get_tenant_db(tenant_id: str):
+        return db
+
+    temporary_files = []
+    temporary_file = celery_worker.tempfile.TemporaryFile
+
+    def recording_temporary_file(*args, **kwargs):
+        file = temporary_file(*args, **kwargs)
+        temporary_files.append(file)
+        return file
+
+    task = SimpleNamespace(db=db, temporary_files=temporary_files, service=None)
+
+    def run(service: AuditLogsService):
+        task.service = service
+        payload = WorkerPayloadDto[Dict[str, str | None]](
+            label="email-sending", tenant_id=TENANT_ID, data={"requested_by": "u1", "action": None},
+        )
+        return celery_worker._handle_download_report_shared_task_async(payload.model_dump_json())
+
+    monkeypatch.setattr(celery_worker, "_get_current_tenant_db", get_tenant_db)
+    monkeypatch.setattr(celery_worker, "get_user_service", lambda: SimpleNamespace(get_user_by_id=get_user_by_id))
+    monkeypatch.setattr(celery_worker, "get_audit_logs_service", lambda: task.service)
+    monkeypatch.setattr(celery_worker.tempfile, "TemporaryFile", recording_temporary_file)
+    task.run = run
+    return task
+
+
+@pytest.mark.asyncio
+async def test_report_task_removes_the_temporary_file(report_task):
+    service = make_service(make_logs(20))
+
+    await report_task.run(service)
+
+    [email] = service.email_service.sent
+    [(filename, content)] = email["attachments"]
+    assert filename.startswith(f"audit_logs_report_{TENANT_ID}") and filename.endswith(".xlsx")
+    assert len(list(load_workbook(io.BytesIO(content), read_only=True)["Audit Logs"].values)) == 21
+    [report] = report_task.temporary_files
+    assert report.closed
+    assert report_task.db.closed
+
+
+@pytest.mark.asyncio
+async def test_failed_report_task_removes_the_temporary_file(report_task):
+    service = make_service(make_logs(20), email_service=RecordingEmailService(fail=True))
+
+    with pytest.raises(RuntimeError):
+        await report_task.run(service)
+
+    [report] = report_task.temporary_files
+    assert report.closed
+    assert report_task.db.closed
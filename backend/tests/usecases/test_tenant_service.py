@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+from beanie import PydanticObjectId
+
+from api.core.exceptions import TenantNotFoundException
+from api.domain.dtos.tenant_dto import CreateTenantDto, FeatureDto
+from api.domain.entities.tenant import Feature, Tenant
+from api.domain.enum.feature import Feature as FeatureEnum
+from api.usecases.tenant_service import TenantService
+
+fakeredis = pytest.importorskip("fakeredis")
+
+SUBDOMAIN = "acme.example.com"
+
+
+class InMemoryTenantRepository:
+    """Stands in for TenantRepository, counts the lookups that reach the database."""
+    def __init__(self):
+        self.tenants: dict[str, Tenant] = {}
+        self.lookups = 0
+
+    async def single_or_none(self, **kwargs) -> Tenant | None:
+        self.lookups += 1
+        for tenant in self.tenants.values():
+            if all(getattr(tenant, field) == value for field, value in kwargs.items()):
+                return tenant.model_copy(deep=True)
+        return None
+
+    async def get(self, id: str) -> Tenant | None:
+        self.lookups += 1
+        tenant = self.tenants.get(id)
+        return tenant.model_copy(deep=True) if tenant is not None else None
+
+    async def create(self, data: CreateTenantDto) -> PydanticObjectId:
+        tenant_id = PydanticObjectId()
+        self.tenants[str(tenant_id)] = Tenant.model_construct(
+            id=tenant_id, name=data.name, subdomain=data.subdomain, custom_domain=None, is_active=True, features=[],
+        )
+        return tenant_id
+
+    async def save(self, tenant: Tenant) -> Tenant:
+        self.tenants[str(tenant.id)] = tenant.model_copy(deep=True)
+        return tenant
+
+
+@pytest.fixture
+def repository() -> InMemoryTenantRepository:
+    return InMemoryTenantRepository()
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def service(repository: InMemoryTenantRepository, server) -> TenantService:
+    return TenantService(repository, client=fakeredis.FakeAsyncRedis(server=server))
+
+
+async def create(service: TenantService) -> str:
+    data = CreateTenantDto.model_construct(
+        name="Acme",
+        subdomain=SUBDOMAIN,
+        admin_email="admin@acme.example.com",
+        admin_password="Str0ng-Passw0rd!",
+        first_name="Ada",
+        last_name="Lovelace",
+        gender="other",
+    )
+    return str(await service.create_tenant(data))
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_cached(service: TenantService, repository: InMemoryTenantRepository):
+    tenant_id = await create(service)
+
+    first = await service.find_by_subdomain(SUBDOMAIN)
+    second = await service.find_by_subdomain(SUBDOMAIN)
+
+    assert first.id == second.id == PydanticObjectId(tenant_id)
+    assert repository.lookups == 1
+    # Callers get their own copy
+    first.name = "Changed"
+    assert (await service.find_by_subdomain(SUBDOMAIN)).name == "Acme"
+
+
+@pytest.mark.asyncio
+async def test_unknown_subdomain_is_visible_right_after_create(service: TenantService, repository: InMemoryTenantRepository):
+    with pytest.raises(TenantNotFoundException):
+        await service.find_by_subdomain(SUBDOMAIN)
+    # The miss is cached
+    with pytest.raises(TenantNotFoundException):
+        await service.find_by_subdomain(SUBDOMAIN)
+    assert repository.lookups == 1
+
+    tenant_id = await create(service)
+
+    assert str((await service.find_by_subdomain(SUBDOMAIN)).id) == tenant_id
+
+
+@pytest.mark.asyncio
+async def test_feature_update_is_visible_right_away(service: TenantService):
+    tenant_id = await create(service)
+    assert not any(feature.enabled for feature in await service.get_features_by_tenant_id(tenant_id))
+
+    await service.update_feature(tenant_id, FeatureDto(name=FeatureEnum.CHAT, enabled=True))
+
+    features = await service.get_features_by_tenant_id(tenant_id)
+    assert FeatureDto(name=FeatureEnum.CHAT, enabled=True) in features
+    assert (await service.find_by_subdomain(SUBDOMAIN)).features == [Feature(name=FeatureEnum.CHAT, enabled=True)]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tenant_cache(service: TenantService, repository: InMemoryTenantRepository):
+    tenant_id = await create(service)
+    await service.get_tenant_by_id(tenant_id)
+
+    await service.invalidate_tenant_cache()
+    await service.get_tenant_by_id(tenant_id)
+
+    assert repository.lookups == 2
+
+
+async def wait_for(condition) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+@pytest.mark.asyncio
+async def test_changes_are_broadcast_to_other_workers(service: TenantService, repository: InMemoryTenantRepository, server):
+    # Another worker, same database and Redis
+    other = TenantService(repository, client=fakeredis.FakeAsyncRedis(server=server))
+    await other.start()
+    try:
+        while (await other.client.pubsub_numsub(TenantService.invalidation_channel))[0][1] == 0:
+            await asyncio.sleep(0.01)
+        tenant_id = await create(service)
+        assert (await other.get_tenant_by_id(tenant_id)).is_active
+        lookups = repository.lookups
+
+        tenant = await service.get_tenant_by_id(tenant_id)
+        tenant.is_active = False
+        await service.save_tenant(tenant)
+
+        await wait_for(lambda: len(other._tenant_cache) == 0)
+        assert not (await other.get_tenant_by_id(tenant_id)).is_active
+        assert repository.lookups == lookups + 2
+    finally:
+        await other.stop()
+
+
+@pytest.mark.asyncio
+async def test_change_is_saved_when_redis_is_down(repository: InMemoryTenantRepository):
+    class DownRedis:
+        async def publish(self, channel, message):
+            raise ConnectionError("Redis is down")
+
+    service = TenantService(repository, client=DownRedis())
+    tenant_id = await create(service)
+    await service.get_tenant_by_id(tenant_id)
+
+    await service.update_feature(tenant_id, FeatureDto(name=FeatureEnum.CHAT, enabled=True))
+
+    assert FeatureDto(name=FeatureEnum.CHAT, enabled=True) in await service.get_features_by_tenant_id(tenant_id)